@@ -443,6 +443,14 @@ LMS_BASE = None
 LMS_ROOT_URL = "http://localhost:8000"
 LMS_INTERNAL_ROOT_URL = LMS_ROOT_URL
 LMS_ENROLLMENT_API_PATH = "/api/enrollment/v1/"
+
+# Number of enrollments whose signals each task sent by CourseEnrollment.bulk_enroll sends
+BULK_ENROLLMENT_SIGNALS_BATCH_SIZE = 100
+
+# Seconds to cache enrollment states for, when
+# FEATURES['ENABLE_SHARED_ENROLLMENT_STATE_CACHE'] is on.
+ENROLLMENT_STATE_CACHE_TIMEOUT = 300
+
 ENTERPRISE_API_URL = LMS_INTERNAL_ROOT_URL + '/enterprise/api/v1/'
 ENTERPRISE_CONSENT_API_URL = LMS_INTERNAL_ROOT_URL + '/consent/api/v1/'
 FRONTEND_LOGIN_URL = LOGIN_URL
@@ -612,6 +620,11 @@ MODULESTORE = {
     }
 }
 
+# Maximum total size, in bytes of pickled data, of the deserialized course
+# structures kept in memory by each process in front of the
+# 'course_structure_cache'. 0 disables it.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
 # Modulestore-level field override providers. These field override providers don't
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
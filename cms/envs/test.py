@@ -174,6 +174,9 @@ CACHES = {
     },
 }
 
+# Course structures are not kept in memory across tests.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 0
+
 ################################# CELERY ######################################
 
 CELERY_ALWAYS_EAGER = True
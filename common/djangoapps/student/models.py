@@ -30,7 +30,7 @@ from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.core.cache import cache
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
-from django.db import IntegrityError, models
+from django.db import IntegrityError, models, transaction
 from django.db.models import Count, Q
 from django.db.models.signals import post_save, pre_save
 from django.db.utils import ProgrammingError
@@ -58,7 +58,8 @@ from course_modes.models import CourseMode
 from courseware.models import (
     CourseDynamicUpgradeDeadlineConfiguration,
     DynamicUpgradeDeadlineConfiguration,
-    OrgDynamicUpgradeDeadlineConfiguration
+    OrgDynamicUpgradeDeadlineConfiguration,
+    chunks
 )
 from enrollment.api import _default_course_mode
 
@@ -106,6 +107,9 @@ UNENROLLED_TO_UNENROLLED = 'from unenrolled to unenrolled'
 DEFAULT_TRANSITION_STATE = 'N/A'
 SCORE_RECALCULATION_DELAY_ON_ENROLLMENT_UPDATE = 30
 
+# Number of ids in each query made by CourseEnrollment.bulk_enroll
+BULK_ENROLLMENT_QUERY_CHUNK_SIZE = 1000
+
 TRANSITION_STATES = (
     (UNENROLLED_TO_ALLOWEDTOENROLL, UNENROLLED_TO_ALLOWEDTOENROLL),
     (ALLOWEDTOENROLL_TO_ENROLLED, ALLOWEDTOENROLL_TO_ENROLLED),
@@ -1051,8 +1055,8 @@ class CourseEnrollment(models.Model):
 
     objects = CourseEnrollmentManager()
 
-    # cache key format e.g enrollment.<username>.<course_key>.mode = 'honor'
-    COURSE_ENROLLMENT_CACHE_KEY = u"enrollment.{}.{}.mode"  # TODO Can this be removed?  It doesn't seem to be used.
+    # cache key format e.g enrollment.<user_id>.<course_key>.mode = ('honor', True)
+    COURSE_ENROLLMENT_CACHE_KEY = u"enrollment.{}.{}.mode"
 
     MODE_CACHE_NAMESPACE = u'CourseEnrollment.mode_and_active'
 
@@ -1392,6 +1396,137 @@ class CourseEnrollment(models.Model):
                 return None
             raise
 
+    @classmethod
+    def bulk_enroll(cls, users, course_key, mode=None):
+        """
+        Enroll users in a course, as enroll does for each of them without
+        check_access, but with a few queries for all of them rather than
+        several queries per user. This saves immediately.
+
+        The post_save signals, tracking events and enrollment signals that
+        enroll sends for each user are sent asynchronously instead, by
+        send_bulk_enrollment_signals tasks for batches of
+        BULK_ENROLLMENT_SIGNALS_BATCH_SIZE enrollments, once the current
+        transaction is committed.
+
+        Returns a dict mapping the ids of the users to their CourseEnrollment
+        objects.
+
+        `users` is a list of saved Django User objects.
+
+        `course_key` is our usual course_id string (e.g. "edX/Test101/2013_Fall)
+
+        `mode` is a string specifying what kind of enrollment this is, as
+               for enroll. The default is the default course mode.
+        """
+        assert isinstance(course_key, CourseKey)
+        if mode is None:
+            mode = _default_course_mode(text_type(course_key))
+
+        users_by_id = {user.id: user for user in users}
+        existing_enrollments = {}
+        for user_ids in chunks(list(users_by_id), BULK_ENROLLMENT_QUERY_CHUNK_SIZE):
+            existing_enrollments.update(
+                (enrollment.user_id, enrollment)
+                for enrollment in cls.objects.filter(user_id__in=user_ids, course_id=course_key)
+            )
+        new_user_ids = [user_id for user_id in users_by_id if user_id not in existing_enrollments]
+        changed_enrollments = [
+            enrollment for enrollment in existing_enrollments.itervalues()
+            if not enrollment.is_active or enrollment.mode != mode
+        ]
+
+        try:
+            with transaction.atomic():
+                cls.objects.bulk_create([
+                    cls(user=users_by_id[user_id], course_id=course_key, mode=mode, is_active=True)
+                    for user_id in new_user_ids
+                ], batch_size=BULK_ENROLLMENT_QUERY_CHUNK_SIZE)
+                for enrollments in chunks(changed_enrollments, BULK_ENROLLMENT_QUERY_CHUNK_SIZE):
+                    cls.objects.filter(id__in=[enrollment.id for enrollment in enrollments]).update(
+                        is_active=True,
+                        mode=mode,
+                    )
+        except IntegrityError:
+            # Some of the users were enrolled concurrently.
+            log.warning(u"Bulk enrollment in course %s conflicted, enrolling users one at a time", course_key)
+            return {user_id: cls.enroll(user, course_key, mode) for user_id, user in users_by_id.iteritems()}
+
+        # bulk_create doesn't set the ids of the new enrollments on all databases.
+        enrollments = dict(existing_enrollments)
+        for user_ids in chunks(new_user_ids, BULK_ENROLLMENT_QUERY_CHUNK_SIZE):
+            enrollments.update(
+                (enrollment.user_id, enrollment)
+                for enrollment in cls.objects.filter(user_id__in=user_ids, course_id=course_key)
+            )
+
+        enrollment_signals = []
+        for user_id, enrollment in enrollments.iteritems():
+            enrollment.user = users_by_id[user_id]
+            created = user_id not in existing_enrollments
+            # New enrollments are created in the default mode, then updated.
+            old_mode = CourseMode.DEFAULT_MODE_SLUG if created else enrollment.mode
+            enrollment_signals.append({
+                'enrollment_id': enrollment.id,
+                'created': created,
+                'old_mode': old_mode,
+                'activation_changed': created or not enrollment.is_active,
+                'mode_changed': old_mode != mode,
+            })
+            enrollment.is_active = True
+            enrollment.mode = mode
+            cls._update_enrollment_in_request_cache(enrollment.user, course_key, CourseEnrollmentState(mode, True))
+            cls._update_enrollment_in_shared_cache(user_id, course_key, CourseEnrollmentState(mode, True))
+
+        cache.delete_many([cls.enrollment_status_hash_cache_key(user) for user in users_by_id.itervalues()])
+
+        # If there were unlinked CEAs, they become linked now
+        users_by_email = {user.email: user for user in users_by_id.itervalues()}
+        unlinked_ceas = CourseEnrollmentAllowed.objects.filter(
+            email__in=list(users_by_email),
+            course_id=course_key,
+            user__isnull=True,
+        )
+        for cea in unlinked_ceas:
+            CourseEnrollmentAllowed.objects.filter(id=cea.id).update(user=users_by_email[cea.email])
+
+        # Imported here since the tasks module imports this one.
+        from student.tasks import send_bulk_enrollment_signals
+        for signals_batch in chunks(enrollment_signals, settings.BULK_ENROLLMENT_SIGNALS_BATCH_SIZE):
+            transaction.on_commit(
+                lambda signals_batch=signals_batch: send_bulk_enrollment_signals.delay(signals_batch)
+            )
+
+        return enrollments
+
+    def send_bulk_enrollment_signals(self, created, old_mode, activation_changed, mode_changed):
+        """
+        Sends the post_save signal, tracking events and enrollment signals
+        that enroll would have sent for this enrollment, which was made by
+        bulk_enroll.
+        """
+        # As set by the pre_save receiver of verified_track_content.
+        self._old_mode = old_mode  # pylint: disable=attribute-defined-outside-init
+        post_save.send(
+            sender=CourseEnrollment,
+            instance=self,
+            created=created,
+            update_fields=None,
+            raw=False,
+            using=self._state.db,
+        )
+        if activation_changed:
+            self.emit_event(EVENT_NAME_ENROLLMENT_ACTIVATED)
+        if mode_changed:
+            self.emit_event(EVENT_NAME_ENROLLMENT_MODE_CHANGED)
+            ENROLLMENT_TRACK_UPDATED.send(
+                sender=None,
+                user=self.user,
+                course_key=self.course_id,
+                countdown=SCORE_RECALCULATION_DELAY_ON_ENROLLMENT_UPDATE
+            )
+        self.send_signal(EnrollStatusChange.enroll)
+
     @classmethod
     def unenroll(cls, user, course_id, skip_refund=False):
         """
@@ -1873,11 +2008,16 @@ class CourseEnrollment(models.Model):
             return CourseEnrollmentState(None, None)
         enrollment_state = cls._get_enrollment_in_request_cache(user, course_key)
         if not enrollment_state:
-            try:
-                record = cls.objects.get(user=user, course_id=course_key)
-                enrollment_state = CourseEnrollmentState(record.mode, record.is_active)
-            except cls.DoesNotExist:
-                enrollment_state = CourseEnrollmentState(None, None)
+            enrollment_state = cls._get_enrollment_states_in_shared_cache([(user.id, course_key)]).get(
+                (user.id, course_key)
+            )
+            if not enrollment_state:
+                try:
+                    record = cls.objects.get(user=user, course_id=course_key)
+                    enrollment_state = CourseEnrollmentState(record.mode, record.is_active)
+                except cls.DoesNotExist:
+                    enrollment_state = CourseEnrollmentState(None, None)
+                cls._add_enrollment_to_shared_cache(user.id, course_key, enrollment_state)
             cls._update_enrollment_in_request_cache(user, course_key, enrollment_state)
         return enrollment_state
 
@@ -1891,11 +2031,52 @@ class CourseEnrollment(models.Model):
         # remove previously cached entries to keep memory usage low.
         RequestCache(cls.MODE_CACHE_NAMESPACE).clear()
 
-        records = cls.objects.filter(user__in=users, course_id=course_key).select_related('user')
-        cache = cls._get_mode_active_request_cache()
-        for record in records:
-            enrollment_state = CourseEnrollmentState(record.mode, record.is_active)
-            cls._update_enrollment(cache, record.user.id, course_key, enrollment_state)
+        cls._bulk_fetch_enrollment_states(
+            [(user.id, course_key) for user in users],
+            lambda user_ids, __: cls.objects.filter(user_id__in=user_ids, course_id=course_key),
+        )
+
+    @classmethod
+    def bulk_fetch_enrollment_states_for_user(cls, user, course_keys):
+        """
+        Bulk pre-fetches the enrollment states of the given user
+        for the given courses.
+        """
+        cls._bulk_fetch_enrollment_states(
+            [(user.id, course_key) for course_key in course_keys],
+            lambda __, missing_course_keys: cls.objects.filter(user_id=user.id, course_id__in=missing_course_keys),
+        )
+
+    @classmethod
+    def _bulk_fetch_enrollment_states(cls, user_course_keys, get_records):
+        """
+        Caches the enrollment states of the given (user id, course key)
+        pairs in the request cache, reading those that aren't in the
+        shared cache from the given function of the missing user ids and
+        course keys.
+
+        The states read from the database aren't added to the shared cache,
+        since adding them without overwriting newer states would take a
+        round trip per state.
+        """
+        enrollment_states = cls._get_enrollment_states_in_shared_cache(user_course_keys)
+        missing_keys = set(user_course_keys) - set(enrollment_states)
+        if missing_keys:
+            fetched_states = dict.fromkeys(missing_keys, CourseEnrollmentState(None, None))
+            records = get_records(
+                list({user_id for user_id, __ in missing_keys}),
+                list({course_key for __, course_key in missing_keys}),
+            )
+            for record in records:
+                if (record.user_id, record.course_id) in missing_keys:
+                    fetched_states[(record.user_id, record.course_id)] = CourseEnrollmentState(
+                        record.mode, record.is_active
+                    )
+            enrollment_states.update(fetched_states)
+
+        request_cache = cls._get_mode_active_request_cache()
+        for (user_id, course_key), enrollment_state in enrollment_states.iteritems():
+            cls._update_enrollment(request_cache, user_id, course_key, enrollment_state)
 
     @classmethod
     def _get_mode_active_request_cache(cls):
@@ -1928,17 +2109,74 @@ class CourseEnrollment(models.Model):
         """
         cache[(user_id, course_key)] = enrollment_state
 
+    @staticmethod
+    def _is_shared_enrollment_state_cache_enabled():
+        """
+        Returns whether enrollment states are cached across requests.
+        """
+        return settings.FEATURES.get('ENABLE_SHARED_ENROLLMENT_STATE_CACHE', False)
+
+    @classmethod
+    def _get_enrollment_states_in_shared_cache(cls, user_course_keys):
+        """
+        Returns a dict mapping those of the given (user id, course key)
+        pairs whose enrollment state is in the shared cache to their
+        CourseEnrollmentState.
+        """
+        if not user_course_keys or not cls._is_shared_enrollment_state_cache_enabled():
+            return {}
+        cache_keys = {
+            cls.cache_key_name(user_id, course_key): (user_id, course_key)
+            for user_id, course_key in user_course_keys
+        }
+        return {
+            cache_keys[cache_key]: CourseEnrollmentState(*cached_state)
+            for cache_key, cached_state in cache.get_many(cache_keys.keys()).iteritems()
+        }
+
+    @classmethod
+    def _add_enrollment_to_shared_cache(cls, user_id, course_key, enrollment_state):
+        """
+        Caches the user's enrollment state, as read from the database, in
+        the shared cache, unless a state was written there since.
+        """
+        if cls._is_shared_enrollment_state_cache_enabled():
+            cache.add(
+                cls.cache_key_name(user_id, course_key),
+                tuple(enrollment_state),
+                settings.ENROLLMENT_STATE_CACHE_TIMEOUT,
+            )
+
+    @classmethod
+    def _update_enrollment_in_shared_cache(cls, user_id, course_key, enrollment_state):
+        """
+        Updates the user's enrollment state in the shared cache once the
+        current transaction is committed, removing it in the meantime so
+        that the previous state isn't read from it.
+        """
+        if not cls._is_shared_enrollment_state_cache_enabled():
+            return
+        cache_key = cls.cache_key_name(user_id, course_key)
+        cache.delete(cache_key)
+        transaction.on_commit(
+            lambda: cache.set(cache_key, tuple(enrollment_state), settings.ENROLLMENT_STATE_CACHE_TIMEOUT)
+        )
+
 
 @receiver(models.signals.post_save, sender=CourseEnrollment)
 @receiver(models.signals.post_delete, sender=CourseEnrollment)
 def invalidate_enrollment_mode_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument, invalid-name
     """Invalidate the cache of CourseEnrollment model. """
 
-    cache_key = CourseEnrollment.cache_key_name(
-        instance.user.id,
-        text_type(instance.course_id)
+    if kwargs['signal'] is models.signals.post_delete:
+        enrollment_state = CourseEnrollmentState(None, None)
+    else:
+        enrollment_state = CourseEnrollmentState(instance.mode, instance.is_active)
+    CourseEnrollment._update_enrollment_in_shared_cache(  # pylint: disable=protected-access
+        instance.user_id,
+        instance.course_id,
+        enrollment_state,
     )
-    cache.delete(cache_key)
 
 
 class ManualEnrollmentAudit(models.Model):
@@ -1967,6 +2205,25 @@ class ManualEnrollmentAudit(models.Model):
             role=role,
         )
 
+    @classmethod
+    def bulk_create_manual_enrollment_audits(cls, user, audits, reason, role=None):
+        """
+        saves the student manual enrollment information of several enrollments
+
+        `audits` is a list of (email, state_transition, enrollment) tuples.
+        """
+        return cls.objects.bulk_create([
+            cls(
+                enrolled_by=user,
+                enrolled_email=email,
+                state_transition=state_transition,
+                reason=reason,
+                enrollment=enrollment,
+                role=role,
+            )
+            for email, state_transition, enrollment in audits
+        ])
+
     @classmethod
     def get_manual_enrollment_by_email(cls, email):
         """
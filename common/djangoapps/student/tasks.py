@@ -1,5 +1,5 @@
 """
-This file contains celery tasks for sending email
+This file contains celery tasks for sending email and enrollment signals
 """
 import logging
 
@@ -9,6 +9,8 @@ from celery.task import task  # pylint: disable=no-name-in-module, import-error
 from django.conf import settings
 from django.core import mail
 
+from student.models import CourseEnrollment
+
 log = logging.getLogger('edx.celery.task')
 
 
@@ -48,3 +50,31 @@ def send_activation_email(self, subject, message, from_address, dest_addr):
             exc_info=True
         )
         raise Exception
+
+
+@task()
+def send_bulk_enrollment_signals(enrollment_signals):
+    """
+    Sends the signals and tracking events of enrollments made by
+    CourseEnrollment.bulk_enroll.
+
+    `enrollment_signals` is a list of dicts with the enrollment_id of each
+    enrollment and the keyword arguments of its send_bulk_enrollment_signals.
+    """
+    enrollments = CourseEnrollment.objects.select_related('user').in_bulk(
+        [signals['enrollment_id'] for signals in enrollment_signals]
+    )
+    for signals in enrollment_signals:
+        signals = dict(signals)
+        enrollment = enrollments.get(signals.pop('enrollment_id'))
+        if enrollment is None:
+            # The enrollment was deleted since.
+            continue
+        try:
+            enrollment.send_bulk_enrollment_signals(**signals)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(
+                u'Unable to send enrollment signals for user %s in course %s',
+                enrollment.user_id,
+                enrollment.course_id,
+            )
@@ -5,12 +5,16 @@ import hashlib
 
 import ddt
 import factory
+import mock
 import pytz
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.core.cache import cache
+from django.db import IntegrityError
 from django.db.models import signals
 from django.db.models.functions import Lower
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from edx_django_utils.cache import RequestCache
 
 from course_modes.models import CourseMode
 from course_modes.tests.factories import CourseModeFactory
@@ -26,6 +30,7 @@ from student.models import (
     PendingEmailChange,
     ManualEnrollmentAudit,
     ALLOWEDTOENROLL_TO_ENROLLED,
+    EVENT_NAME_ENROLLMENT_ACTIVATED,
     PendingNameChange
 )
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
@@ -243,6 +248,103 @@ class CourseEnrollmentTests(SharedModuleStoreTestCase):
         self.assertTrue(enrollment_refetched.exists())
         self.assertEqual(enrollment_refetched.all()[0], enrollment)
 
+    def test_bulk_enroll(self):
+        CourseEnrollmentFactory.create(user=self.user_2, course_id=self.course.id, mode=CourseMode.AUDIT, is_active=False)
+        enrollments = CourseEnrollment.bulk_enroll([self.user, self.user_2], self.course.id, CourseMode.VERIFIED)
+
+        self.assertEqual(set(enrollments), {self.user.id, self.user_2.id})
+        for user in (self.user, self.user_2):
+            enrollment = CourseEnrollment.objects.get(user=user, course_id=self.course.id)
+            self.assertEqual(enrollments[user.id], enrollment)
+            self.assertTrue(enrollment.is_active)
+            self.assertEqual(enrollment.mode, CourseMode.VERIFIED)
+            self.assertEqual(
+                CourseEnrollment.enrollment_mode_for_user(user, self.course.id),
+                (CourseMode.VERIFIED, True),
+            )
+
+    def test_bulk_enroll_links_course_enrollment_allowed(self):
+        CourseEnrollmentAllowed.objects.create(email=self.user.email, course_id=self.course.id)
+        CourseEnrollment.bulk_enroll([self.user], self.course.id)
+        self.assertEqual(
+            CourseEnrollmentAllowed.objects.get(email=self.user.email, course_id=self.course.id).user,
+            self.user,
+        )
+
+    @mock.patch('student.models.transaction.on_commit', lambda func: func())
+    def test_bulk_enroll_sends_signals(self):
+        CourseEnrollmentFactory.create(user=self.user_2, course_id=self.course.id, mode=CourseMode.AUDIT, is_active=True)
+        receiver = mock.Mock()
+        signals.post_save.connect(receiver, sender=CourseEnrollment)
+        self.addCleanup(signals.post_save.disconnect, receiver, sender=CourseEnrollment)
+
+        with mock.patch.object(CourseEnrollment, 'emit_event') as mock_emit_event:
+            CourseEnrollment.bulk_enroll([self.user, self.user_2], self.course.id, CourseMode.AUDIT)
+
+        self.assertEqual(
+            {(call[1]['instance'].user, call[1]['created']) for call in receiver.call_args_list},
+            {(self.user, True), (self.user_2, False)},
+        )
+        # Only the new enrollment was activated, and no mode was changed.
+        mock_emit_event.assert_called_once_with(EVENT_NAME_ENROLLMENT_ACTIVATED)
+
+    def test_bulk_enroll_conflict_falls_back_to_enroll(self):
+        with mock.patch.object(CourseEnrollment.objects, 'bulk_create', side_effect=IntegrityError):
+            enrollments = CourseEnrollment.bulk_enroll([self.user], self.course.id)
+        self.assertTrue(enrollments[self.user.id].is_active)
+        self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course.id))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    @mock.patch.dict(settings.FEATURES, {'ENABLE_SHARED_ENROLLMENT_STATE_CACHE': True})
+    @mock.patch('student.models.transaction.on_commit', lambda func: func())
+    def test_shared_enrollment_state_cache(self):
+        cache.clear()
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user, self.course.id), (None, None))
+
+        enrollment = CourseEnrollment.enroll(self.user, self.course.id, CourseMode.AUDIT)
+        RequestCache(CourseEnrollment.MODE_CACHE_NAMESPACE).clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                CourseEnrollment.enrollment_mode_for_user(self.user, self.course.id),
+                (CourseMode.AUDIT, True),
+            )
+
+        enrollment.update_enrollment(is_active=False)
+        RequestCache(CourseEnrollment.MODE_CACHE_NAMESPACE).clear()
+        with self.assertNumQueries(0):
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, self.course.id))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    @mock.patch.dict(settings.FEATURES, {'ENABLE_SHARED_ENROLLMENT_STATE_CACHE': True})
+    def test_bulk_fetch_enrollment_states(self):
+        cache.clear()
+        other_course = CourseFactory()
+        CourseEnrollmentFactory.create(user=self.user, course_id=self.course.id, mode=CourseMode.VERIFIED)
+        CourseEnrollmentFactory.create(user=self.user_2, course_id=other_course.id, is_active=False)
+
+        # States read in bulk aren't added to the shared cache.
+        for __ in range(2):
+            with self.assertNumQueries(1):
+                CourseEnrollment.bulk_fetch_enrollment_states([self.user, self.user_2], self.course.id)
+            RequestCache(CourseEnrollment.MODE_CACHE_NAMESPACE).clear()
+        self.assertIsNone(cache.get(CourseEnrollment.cache_key_name(self.user.id, self.course.id)))
+
+        # States read one at a time are, and are then read in bulk from it.
+        for user, course_key in ((self.user, self.course.id), (self.user_2, self.course.id),
+                                 (self.user_2, other_course.id)):
+            CourseEnrollment.enrollment_mode_for_user(user, course_key)
+        RequestCache(CourseEnrollment.MODE_CACHE_NAMESPACE).clear()
+
+        with self.assertNumQueries(0):
+            CourseEnrollment.bulk_fetch_enrollment_states([self.user, self.user_2], self.course.id)
+            CourseEnrollment.bulk_fetch_enrollment_states_for_user(self.user_2, [other_course.id])
+            self.assertEqual(
+                CourseEnrollment.enrollment_mode_for_user(self.user, self.course.id),
+                (CourseMode.VERIFIED, True),
+            )
+            self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.user_2, self.course.id), (None, None))
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user_2, other_course.id))
+
 
 class PendingNameChangeTests(SharedModuleStoreTestCase):
     """
@@ -581,6 +581,10 @@ def student_dashboard(request):
     # Get the org whitelist or the org blacklist for the current site
     site_org_whitelist, site_org_blacklist = get_org_black_and_whitelist_for_site()
     course_enrollments = list(get_course_enrollments(user, site_org_whitelist, site_org_blacklist))
+    # Prime the enrollment states checked by has_access for each course.
+    CourseEnrollment.bulk_fetch_enrollment_states_for_user(
+        user, [enrollment.course_id for enrollment in course_enrollments]
+    )
 
     # Get the entitlements for the user and a mapping to all available sessions for that entitlement
     # If an entitlement has no available sessions, pass through a mock course overview object
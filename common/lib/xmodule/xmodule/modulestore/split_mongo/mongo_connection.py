@@ -3,18 +3,21 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 """
 import datetime
 import cPickle as pickle
+import itertools
 import math
 import zlib
 import pymongo
 import pytz
 import re
 from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 from time import time
 
 # Import this just to export it
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -24,6 +27,7 @@ import logging
 
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
+from openedx.core.lib.cache_utils import SizeBoundedLRUCache
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
@@ -43,6 +47,24 @@ def get_cache(alias):
     return caches[alias]
 
 
+_LOCAL_CACHE = None
+
+
+def get_local_cache():
+    """
+    Return the process-local cache of deserialized course structures, or
+    None if it is disabled by the COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES
+    setting.
+    """
+    global _LOCAL_CACHE  # pylint: disable=global-statement
+    max_size = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES', 0) if DJANGO_AVAILABLE else 0
+    if not max_size:
+        return None
+    if _LOCAL_CACHE is None or _LOCAL_CACHE.max_size != max_size:
+        _LOCAL_CACHE = SizeBoundedLRUCache(max_size)
+    return _LOCAL_CACHE
+
+
 def round_power_2(value):
     """
     Return value rounded up to the nearest power of 2.
@@ -208,6 +230,12 @@ class CourseStructureCache(object):
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
+    The deserialized course structures are also kept in a process-local
+    cache, in front of the django cache, if it is enabled by the
+    COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES setting. Since structures are
+    immutable, the same structure objects are returned to all callers, which
+    must copy a structure before modifying it (as version_structure does).
+
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
@@ -218,9 +246,18 @@ class CourseStructureCache(object):
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+        self.local_cache = get_local_cache()
 
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
+        """Pull the struct from the local cache, or the compressed, pickled struct data from cache and deserialize."""
+        if self.local_cache is not None:
+            with TIMER.timer("CourseStructureCache.get_local", course_context) as tagger:
+                structure = self.local_cache.get(key)
+                tagger.tag(from_cache=str(structure is not None).lower())
+                tagger.measure('local_cache_size', self.local_cache.size)
+                if structure is not None:
+                    return structure
+
         if self.cache is None:
             return None
 
@@ -238,16 +275,22 @@ class CourseStructureCache(object):
             pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
-            return pickle.loads(pickled_data)
+            structure = pickle.loads(pickled_data)
+            self._set_local(key, structure, len(pickled_data))
+            return structure
 
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
-        if self.cache is None:
+        if self.cache is None and self.local_cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
             pickled_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
             tagger.measure('uncompressed_size', len(pickled_data))
+            self._set_local(key, structure, len(pickled_data))
+
+            if self.cache is None:
+                return None
 
             # 1 = Fastest (slightly larger results)
             compressed_pickled_data = zlib.compress(pickled_data, 1)
@@ -256,6 +299,14 @@ class CourseStructureCache(object):
             # Stuctures are immutable, so we set a timeout of "never"
             self.cache.set(key, compressed_pickled_data, None)
 
+    def _set_local(self, key, structure, size):
+        """
+        Keep the deserialized structure in the local cache, if enabled. The size of
+        its pickled data is used as an estimate of its size.
+        """
+        if self.local_cache is not None:
+            self.local_cache.set(key, structure, size)
+
 
 class MongoConnection(object):
     """
@@ -263,11 +314,18 @@ class MongoConnection(object):
     """
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, **kwargs
+        asset_collection=None, retry_wait_time=0.1, definitions_batch_size=200, definitions_concurrency=4,
+        **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        Definitions are retrieved with queries of at most definitions_batch_size ids, up to
+        definitions_concurrency of which are issued concurrently.
         """
+        self.definitions_batch_size = definitions_batch_size
+        self.definitions_concurrency = definitions_concurrency
+
         # Set a write concern of 1, which makes writes complete successfully to the primary
         # only before returning. Also makes pymongo report write errors.
         kwargs['w'] = 1
@@ -544,8 +602,28 @@ class MongoConnection(object):
         """
         with TIMER.timer("get_definitions", course_context) as tagger:
             tagger.measure('definitions', len(definitions))
-            definitions = self.definitions.find({'_id': {'$in': definitions}})
-            return definitions
+            batches = [
+                definitions[index:index + self.definitions_batch_size]
+                for index in xrange(0, len(definitions), self.definitions_batch_size)
+            ]
+            if len(batches) <= 1:
+                return self.definitions.find({'_id': {'$in': definitions}})
+
+            # Each thread uses its own connection from the client's pool.
+            tagger.measure('batches', len(batches))
+            pool = ThreadPool(min(self.definitions_concurrency, len(batches)))
+            try:
+                results = pool.map(self._find_definitions, batches)
+            finally:
+                pool.close()
+                pool.join()
+            return list(itertools.chain.from_iterable(results))
+
+    def _find_definitions(self, definitions):
+        """
+        Retrieve the list of all definitions listed in `definitions`.
+        """
+        return list(self.definitions.find({'_id': {'$in': definitions}}))
 
     def insert_definition(self, definition, course_context=None):
         """
@@ -785,27 +785,74 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             # until they're actually needed.
             if not lazy:
                 # Non-lazy loading: Load all descendants by id.
-                descendent_definitions = self.get_definitions(
-                    course_key,
-                    [
-                        block.definition
-                        for block in new_module_data.itervalues()
-                    ]
-                )
-                # Turn definitions into a map.
-                definitions = {definition['_id']: definition
-                               for definition in descendent_definitions}
-
-                for block in new_module_data.itervalues():
-                    if block.definition in definitions:
-                        definition = definitions[block.definition]
-                        # convert_fields gets done later in the runtime's xblock_from_json
-                        block.fields.update(definition.get('fields'))
-                        block.definition_loaded = True
+                new_module_data = self._load_definitions(course_key, new_module_data)
 
             system.module_data.update(new_module_data)
             return system.module_data
 
+    def prefetch_definitions(self, system, base_block_ids, course_key, block_types, depth=0):
+        """
+        Loads the definitions of the blocks of the given types, among the given blocks and
+        their descendants out to depth, into the system's module data. This avoids lazily
+        loading these definitions one at a time when the blocks are loaded.
+
+        Arguments:
+            system: a CachingDescriptorSystem
+            base_block_ids: list of BlockIds to fetch
+            course_key: the destination course providing the context
+            block_types: the block types whose definitions are loaded
+            depth: how deep below these to prefetch
+        """
+        with self.bulk_operations(course_key, emit_signals=False):
+            descendants = {}
+            for block_id in base_block_ids:
+                descendants = self.descendants(
+                    system.course_entry.structure['blocks'],
+                    block_id,
+                    depth,
+                    descendants
+                )
+
+            blocks_to_load = {}
+            for block_key, block in descendants.iteritems():
+                block = system.module_data.get(block_key, block)
+                if block_key.type in block_types and block.definition is not None and not block.definition_loaded:
+                    blocks_to_load[block_key] = block
+
+            if blocks_to_load:
+                system.module_data.update(self._load_definitions(course_key, blocks_to_load))
+
+    def _load_definitions(self, course_key, module_data):
+        """
+        Returns a map of the given blocks to copies of their data with their definitions
+        loaded. All the definitions are fetched at once.
+
+        Arguments:
+            course_key: the destination course providing the context
+            module_data (dict): map of BlockKey to the block's data
+        """
+        definitions = {
+            definition['_id']: definition
+            for definition in self.get_definitions(
+                course_key,
+                [block.definition for block in module_data.itervalues()]
+            )
+        }
+
+        loaded_module_data = {}
+        for block_key, block in module_data.iteritems():
+            if block.definition in definitions:
+                definition = definitions[block.definition]
+                # Load the definition into a copy of the block's data, since the
+                # structure's blocks may be shared with other requests.
+                block = copy.copy(block)
+                # convert_fields gets done later in the runtime's xblock_from_json
+                block.fields = dict(block.fields)
+                block.fields.update(definition.get('fields'))
+                block.definition_loaded = True
+            loaded_module_data[block_key] = block
+        return loaded_module_data
+
     @contract(course_entry=CourseEnvelope, block_keys="list(BlockKey)", depth="int | None")
     def _load_items(self, course_entry, block_keys, depth=0, **kwargs):
         """
@@ -813,8 +860,11 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         Load the definitions into each block if lazy is in kwargs and is False;
         otherwise, do not load the definitions - they'll be loaded later when needed.
+        If prefetch_block_types is in kwargs, the definitions of the blocks of these
+        types are loaded at once, instead of later one at a time.
         """
         lazy = kwargs.pop('lazy', True)
+        prefetch_block_types = kwargs.pop('prefetch_block_types', None)
         should_cache_items = not lazy
 
         runtime = self._get_cache(course_entry.structure['_id'])
@@ -826,6 +876,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if should_cache_items:
             self.cache_items(runtime, block_keys, course_entry.course_key, depth, lazy)
 
+        if lazy and prefetch_block_types:
+            self.prefetch_definitions(runtime, block_keys, course_entry.course_key, prefetch_block_types, depth)
+
         with self.bulk_operations(course_entry.course_key, emit_signals=False):
             return [runtime.load_item(block_key, course_entry, **kwargs) for block_key in block_keys]
 
@@ -1137,6 +1190,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
     def get_course(self, course_id, depth=0, **kwargs):
         """
         Gets the course descriptor for the course identified by the locator
+
+        Pass prefetch_block_types (list of block types) to load the definitions of the
+        course's blocks of these types out to depth at once, rather than lazily one at a time.
         """
         if not isinstance(course_id, CourseLocator) or course_id.deprecated:
             # The supplied CourseKey is of the wrong type, so it can't possibly be stored in this modulestore.
@@ -1251,6 +1307,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 if present in the course.
                 False - if we want only those items which are in the course tree. This would ensure no orphans are
                 fetched.
+            prefetch_block_types (list): Optional block types whose definitions are loaded at
+                once for the returned items, rather than lazily one at a time.
         """
         if not isinstance(course_locator, CourseKey) or course_locator.deprecated:
             # The supplied courselike key is of the wrong type, so it can't possibly be stored in this modulestore.
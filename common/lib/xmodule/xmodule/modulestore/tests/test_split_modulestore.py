@@ -13,6 +13,7 @@ import os
 import ddt
 from contracts import contract
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
 from openedx.core.lib.tests import attr
@@ -32,6 +33,7 @@ from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import get_local_cache
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -751,6 +753,19 @@ class SplitModuleCourseTests(SplitModuleTest):
         course = modulestore().get_course(locator)
         self.assertNotEqual(course.location.version_guid, published_version)
 
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_get_course_prefetch_definitions(self, _from_json):
+        locator = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        course = modulestore().get_course(locator, depth=None, prefetch_block_types=['chapter'])
+
+        # the chapters' definitions are loaded, while other definitions are left to be lazily loaded
+        module_data = course.runtime.module_data
+        chapter_keys = [block_key for block_key in module_data if block_key.type == 'chapter']
+        self.assertTrue(chapter_keys)
+        for block_key in chapter_keys:
+            self.assertTrue(module_data[block_key].definition_loaded)
+        self.assertFalse(module_data[BlockKey.from_usage_key(course.location)].definition_loaded)
+
     def test_get_course_negative(self):
         # Now negative testing
         with self.assertRaises(InsufficientSpecificationError):
@@ -991,6 +1006,21 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    @override_settings(COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES=10 * 1024 * 1024)
+    def test_course_structure_local_cache(self, mock_get_cache):
+        # only use the local cache
+        mock_get_cache.side_effect = InvalidCacheBackendError
+        self.addCleanup(get_local_cache().clear)
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # the deserialized structure is kept in memory
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+        self.assertIs(cached_structure, not_cached_structure)
+
     def test_dummy_cache(self):
         with check_mongo_calls(1):
             not_cached_structure = self._get_structure(self.new_course)
@@ -1,5 +1,7 @@
 """ Test the behavior of split_mongo/MongoConnection """
 import unittest
+
+import ddt
 from mock import patch
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
 from xmodule.exceptions import HeartbeatFailure
@@ -19,3 +21,23 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+@ddt.ddt
+class TestGetDefinitions(unittest.TestCase):
+    """ Test that definitions are retrieved in batches """
+    shard = 2
+
+    @ddt.data((10, 1), (2, 3), (1, 5))
+    @ddt.unpack
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.connect_to_mongodb')
+    def test_get_definitions(self, batch_size, expected_queries, mock_connect):
+        definitions_collection = mock_connect.return_value.__getitem__.return_value
+        definitions_collection.find.side_effect = lambda query: [{'_id': _id} for _id in query['_id']['$in']]
+        conn = MongoConnection('db', 'collection', 'host', definitions_batch_size=batch_size)
+
+        definition_ids = range(5)
+        definitions = conn.get_definitions(definition_ids)
+
+        self.assertEqual(sorted(definition['_id'] for definition in definitions), definition_ids)
+        self.assertEqual(definitions_collection.find.call_count, expected_queries)
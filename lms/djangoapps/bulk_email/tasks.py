@@ -7,9 +7,11 @@ import json
 import logging
 import random
 import re
+import threading
 from collections import Counter
+from itertools import chain
 from smtplib import SMTPConnectError, SMTPDataError, SMTPException, SMTPServerDisconnected
-from time import sleep
+from time import sleep, time
 
 from boto.exception import AWSConnectionError
 from boto.ses.exceptions import (
@@ -35,10 +37,11 @@ from django.core.mail.message import forbid_multi_line_headers
 from django.urls import reverse
 from django.utils.translation import override as override_language
 from django.utils.translation import ugettext as _
+from edx_django_utils.monitoring import set_custom_metric
 from markupsafe import escape
 from six import text_type
 
-from bulk_email.models import CourseEmail, Optout
+from bulk_email.models import COURSE_EMAIL_MESSAGE_BODY_TAG, CourseEmail, Optout
 from courseware.courses import get_course
 from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.subtasks import (
@@ -49,7 +52,10 @@ from lms.djangoapps.instructor_task.subtasks import (
 )
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.lib.courses import course_image_url
+from openedx.core.lib.mail_utils import wrap_message
+from student.models import AnonymousUserId, anonymous_id_for_user
 from util.date_utils import get_default_time_display
+from util.keyword_substitution import substitute_keywords
 
 log = logging.getLogger('edx.celery.task')
 
@@ -342,13 +348,13 @@ def _filter_optouts_from_recipients(to_list, course_id):
     optouts = Optout.objects.filter(
         course_id=course_id,
         user__in=[i['pk'] for i in to_list]
-    ).values_list('user__email', flat=True)
+    ).values_list('user_id', flat=True)
     optouts = set(optouts)
     # Only count the num_optout for the first time the optouts are calculated.
     # We assume that the number will not change on retries, and so we don't need
     # to calculate it each time.
     num_optout = len(optouts)
-    to_list = [recipient for recipient in to_list if recipient['email'] not in optouts]
+    to_list = [recipient for recipient in to_list if recipient['pk'] not in optouts]
     return to_list, num_optout
 
 
@@ -420,6 +426,163 @@ def _get_source_address(course_id, course_title, course_language, truncate=True)
     return from_addr
 
 
+def _is_pipelined_sending_enabled():
+    """
+    Returns whether bulk course emails are sent from messages rendered once
+    per subtask, over a persistent connection.
+    """
+    return settings.FEATURES.get('ENABLE_PIPELINED_BULK_EMAIL', False)
+
+
+class _CourseEmailRenderer(object):
+    """
+    Renders the messages of a course email for each of a list of recipients.
+
+    The plaintext and HTML messages are rendered once, as
+    CourseEmailTemplate.render_plaintext and render_htmltext render them, but
+    with placeholders for the values that are specific to each recipient,
+    which are then substituted for each recipient.
+    """
+    PLACEHOLDER = u'\x00{}\x00'
+    RECIPIENT_KEYS = ('name', 'email', 'user_id', 'anonymous_user_id')
+
+    def __init__(self, course_email, course_email_template, global_email_context, to_list):
+        placeholders = {key: self.PLACEHOLDER.format(key) for key in self.RECIPIENT_KEYS}
+        email_context = dict(global_email_context, course_id=course_email.course_id)
+        html_email_context = {
+            key: escape(value) if isinstance(value, basestring) else value
+            for key, value in email_context.iteritems()
+        }
+        self._plaintext_lines = self._render(
+            course_email_template.plain_template, course_email.text_message, email_context, placeholders
+        )
+        self._html_lines = self._render(
+            course_email_template.html_template, course_email.html_message, html_email_context, placeholders
+        )
+
+        self._anonymous_user_ids = {}
+        if any(
+            placeholders['anonymous_user_id'] in line
+            for line in chain(self._plaintext_lines, self._html_lines)
+        ):
+            self._anonymous_user_ids = self._get_anonymous_user_ids([recipient['pk'] for recipient in to_list])
+
+    def render(self, recipient):
+        """
+        Returns the plaintext and HTML messages for the given recipient of
+        the to_list.
+        """
+        values = {
+            'name': text_type(recipient['profile__name']),
+            'email': recipient['email'],
+            'user_id': text_type(recipient['pk']),
+            'anonymous_user_id': self._anonymous_user_ids.get(recipient['pk'], u''),
+        }
+        html_values = {key: escape(value) for key, value in values.iteritems()}
+        return self._substitute(self._plaintext_lines, values), self._substitute(self._html_lines, html_values)
+
+    @classmethod
+    def _render(cls, format_string, message_body, email_context, placeholders):
+        """
+        Returns the lines of the message rendered from the given template,
+        message body and context, with placeholders for the recipient's values.
+        Lines without placeholders are already wrapped.
+        """
+        message_body = message_body.replace(
+            '%%USER_ID%%', placeholders['anonymous_user_id']
+        ).replace(
+            '%%USER_FULLNAME%%', placeholders['name']
+        )
+        message_body = substitute_keywords(message_body, None, email_context)
+
+        result = format_string.format(**dict(email_context, **placeholders))
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        result = result.replace(message_body_tag, message_body, 1)
+        return [
+            line if u'\x00' in line else wrap_message(line)
+            for line in result.split('\n')
+        ]
+
+    @classmethod
+    def _substitute(cls, lines, values):
+        """
+        Returns the message with the given lines, with the recipient's values
+        substituted for their placeholders, wrapped.
+        """
+        substituted_lines = []
+        for line in lines:
+            if u'\x00' in line:
+                for key, value in values.iteritems():
+                    line = line.replace(cls.PLACEHOLDER.format(key), value)
+                line = wrap_message(line)
+            substituted_lines.append(line)
+        return u'\n'.join(substituted_lines)
+
+    @staticmethod
+    def _get_anonymous_user_ids(user_ids):
+        """
+        Returns a dict mapping the given user ids to the anonymous ids that
+        are substituted for %%USER_ID%%, saving those that aren't saved yet.
+        """
+        anonymous_user_ids = {
+            user_id: anonymous_id_for_user(User(id=user_id), None, save=False)
+            for user_id in user_ids
+        }
+        saved_anonymous_user_ids = set(AnonymousUserId.objects.filter(
+            anonymous_user_id__in=anonymous_user_ids.values()
+        ).values_list('anonymous_user_id', flat=True))
+        for user_id, anonymous_user_id in anonymous_user_ids.iteritems():
+            if anonymous_user_id not in saved_anonymous_user_ids:
+                anonymous_id_for_user(User(id=user_id), None)
+        return anonymous_user_ids
+
+
+class _PersistentConnection(threading.local):
+    """
+    The email backend connection of the current worker thread, kept open
+    across send_course_email subtasks when bulk email sending is pipelined.
+
+    Since servers close idle connections, a connection that has been idle
+    for more than BULK_EMAIL_CONNECTION_MAX_IDLE seconds is reopened.
+    """
+    def __init__(self):
+        super(_PersistentConnection, self).__init__()
+        self._connection = None
+        self._last_used = None
+
+    def get(self):
+        """
+        Returns the open connection, opening a new one if needed.
+        """
+        if self._connection is not None and time() - self._last_used > settings.BULK_EMAIL_CONNECTION_MAX_IDLE:
+            self.discard()
+        if self._connection is None:
+            self._connection = get_connection()
+            self._connection.open()
+        self._last_used = time()
+        return self._connection
+
+    def release(self):
+        """
+        Leaves the connection open for the next subtask.
+        """
+        self._last_used = time()
+
+    def discard(self):
+        """
+        Closes the connection, e.g. after an error that may have broken it.
+        """
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:  # pylint: disable=broad-except
+                log.warning("Failed to close bulk email connection", exc_info=True)
+
+
+_persistent_connection = _PersistentConnection()
+
+
 def _send_course_email(entry_id, email_id, to_list, global_email_context, subtask_status):
     """
     Performs the email sending task.
@@ -439,7 +602,9 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
       * `subtask_status` : object of class SubtaskStatus representing current status.
 
     Sends to all addresses contained in to_list that are not also in the Optout table.
-    Emails are sent multi-part, in both plain text and html.
+    Emails are sent multi-part, in both plain text and html.  If bulk email sending is
+    pipelined, the messages are rendered once for all recipients by _CourseEmailRenderer,
+    and sent over the worker's _PersistentConnection.
 
     Returns a tuple of two values:
       * First value is a SubtaskStatus object which represents current progress at the end of this call.
@@ -495,9 +660,17 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
+    pipelined = _is_pipelined_sending_enabled()
+    keep_connection = False
+    start_time = time()
     try:
-        connection = get_connection()
-        connection.open()
+        if pipelined:
+            connection = _persistent_connection.get()
+            renderer = _CourseEmailRenderer(course_email, course_email_template, global_email_context, to_list)
+        else:
+            connection = get_connection()
+            connection.open()
+            renderer = None
 
         # Define context values to use in all course emails:
         email_context = {'name': '', 'email': ''}
@@ -525,14 +698,17 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                 subtask_status.increment(failed=1)
                 continue
 
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
+            if renderer is not None:
+                plaintext_msg, html_msg = renderer.render(current_recipient)
+            else:
+                email_context['email'] = email
+                email_context['name'] = current_recipient['profile__name']
+                email_context['user_id'] = current_recipient['pk']
+                email_context['course_id'] = course_email.course_id
 
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
+                # Construct message content using templates and context:
+                plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
+                html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
 
             # Create email:
             email_msg = EmailMultiAlternatives(
@@ -637,16 +813,21 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             recipients_info[email] += 1
             to_list.pop()
 
+        duration = time() - start_time
+        messages_per_second = total_recipients_successful / duration if duration > 0 else 0
+        set_custom_metric('bulk_email.messages_sent', total_recipients_successful)
+        set_custom_metric('bulk_email.messages_per_second', messages_per_second)
         log.info(
             "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Successful Recipients: %s/%s, \
-            Failed Recipients: %s/%s",
+            Failed Recipients: %s/%s, Messages/sec: %.1f",
             parent_task_id,
             task_id,
             email_id,
             total_recipients_successful,
             total_recipients,
             total_recipients_failed,
-            total_recipients
+            total_recipients,
+            messages_per_second
         )
         duplicate_recipients = ["{0} ({1})".format(email, repetition)
                                 for email, repetition in recipients_info.most_common() if repetition > 1]
@@ -708,11 +889,18 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         # All went well.  Update counters with progress to date,
         # and set the state to SUCCESS:
         subtask_status.increment(state=SUCCESS)
+        keep_connection = True
         # Successful completion is marked by an exception value of None.
         return subtask_status, None
     finally:
-        # Clean up at the end.
-        connection.close()
+        # Clean up at the end.  A persistent connection is only kept open if
+        # no error could have broken it.
+        if not pipelined:
+            connection.close()
+        elif keep_connection:
+            _persistent_connection.release()
+        else:
+            _persistent_connection.discard()
 
 
 def _get_current_task():
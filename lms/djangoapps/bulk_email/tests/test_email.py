@@ -9,6 +9,7 @@ from unittest import skipIf
 import ddt
 from django.conf import settings
 from django.core import mail
+from django.core.mail import get_connection
 from django.core.mail.message import forbid_multi_line_headers
 from django.core.management import call_command
 from django.urls import reverse
@@ -18,7 +19,7 @@ from markupsafe import escape
 from mock import Mock, patch
 
 from bulk_email.models import BulkEmailFlag, Optout
-from bulk_email.tasks import _get_course_email_context, _get_source_address
+from bulk_email.tasks import _get_course_email_context, _get_source_address, _persistent_connection
 from course_modes.models import CourseMode
 from courseware.tests.factories import InstructorFactory, StaffFactory
 from enrollment.api import update_enrollment
@@ -597,6 +598,41 @@ class TestEmailSendFromDashboardMockedHtmlToText(EmailSendFromDashboardTestCase)
                                 [s.email for s in added_users if s not in optouts])
         self.assertItemsEqual(outbox_contents, should_send_contents)
 
+    @override_settings(BULK_EMAIL_EMAILS_PER_TASK=3)
+    def test_pipelined_sending(self):
+        """
+        Test that pipelined sending sends the same messages, over a single connection
+        """
+        test_email = {
+            'action': 'Send email',
+            'send_to': '["myself", "staff", "learners"]',
+            'subject': 'test subject for all',
+            'message': 'Dear %%USER_FULLNAME%% (%%USER_ID%%), welcome to %%COURSE_DISPLAY_NAME%%'
+        }
+
+        def send_messages(pipelined):
+            """Sends the test email, and returns its messages by recipient."""
+            mail.outbox = []
+            with patch.dict(settings.FEATURES, {'ENABLE_PIPELINED_BULK_EMAIL': pipelined}):
+                with patch('bulk_email.tasks.get_connection', wraps=get_connection) as mock_get_connection:
+                    response = self.client.post(self.send_mail_url, test_email)
+            self.assertEquals(json.loads(response.content), self.success_content)
+            messages = {
+                message.to[0]: (message.subject, message.body, message.alternatives)
+                for message in mail.outbox
+            }
+            return messages, mock_get_connection.call_count
+
+        self.addCleanup(_persistent_connection.discard)
+        messages, num_connections = send_messages(pipelined=False)
+        pipelined_messages, pipelined_num_connections = send_messages(pipelined=True)
+
+        self.assertEquals(len(messages), 1 + len(self.staff) + len(self.students))
+        self.assertEquals(pipelined_messages, messages)
+        self.assertEquals(num_connections, 5)
+        self.assertEquals(pipelined_num_connections, 1)
+        self.assertIn(self.students[0].profile.name, messages[self.students[0].email][2][0][0])
+
 
 @attr(shard=1)
 @skipIf(os.environ.get("TRAVIS") == 'true', "Skip this test in Travis CI.")
@@ -99,3 +99,55 @@ def get_course_blocks(
         starting_block_usage_key,
         collected_block_structure,
     )
+
+
+def get_course_blocks_for_users(
+        users,
+        starting_block_usage_key,
+        transformers=None,
+        collected_block_structure=None,
+):
+    """
+    A batch version of get_course_blocks, returning a transformed block
+    structure for each of the given users. The collected block structure
+    is transformed only once for all users for whom the transformers'
+    results are the same, such as users with the same group memberships.
+
+    Note: Users sharing a transformed block structure get the same
+    object, so the returned block structures must not be modified.
+
+    Arguments:
+        users ([django.contrib.auth.models.User]) - User objects for
+            which the block structure is to be transformed.
+
+        starting_block_usage_key (UsageKey) - See get_course_blocks.
+
+        transformers (BlockStructureTransformers) - See
+            get_course_blocks.
+
+        collected_block_structure (BlockStructureBlockData) - See
+            get_course_blocks.
+
+    Returns:
+        [BlockStructureBlockData] - The transformed block structures, in
+            the order of the given users.
+    """
+    course_key = starting_block_usage_key.course_key
+    block_structure_manager = get_block_structure_manager(course_key)
+    collected_block_structure = collected_block_structure or block_structure_manager.get_collected()
+
+    if not transformers:
+        if has_individual_student_override_provider():
+            # The default transformers include a user-specific override transformer.
+            return [
+                get_course_blocks(user, starting_block_usage_key, None, collected_block_structure)
+                for user in users
+            ]
+        transformers = BlockStructureTransformers(get_course_block_access_transformers(user=None))
+
+    return block_structure_manager.get_transformed_for_usage_infos(
+        transformers,
+        [CourseUsageInfo(course_key, user) for user in users],
+        starting_block_usage_key,
+        collected_block_structure,
+    )
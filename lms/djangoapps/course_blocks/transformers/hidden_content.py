@@ -105,9 +105,9 @@ class HiddenContentTransformer(FilteringTransformerMixin, BlockStructureTransfor
         be hidden, given the current time.
         """
         hide_after_due = self._get_merged_hide_after_due(block_structure, block_key)
-        self_paced = block_structure[block_structure.root_block_usage_key].self_paced
+        self_paced = block_structure.get_xblock_field(block_structure.root_block_usage_key, 'self_paced')
         if self_paced:
-            hidden_date = block_structure[block_structure.root_block_usage_key].end
+            hidden_date = block_structure.get_xblock_field(block_structure.root_block_usage_key, 'end')
         else:
             hidden_date = self._get_merged_due_date(block_structure, block_key)
         return not SequenceModule.verify_current_content_visibility(hidden_date, hide_after_due)
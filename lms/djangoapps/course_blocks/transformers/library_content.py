@@ -24,8 +24,8 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
 
     Staff users are *not* exempted from library content pathways.
     """
-    WRITE_VERSION = 1
-    READ_VERSION = 1
+    WRITE_VERSION = 2
+    READ_VERSION = 2
 
     @classmethod
     def name(cls):
@@ -58,21 +58,46 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
 
         # For each block check if block is library_content.
         # If library_content add children array to content_library_children field
+        library_content_block_keys = []
         for block_key in block_structure.topological_traversal(
                 filter_func=lambda block_key: block_key.block_type == 'library_content',
                 yield_descendants_of_unyielded=True,
         ):
+            library_content_block_keys.append(block_key)
             xblock = block_structure.get_xblock(block_key)
             for child_key in xblock.children:
                 summary = summarize_block(child_key)
                 block_structure.set_transformer_block_field(child_key, cls, 'block_analytics_summary', summary)
 
+        # Stored so that transforms don't scan all the blocks for each user.
+        block_structure.set_transformer_data(cls, 'library_content_block_keys', library_content_block_keys)
+
+    def _get_library_content_block_keys(self, block_structure):
+        """
+        Returns the usage keys of the library_content blocks in the given
+        block structure.
+        """
+        return [
+            block_key
+            for block_key in block_structure.get_transformer_data(self, 'library_content_block_keys')
+            if block_key in block_structure
+        ]
+
+    def usage_info_key(self, usage_info, block_structure):
+        """
+        The selected library content is specific to each user, so the
+        transform is only shared by all users of courses without any
+        library content.
+        """
+        for block_key in self._get_library_content_block_keys(block_structure):
+            if block_structure.get_children(block_key):
+                return None
+        return ()
+
     def transform_block_filters(self, usage_info, block_structure):
         all_library_children = set()
         all_selected_children = set()
-        for block_key in block_structure:
-            if block_key.block_type != 'library_content':
-                continue
+        for block_key in self._get_library_content_block_keys(block_structure):
             library_children = block_structure.get_children(block_key)
             if library_children:
                 all_library_children.update(library_children)
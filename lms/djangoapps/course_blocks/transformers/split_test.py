@@ -72,6 +72,12 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
                 group = child_to_group.get(child_location, None)
                 child.group_access[partition_for_this_block.id] = [group] if group is not None else []
 
+    def usage_info_key(self, usage_info, block_structure):
+        """
+        The split_test modules are removed for all users.
+        """
+        return ()
+
     def transform_block_filters(self, usage_info, block_structure):
         """
         Mutates block_structure based on the given usage_info.
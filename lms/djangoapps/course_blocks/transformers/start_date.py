@@ -2,10 +2,12 @@
 Start Date Transformer implementation.
 """
 from lms.djangoapps.courseware.access_utils import check_start_date
+from lms.djangoapps.courseware.masquerade import get_course_masquerade
 from openedx.core.djangoapps.content.block_structure.transformer import (
     BlockStructureTransformer,
     FilteringTransformerMixin
 )
+from student.roles import CourseBetaTesterRole
 from xmodule.course_metadata_utils import DEFAULT_START_DATE
 
 from .utils import collect_merged_date_field
@@ -67,6 +69,18 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
             func_merge_ancestors=max,
         )
 
+    def usage_info_key(self, usage_info, block_structure):
+        """
+        The start dates depend only on whether the user has staff access
+        and whether the user is a beta tester of the course, unless the
+        user is masquerading.
+        """
+        if usage_info.has_staff_access:
+            return (True, None)
+        if get_course_masquerade(usage_info.user, usage_info.course_key):
+            return None
+        return (False, CourseBetaTesterRole(usage_info.course_key).has_user(usage_info.user))
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Start Date check.
         if usage_info.has_staff_access:
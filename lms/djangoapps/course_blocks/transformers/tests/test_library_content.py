@@ -2,7 +2,7 @@
 Tests for ContentLibraryTransformer.
 """
 
-from openedx.core.djangoapps.content.block_structure.api import clear_course_from_cache
+from openedx.core.djangoapps.content.block_structure.api import clear_course_from_cache, get_course_in_cache
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from student.tests.factories import CourseEnrollmentFactory
 
@@ -165,3 +165,14 @@ class ContentLibraryTransformerTestCase(CourseStructureTestCase):
                 ),
                 "Expected 'selected' equality failed in iteration {}.".format(i)
             )
+
+    def test_library_content_block_keys_collected(self):
+        """
+        Test that the library_content blocks are found once at collect time
+        rather than by scanning all the blocks of each user's structure.
+        """
+        collected_block_structure = get_course_in_cache(self.course.id)
+        self.assertEqual(
+            collected_block_structure.get_transformer_data(ContentLibraryTransformer, 'library_content_block_keys'),
+            [self.blocks['library_content1'].location],
+        )
@@ -2,6 +2,7 @@
 User Partitions Transformer
 """
 from lms.djangoapps.courseware.access import has_access
+from lms.djangoapps.courseware.masquerade import get_course_masquerade
 from openedx.core.djangoapps.content.block_structure.transformer import (
     BlockStructureTransformer,
     FilteringTransformerMixin
@@ -70,6 +71,24 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
             merged_group_access = _MergedGroupAccess(user_partitions, xblock, merged_parent_access_list)
             block_structure.set_transformer_block_field(block_key, cls, 'merged_group_access', merged_group_access)
 
+    def usage_info_key(self, usage_info, block_structure):
+        """
+        The group access depends only on the user's group in each of the
+        course's partitions and whether the user has staff access, unless
+        the user is masquerading.
+        """
+        user_partitions = block_structure.get_transformer_data(self, 'user_partitions')
+        if not user_partitions:
+            return ()
+        if get_course_masquerade(usage_info.user, usage_info.course_key):
+            return None
+
+        user_groups = get_user_partition_groups(usage_info.course_key, user_partitions, usage_info.user, 'id')
+        return (
+            usage_info.has_staff_access,
+            tuple(sorted((partition_id, group.id) for partition_id, group in user_groups.iteritems())),
+        )
+
     def transform_block_filters(self, usage_info, block_structure):
         user = usage_info.user
         result_list = SplitTestTransformer().transform_block_filters(usage_info, block_structure)
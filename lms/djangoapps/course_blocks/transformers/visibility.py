@@ -59,6 +59,12 @@ class VisibilityTransformer(FilteringTransformerMixin, BlockStructureTransformer
             merged_field_name=cls.MERGED_VISIBLE_TO_STAFF_ONLY,
         )
 
+    def usage_info_key(self, usage_info, block_structure):
+        """
+        The visibility depends only on whether the user has staff access.
+        """
+        return usage_info.has_staff_access
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Visibility check.
         if usage_info.has_staff_access:
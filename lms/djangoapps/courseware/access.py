@@ -15,11 +15,13 @@ from datetime import datetime
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from edx_django_utils import monitoring as monitoring_utils
 from pytz import UTC
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from six import text_type
 from xblock.core import XBlock
 
+from courseware.access_context import AccessContext
 from courseware.access_response import (
     MilestoneAccessError,
     MobileAvailabilityError,
@@ -130,6 +132,8 @@ def has_access(user, action, obj, course_key=None):
     Returns an AccessResponse object.  It is up to the caller to actually
     deny access in a way that makes sense in context.
     """
+    monitoring_utils.accumulate(u'courseware.access_checks', 1)
+
     # Just in case user is passed in as None, make them anonymous
     if not user:
         user = AnonymousUser()
@@ -207,7 +211,11 @@ def _can_view_courseware_with_prerequisites(user, course):
         _is_prerequisites_disabled()
         or _has_staff_access_to_descriptor(user, course, course.id)
         or user.is_anonymous
-        or _has_fulfilled_prerequisites(user, [course.id])
+        or _memoize_access_check(
+            user, course.id, 'prerequisites', None,
+            lambda: _has_fulfilled_prerequisites(user, [course.id]),
+            masquerade_dependent=False,
+        )
     )
 
 
@@ -506,10 +514,9 @@ def _has_group_access(descriptor, user, course_key):
     # If missing_groups is NOT empty, we generate an error based on one of the particular groups they are missing.
     missing_groups = []
     for partition, groups in partition_groups:
-        user_group = partition.scheme.get_group_for_user(
-            course_key,
-            user,
-            partition,
+        user_group = _memoize_access_check(
+            user, course_key, 'partition_group', partition.id,
+            lambda: partition.scheme.get_group_for_user(course_key, user, partition),  # pylint: disable=cell-var-from-loop
         )
         if user_group not in groups:
             missing_groups.append((partition, user_group, groups))
@@ -574,7 +581,10 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
         'instructor': lambda: _has_instructor_access_to_descriptor(user, descriptor, course_key)
     }
 
-    return _dispatch(checkers, action, user, descriptor)
+    return _memoize_access_check(
+        user, course_key, 'descriptor', (descriptor.location, action),
+        lambda: _dispatch(checkers, action, user, descriptor),
+    )
 
 
 def _has_access_xmodule(user, action, xmodule, course_key):
@@ -664,6 +674,17 @@ def _has_access_string(user, action, perm):
 
 #####  Internal helper methods below
 
+def _memoize_access_check(user, course_key, name, key, compute, masquerade_dependent=True):
+    """
+    Helper: return compute(), memoized in the user's AccessContext for the
+    course if access checks are memoized. See AccessContext.memoize.
+    """
+    access_context = AccessContext.get(user, course_key)
+    if access_context is None:
+        return compute()
+    return access_context.memoize(user, name, key, compute, masquerade_dependent)
+
+
 def _dispatch(table, action, user, obj):
     """
     Helper: call table[action], raising a nice pretty error if there is no such key.
@@ -734,7 +755,11 @@ def _has_access_to_course(user, access_level, course_key):
     if is_masquerading_as_student(user, course_key):
         return ACCESS_DENIED
 
-    global_staff, staff_access, instructor_access = administrative_accesses_to_course_for_user(user, course_key)
+    global_staff, staff_access, instructor_access = _memoize_access_check(
+        user, course_key, 'administrative_accesses', None,
+        lambda: administrative_accesses_to_course_for_user(user, course_key),
+        masquerade_dependent=False,
+    )
 
     if global_staff:
         debug("Allow: user.is_staff")
@@ -839,7 +864,12 @@ def _has_fulfilled_all_milestones(user, course_id):
         course_id: ID of the course to check
         user_id: ID of the user to check
     """
-    return MilestoneAccessError() if any_unfulfilled_milestones(course_id, user.id) else ACCESS_GRANTED
+    unfulfilled_milestones = _memoize_access_check(
+        user, course_id, 'unfulfilled_milestones', None,
+        lambda: any_unfulfilled_milestones(course_id, user.id),
+        masquerade_dependent=False,
+    )
+    return MilestoneAccessError() if unfulfilled_milestones else ACCESS_GRANTED
 
 
 def _has_fulfilled_prerequisites(user, course_id):
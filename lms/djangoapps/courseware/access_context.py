@@ -0,0 +1,91 @@
+"""
+Per-request memoization of the access checks of a user in a course, used by
+courseware.access.has_access when FEATURES['ENABLE_ACCESS_CONTEXT'] is on.
+
+An AccessContext evaluates the user's administrative roles and milestones in
+the course once per request, and memoizes the user's partition groups and
+the results of block access checks under the user's current masquerade in
+the course, since masquerading changes both.
+"""
+from django.conf import settings
+from edx_django_utils import monitoring as monitoring_utils
+from edx_django_utils.cache import RequestCache
+
+from courseware.masquerade import get_course_masquerade
+
+
+class AccessContext(object):
+    """
+    The memoized access checks of a user in a course.
+    """
+    REQUEST_CACHE_NAMESPACE = u'courseware.access_context'
+
+    def __init__(self, user_id, course_key):
+        self.user_id = user_id
+        self.course_key = course_key
+        self._memo = {}
+
+    @staticmethod
+    def is_enabled():
+        """
+        Returns whether access checks are memoized per request.
+        """
+        return settings.FEATURES.get('ENABLE_ACCESS_CONTEXT', False)
+
+    @classmethod
+    def get(cls, user, course_key):
+        """
+        Returns the AccessContext of the user in the course for the current
+        request, or None if access checks aren't memoized.
+        """
+        if course_key is None or not cls.is_enabled():
+            return None
+        access_contexts = RequestCache(cls.REQUEST_CACHE_NAMESPACE).data
+        context_key = (user.id, course_key)
+        if context_key not in access_contexts:
+            access_contexts[context_key] = cls(user.id, course_key)
+        return access_contexts[context_key]
+
+    @classmethod
+    def clear(cls):
+        """
+        Clears the AccessContexts of the current request. Called by the
+        receivers in courseware.models when a user's roles, enrollment or
+        cohort change.
+        """
+        RequestCache(cls.REQUEST_CACHE_NAMESPACE).clear()
+
+    def memoize(self, user, name, key, compute, masquerade_dependent=True):
+        """
+        Returns the result of compute(), memoized under the given name and
+        key, and the user's current masquerade if `masquerade_dependent`.
+
+        Arguments:
+            user (User): The user of this context, as passed to has_access.
+            name (str): The name of the memoized check.
+            key: The key of the memoized check, e.g. a block's usage key.
+            compute (function): Returns the result of the check.
+            masquerade_dependent (bool): Whether the result depends on the
+                user's masquerade.
+        """
+        memo_key = (name, key, self._masquerade_key(user) if masquerade_dependent else None)
+        if memo_key in self._memo:
+            monitoring_utils.accumulate(u'courseware.access_checks.memoized', 1)
+            return self._memo[memo_key]
+        result = self._memo[memo_key] = compute()
+        return result
+
+    def _masquerade_key(self, user):
+        """
+        Returns a hashable representation of the user's current masquerade
+        in the course, or None if the user isn't masquerading.
+        """
+        course_masquerade = get_course_masquerade(user, self.course_key)
+        if course_masquerade is None:
+            return None
+        return (
+            course_masquerade.role,
+            course_masquerade.user_partition_id,
+            course_masquerade.group_id,
+            course_masquerade.user_name,
+        )
@@ -0,0 +1,140 @@
+"""
+A materialized per-user outline of a course's chapters and sections, built
+from the user's transformed course blocks, from which the courseware table of
+contents can be rendered without binding the course's XModules.
+
+Outlines are cached under the course's published version and a per-(user,
+course) version stamp, which is replaced when the user's enrollment track or
+cohort changes.  Since blocks become visible as their start dates pass,
+outlines are cached for COURSE_OUTLINE_CACHE_TIMEOUT seconds at most.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from xmodule.block_metadata_utils import display_name_with_default_escaped
+
+OUTLINE_CACHE_KEY = u'courseware.course_outline.{user_id}.{course_key}.{course_version}.{edited_on}.{user_version}'
+USER_VERSION_CACHE_KEY = u'courseware.course_outline.version.{user_id}.{course_key}'
+
+
+class OutlineBlock(object):
+    """
+    A chapter or section of a course outline, with the fields of its
+    XModule that the table of contents is rendered from.
+    """
+    def __init__(self, location, display_name, hide_from_toc, children=None, **section_fields):
+        self.location = location
+        self.display_name = display_name
+        self.hide_from_toc = hide_from_toc
+        self.children = children or []
+        self.format = section_fields.get('format')
+        self.due = section_fields.get('due')
+        self.graded = section_fields.get('graded', False)
+        self.is_time_limited = section_fields.get('is_time_limited', False)
+
+    @property
+    def url_name(self):
+        """
+        Returns the URL name of the block.
+        """
+        return self.location.block_id
+
+    @property
+    def display_name_with_default_escaped(self):
+        """
+        Returns the display name of the block, escaped as by its XModule.
+        """
+        return display_name_with_default_escaped(self)
+
+    def get_display_items(self):
+        """
+        Returns the children of the block that are shown to the user.
+        """
+        return self.children
+
+
+def is_course_outline_enabled():
+    """
+    Returns whether the table of contents is rendered from materialized
+    course outlines.
+    """
+    return settings.FEATURES.get('ENABLE_MATERIALIZED_COURSE_OUTLINE', False)
+
+
+def get_course_outline(user, course):
+    """
+    Returns the chapters of the course that are visible to the user, as
+    OutlineBlocks with their sections as children.
+
+    Arguments:
+        user (User): The user whose outline to return.
+        course (CourseDescriptor): The course.
+    """
+    user_version_cache_key = USER_VERSION_CACHE_KEY.format(user_id=user.id, course_key=course.id)
+    cache.add(user_version_cache_key, uuid4().hex, settings.COURSE_OUTLINE_CACHE_TIMEOUT)
+    user_version = cache.get(user_version_cache_key)
+    if user_version is None:
+        return _build_course_outline(user, course)
+
+    outline_cache_key = OUTLINE_CACHE_KEY.format(
+        user_id=user.id,
+        course_key=course.id,
+        course_version=getattr(course, 'course_version', None),
+        edited_on=getattr(course, 'subtree_edited_on', None),
+        user_version=user_version,
+    )
+    outline = cache.get(outline_cache_key)
+    if outline is None:
+        outline = _build_course_outline(user, course)
+        cache.set(outline_cache_key, outline, settings.COURSE_OUTLINE_CACHE_TIMEOUT)
+    return outline
+
+
+def invalidate_course_outline(user_id, course_key):
+    """
+    Invalidates the cached outline of the course for the user.
+    """
+    cache.delete(USER_VERSION_CACHE_KEY.format(user_id=user_id, course_key=course_key))
+
+
+def _build_course_outline(user, course):
+    """
+    Returns the chapters of the course that are visible to the user, read
+    from the user's transformed course blocks.
+    """
+    # Imported here to keep this module importable from courseware.models.
+    from lms.djangoapps.course_blocks.api import get_course_blocks
+
+    block_structure = get_course_blocks(user, course.location)
+    if course.location not in block_structure:
+        return []
+
+    get_field = block_structure.get_xblock_field
+    return [
+        OutlineBlock(
+            location=chapter_key,
+            display_name=get_field(chapter_key, 'display_name'),
+            hide_from_toc=get_field(chapter_key, 'hide_from_toc', False),
+            children=[
+                OutlineBlock(
+                    location=section_key,
+                    display_name=get_field(section_key, 'display_name'),
+                    hide_from_toc=get_field(section_key, 'hide_from_toc', False),
+                    format=get_field(section_key, 'format'),
+                    # Self-paced courses have their due dates removed by
+                    # SelfPacedDateOverrideProvider.
+                    due=None if course.self_paced else get_field(section_key, 'due'),
+                    graded=get_field(section_key, 'graded', False),
+                    # Special exams are time limited, but only is_timed_exam,
+                    # is_proctored_enabled and is_practice_exam are collected.
+                    is_time_limited=any(
+                        get_field(section_key, field_name, False)
+                        for field_name in ('is_timed_exam', 'is_proctored_enabled', 'is_practice_exam')
+                    ),
+                )
+                for section_key in block_structure.get_children(chapter_key)
+            ],
+        )
+        for chapter_key in block_structure.get_children(course.location)
+    ]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import coursewarehistoryextended.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courseware', '0007_remove_done_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentModuleHistoryOutbox',
+            fields=[
+                ('version', models.CharField(db_index=True, max_length=255, null=True, blank=True)),
+                ('created', models.DateTimeField(db_index=True)),
+                ('state', models.TextField(null=True, blank=True)),
+                ('grade', models.FloatField(null=True, blank=True)),
+                ('max_grade', models.FloatField(null=True, blank=True)),
+                ('id', coursewarehistoryextended.fields.UnsignedBigIntAutoField(serialize=False, primary_key=True)),
+                ('student_module', models.ForeignKey(to='courseware.StudentModule', on_delete=django.db.models.deletion.CASCADE)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -36,6 +36,7 @@ from xblock.exceptions import InvalidScopeError, KeyValueMultiSaveError
 from xblock.fields import Scope, UserScope
 from xblock.runtime import KeyValueStore
 
+from courseware.shared_user_state_cache import SharedUserStateCache
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from xmodule.modulestore.django import modulestore
 
@@ -350,6 +351,10 @@ class UserStateCache(object):
         self.course_id = course_id
         self.user = user
         self._client = DjangoXBlockUserStateClient(self.user)
+        if SharedUserStateCache.is_enabled() and self.user.is_authenticated:
+            self._shared_cache = SharedUserStateCache(self.user.id, self.course_id)
+        else:
+            self._shared_cache = None
 
     def cache_fields(self, fields, xblocks, aside_types):  # pylint: disable=unused-argument
         """
@@ -361,12 +366,30 @@ class UserStateCache(object):
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
+        block_keys = _all_usage_keys(xblocks, aside_types)
+        if self._shared_cache is not None:
+            for block_key, state in self._shared_cache.get_many(block_keys).iteritems():
+                block_keys.discard(block_key)
+                if state:
+                    self._cache[block_key] = state
+            if not block_keys:
+                return
+
         block_field_state = self._client.get_many(
             self.user.username,
-            _all_usage_keys(xblocks, aside_types),
+            block_keys,
         )
+        loaded_states = {}
         for user_state in block_field_state:
             self._cache[user_state.block_key] = user_state.state
+            loaded_states[user_state.block_key] = user_state.state
+
+        if self._shared_cache is not None:
+            # Blocks without state are cached too, as empty states.
+            self._shared_cache.set_many({
+                block_key: loaded_states.get(block_key, {})
+                for block_key in block_keys
+            })
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def set(self, kvs_key, value):
@@ -423,6 +446,8 @@ class UserStateCache(object):
             raise KeyValueMultiSaveError([])
         finally:
             self._cache.update(pending_updates)
+            if self._shared_cache is not None:
+                self._shared_cache.invalidate()
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def get(self, kvs_key):
@@ -462,6 +487,8 @@ class UserStateCache(object):
 
         self._client.delete(self.user.username, cache_key, fields=[kvs_key.field_name])
         del field_state[kvs_key.field_name]
+        if self._shared_cache is not None:
+            self._shared_cache.invalidate()
 
     @contract(kvs_key=DjangoKeyValueStore.Key, returns=bool)
     def has(self, kvs_key):
@@ -988,6 +1015,33 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create a ScoresClient with pre-fetched data for the given locations
+        for each of the given users, with a single query for all of them.
+
+        Returns a dict of user ids to ScoresClients.
+        """
+        clients = {}
+        for user_id in user_ids:
+            clients[user_id] = cls(course_id, user_id)
+            clients[user_id]._has_fetched = True  # pylint: disable=protected-access
+
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=set(user_ids),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total, created in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade', 'created'
+        ):
+            # pylint: disable=protected-access
+            clients[user_id]._locations_to_scores[location.map_into_course(course_id)] = cls.Score(
+                correct, total, created
+            )
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
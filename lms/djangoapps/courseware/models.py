@@ -16,16 +16,24 @@ import itertools
 import logging
 
 from config_models.models import ConfigurationModel
+from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from model_utils.models import TimeStampedModel
 from six import text_type
 
 import coursewarehistoryextended
+from courseware.course_outline import invalidate_course_outline
+from courseware.shared_user_state_cache import SharedUserStateCache
+from coursewarehistoryextended.fields import UnsignedBigIntAutoField
 from opaque_keys.edx.django.models import BlockTypeKeyField, CourseKeyField, UsageKeyField
+from openedx.core.djangoapps.course_groups.signals.signals import COHORT_MEMBERSHIP_UPDATED
+from student.signals import ENROLL_STATUS_CHANGE, ENROLLMENT_TRACK_UPDATED
 
 log = logging.getLogger("edx.courseware")
 
@@ -174,6 +182,16 @@ class StudentModule(models.Model):
             )
 
 
+@receiver([post_save, post_delete], sender=StudentModule)
+def invalidate_shared_user_state_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the shared cache of the user state of the StudentModule's
+    student in its course.
+    """
+    if SharedUserStateCache.is_enabled():
+        SharedUserStateCache.invalidate_for(instance.student_id, instance.course_id)
+
+
 class BaseStudentModuleHistory(models.Model):
     """Abstract class containing most fields used by any class
     storing Student Module History"""
@@ -206,7 +224,11 @@ class BaseStudentModuleHistory(models.Model):
         Find history objects across multiple backend stores for a given StudentModule
         """
 
-        history_entries = []
+        # Entries still queued for writing behind are more recent than
+        # any entry already in the history tables.
+        history_entries = list(StudentModuleHistoryOutbox.objects.filter(
+            student_module__in=[module.id for module in student_modules]
+        ).order_by('-id'))
 
         if settings.FEATURES.get('ENABLE_CSMH_EXTENDED'):
             history_entries += coursewarehistoryextended.models.StudentModuleHistoryExtended.objects.filter(
@@ -225,6 +247,51 @@ class BaseStudentModuleHistory(models.Model):
 
         return history_entries
 
+    @staticmethod
+    def bulk_save_history(student_modules):
+        """
+        Saves the history entries that the post_save receivers would have
+        saved for each of the given saved StudentModules, with a single
+        bulk_create per history table.  Used when StudentModules are
+        written in bulk, which doesn't send post_save.
+        """
+        student_modules = [
+            student_module for student_module in student_modules
+            if student_module.module_type in BaseStudentModuleHistory.HISTORY_SAVING_TYPES
+        ]
+        if not student_modules:
+            return
+
+        if history_write_behind_enabled():
+            StudentModuleHistoryOutbox.enqueue(student_modules)
+            return
+
+        for history_class in BaseStudentModuleHistory.active_history_classes():
+            history_class.objects.bulk_create([
+                history_class(
+                    student_module_id=student_module.id,
+                    version=None,
+                    created=student_module.modified,
+                    state=student_module.state,
+                    grade=student_module.grade,
+                    max_grade=student_module.max_grade,
+                )
+                for student_module in student_modules
+            ])
+
+    @staticmethod
+    def active_history_classes():
+        """
+        Returns the history models that StudentModule history entries are
+        currently written to.
+        """
+        history_classes = []
+        if apps.is_installed('coursewarehistoryextended'):
+            history_classes.append(coursewarehistoryextended.models.StudentModuleHistoryExtended)
+        if not settings.FEATURES.get('ENABLE_CSMH_EXTENDED'):
+            history_classes.append(StudentModuleHistory)
+        return history_classes
+
 
 class StudentModuleHistory(BaseStudentModuleHistory):
     """Keeps a complete history of state changes for a given XModule for a given
@@ -246,6 +313,8 @@ class StudentModuleHistory(BaseStudentModuleHistory):
         StudentModuleHistoryExtended entry if the module_type is one that
         we save.
         """
+        if history_write_behind_enabled():
+            return
         if instance.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES:
             history_entry = StudentModuleHistory(student_module=instance,
                                                  version=None,
@@ -262,6 +331,102 @@ class StudentModuleHistory(BaseStudentModuleHistory):
         post_save.connect(save_history, sender=StudentModule)
 
 
+class StudentModuleHistoryOutbox(BaseStudentModuleHistory):
+    """
+    A write-behind queue of StudentModule history entries, used instead of
+    writing to the history tables while saving StudentModules when the
+    ENABLE_CSMH_WRITE_BEHIND feature is enabled.  The queued entries are
+    moved to the history tables in bulk by the
+    flush_student_module_history task.
+    """
+
+    class Meta(object):
+        app_label = "courseware"
+
+    id = UnsignedBigIntAutoField(primary_key=True)  # pylint: disable=invalid-name
+
+    student_module = models.ForeignKey(StudentModule, db_index=True, on_delete=models.CASCADE)
+
+    def __unicode__(self):
+        return unicode(repr(self))
+
+    @classmethod
+    def enqueue(cls, student_modules):
+        """
+        Queues a history entry for each of the given saved StudentModules,
+        and schedules a flush of the queue once the current transaction
+        is committed.
+        """
+        cls.objects.bulk_create([
+            cls(
+                student_module_id=student_module.id,
+                version=None,
+                created=student_module.modified,
+                state=student_module.state,
+                grade=student_module.grade,
+                max_grade=student_module.max_grade,
+            )
+            for student_module in student_modules
+        ])
+        # Imported here since the tasks module imports this one.
+        from courseware.tasks import schedule_student_module_history_flush
+        transaction.on_commit(schedule_student_module_history_flush)
+
+    @classmethod
+    def flush(cls, batch_size):
+        """
+        Moves the queued history entries to the history tables, in
+        batches of batch_size and in the order they were queued, which
+        keeps the history of each StudentModule in order.  Concurrent
+        flushes are serialized by locking the rows of each batch.
+
+        Returns the number of entries flushed and the age in seconds of
+        the oldest one.
+        """
+        num_flushed = 0
+        max_lag = 0.0
+        while True:
+            with transaction.atomic():
+                entries = list(cls.objects.select_for_update().order_by('id')[:batch_size])
+                if not entries:
+                    break
+                for history_class in BaseStudentModuleHistory.active_history_classes():
+                    history_class.objects.bulk_create([
+                        history_class(
+                            student_module_id=entry.student_module_id,
+                            version=entry.version,
+                            created=entry.created,
+                            state=entry.state,
+                            grade=entry.grade,
+                            max_grade=entry.max_grade,
+                        )
+                        for entry in entries
+                    ])
+                cls.objects.filter(id__in=[entry.id for entry in entries]).delete()
+
+            num_flushed += len(entries)
+            max_lag = max(max_lag, (timezone.now() - entries[0].created).total_seconds())
+        return num_flushed, max_lag
+
+
+def history_write_behind_enabled():
+    """
+    Returns whether StudentModule history entries are queued in the
+    StudentModuleHistoryOutbox rather than written synchronously.
+    """
+    return settings.FEATURES.get('ENABLE_CSMH_WRITE_BEHIND', False)
+
+
+@receiver(post_save, sender=StudentModule)
+def enqueue_history(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Queues a history entry for the saved StudentModule, if history is
+    written behind and its module_type is one that we save.
+    """
+    if history_write_behind_enabled() and instance.module_type in BaseStudentModuleHistory.HISTORY_SAVING_TYPES:
+        StudentModuleHistoryOutbox.enqueue([instance])
+
+
 class XBlockFieldBase(models.Model):
     """
     Base class for all XBlock field storage.
@@ -454,3 +619,45 @@ class OrgDynamicUpgradeDeadlineConfiguration(OptOutDynamicUpgradeDeadlineMixin,
         default=False,
         help_text=_('Disable the dynamic upgrade deadline for this organization.')
     )
+
+
+@receiver(ENROLLMENT_TRACK_UPDATED)
+@receiver(COHORT_MEMBERSHIP_UPDATED)
+def invalidate_course_outline_for_group_change(sender, user, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the user's course outline and the access checks memoized
+    in this request, since their enrollment track or cohort determines
+    which blocks they see.
+    """
+    invalidate_course_outline(user.id, course_key)
+    _clear_access_contexts()
+
+
+@receiver(ENROLL_STATUS_CHANGE)
+def invalidate_course_outline_for_enrollment_change(sender, user, course_id, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the user's course outline and the access checks memoized
+    in this request when they enroll or unenroll.
+    """
+    invalidate_course_outline(user.id, course_id)
+    _clear_access_contexts()
+
+
+@receiver(post_save, sender='student.CourseAccessRole')
+@receiver(post_delete, sender='student.CourseAccessRole')
+def invalidate_access_contexts_for_role_change(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Clears the access checks memoized in this request when a user's course
+    or org role is added or removed.
+    """
+    _clear_access_contexts()
+
+
+def _clear_access_contexts():
+    """
+    Clears the AccessContexts of the current request.
+    """
+    # Imported here to avoid a circular import, since courseware.access_context
+    # depends on student.models, which depends on this module.
+    from courseware.access_context import AccessContext
+    AccessContext.clear()
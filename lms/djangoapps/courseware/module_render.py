@@ -41,6 +41,7 @@ import static_replace
 from capa.xqueue_interface import XQueueInterface
 from courseware.access import get_user_role, has_access
 from courseware.access_response import IncorrectPartitionGroupError
+from courseware.course_outline import get_course_outline
 from courseware.entrance_exams import user_can_skip_entrance_exam, user_has_passed_entrance_exam
 from courseware.masquerade import (
     MasqueradingKeyValueStore,
@@ -170,81 +171,97 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
         if course_module is None:
             return None, None, None
 
-        toc_chapters = list()
-        chapters = course_module.get_display_items()
+        return _toc_for_chapters(user, course, course_module.get_display_items(), active_chapter, active_section)
 
-        # Check for content which needs to be completed
-        # before the rest of the content is made available
-        required_content = milestones_helpers.get_required_content(course.id, user)
 
-        # The user may not actually have to complete the entrance exam, if one is required
-        if user_can_skip_entrance_exam(user, course):
-            required_content = [content for content in required_content if not content == course.entrance_exam_id]
+def toc_for_course_outline(user, course, active_chapter, active_section):
+    """
+    Create a table of contents, in the format returned by toc_for_course,
+    from the user's materialized course outline rather than from the
+    course's XModules.
+    """
+    return _toc_for_chapters(user, course, get_course_outline(user, course), active_chapter, active_section)
 
-        previous_of_active_section, next_of_active_section = None, None
-        last_processed_section, last_processed_chapter = None, None
-        found_active_section = False
-        for chapter in chapters:
-            # Only show required content, if there is required content
-            # chapter.hide_from_toc is read-only (bool)
-            # xss-lint: disable=python-deprecated-display-name
-            display_id = slugify(chapter.display_name_with_default_escaped)
-            local_hide_from_toc = False
-            if required_content:
-                if unicode(chapter.location) not in required_content:
-                    local_hide_from_toc = True
-
-            # Skip the current chapter if a hide flag is tripped
-            if chapter.hide_from_toc or local_hide_from_toc:
+
+def _toc_for_chapters(user, course, chapters, active_chapter, active_section):
+    """
+    Create a table of contents, in the format returned by toc_for_course,
+    from the given chapters (XModules or OutlineBlocks) shown to the user.
+    """
+    toc_chapters = list()
+
+    # Check for content which needs to be completed
+    # before the rest of the content is made available
+    required_content = milestones_helpers.get_required_content(course.id, user)
+
+    # The user may not actually have to complete the entrance exam, if one is required
+    if user_can_skip_entrance_exam(user, course):
+        required_content = [content for content in required_content if not content == course.entrance_exam_id]
+
+    previous_of_active_section, next_of_active_section = None, None
+    last_processed_section, last_processed_chapter = None, None
+    found_active_section = False
+    for chapter in chapters:
+        # Only show required content, if there is required content
+        # chapter.hide_from_toc is read-only (bool)
+        # xss-lint: disable=python-deprecated-display-name
+        display_id = slugify(chapter.display_name_with_default_escaped)
+        local_hide_from_toc = False
+        if required_content:
+            if unicode(chapter.location) not in required_content:
+                local_hide_from_toc = True
+
+        # Skip the current chapter if a hide flag is tripped
+        if chapter.hide_from_toc or local_hide_from_toc:
+            continue
+
+        sections = list()
+        for section in chapter.get_display_items():
+            # skip the section if it is hidden from the user
+            if section.hide_from_toc:
                 continue
 
-            sections = list()
-            for section in chapter.get_display_items():
-                # skip the section if it is hidden from the user
-                if section.hide_from_toc:
-                    continue
-
-                is_section_active = (chapter.url_name == active_chapter and section.url_name == active_section)
-                if is_section_active:
-                    found_active_section = True
-
-                section_context = {
-                    # xss-lint: disable=python-deprecated-display-name
-                    'display_name': section.display_name_with_default_escaped,
-                    'url_name': section.url_name,
-                    'format': section.format if section.format is not None else '',
-                    'due': section.due,
-                    'active': is_section_active,
-                    'graded': section.graded,
-                }
-                _add_timed_exam_info(user, course, section, section_context)
-
-                # update next and previous of active section, if applicable
-                if is_section_active:
-                    if last_processed_section:
-                        previous_of_active_section = last_processed_section.copy()
-                        previous_of_active_section['chapter_url_name'] = last_processed_chapter.url_name
-                elif found_active_section and not next_of_active_section:
-                    next_of_active_section = section_context.copy()
-                    next_of_active_section['chapter_url_name'] = chapter.url_name
-
-                sections.append(section_context)
-                last_processed_section = section_context
-                last_processed_chapter = chapter
-
-            toc_chapters.append({
+            is_section_active = (chapter.url_name == active_chapter and section.url_name == active_section)
+            if is_section_active:
+                found_active_section = True
+
+            section_context = {
                 # xss-lint: disable=python-deprecated-display-name
-                'display_name': chapter.display_name_with_default_escaped,
-                'display_id': display_id,
-                'url_name': chapter.url_name,
-                'sections': sections,
-                'active': chapter.url_name == active_chapter
-            })
-        return {
-            'chapters': toc_chapters,
-            'previous_of_active_section': previous_of_active_section,
-            'next_of_active_section': next_of_active_section,
-        }
+                'display_name': section.display_name_with_default_escaped,
+                'url_name': section.url_name,
+                'format': section.format if section.format is not None else '',
+                'due': section.due,
+                'active': is_section_active,
+                'graded': section.graded,
+            }
+            _add_timed_exam_info(user, course, section, section_context)
+
+            # update next and previous of active section, if applicable
+            if is_section_active:
+                if last_processed_section:
+                    previous_of_active_section = last_processed_section.copy()
+                    previous_of_active_section['chapter_url_name'] = last_processed_chapter.url_name
+            elif found_active_section and not next_of_active_section:
+                next_of_active_section = section_context.copy()
+                next_of_active_section['chapter_url_name'] = chapter.url_name
+
+            sections.append(section_context)
+            last_processed_section = section_context
+            last_processed_chapter = chapter
+
+        toc_chapters.append({
+            # xss-lint: disable=python-deprecated-display-name
+            'display_name': chapter.display_name_with_default_escaped,
+            'display_id': display_id,
+            'url_name': chapter.url_name,
+            'sections': sections,
+            'active': chapter.url_name == active_chapter
+        })
+    return {
+        'chapters': toc_chapters,
+        'previous_of_active_section': previous_of_active_section,
+        'next_of_active_section': next_of_active_section,
+    }
 
 
 def _add_timed_exam_info(user, course, section, section_context):
@@ -0,0 +1,127 @@
+"""
+A shared (cross-request) cache of Scope.user_state field data, used by
+FieldDataCache to avoid re-reading StudentModules when the same blocks are
+rendered for a learner several times in quick succession.
+
+Cached states are stored under a version stamp of their (user, course),
+which is replaced whenever any StudentModule of that user in that course is
+written.  Entries cached under an earlier stamp are never read again, so a
+state read from the database concurrently with a write can't outlive it.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from edx_django_utils import monitoring as monitoring_utils
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+
+class SharedUserStateCache(object):
+    """
+    The shared cache of Scope.user_state field data of a user in a course.
+    """
+    VERSION_CACHE_KEY = u'courseware.user_state.version.{user_id}.{course_key}'
+    STATE_CACHE_KEY = u'courseware.user_state.{user_id}.{course_key}.{version}.{block_key}'
+
+    def __init__(self, user_id, course_key):
+        self.user_id = user_id
+        self.course_key = course_key
+
+    @staticmethod
+    def is_enabled():
+        """
+        Returns whether user state is cached across requests.
+        """
+        return settings.FEATURES.get('ENABLE_SHARED_USER_STATE_CACHE', False)
+
+    @classmethod
+    def invalidate_for(cls, user_id, course_key):
+        """
+        Invalidates the cached user state of the given user in the given
+        course, now and again once the current transaction is committed,
+        so that states read before the commit aren't used afterwards.
+        """
+        version_cache_key = cls._version_cache_key(user_id, course_key)
+        cache.delete(version_cache_key)
+        transaction.on_commit(lambda: cache.delete(version_cache_key))
+
+    def invalidate(self):
+        """
+        Invalidates the cached user state of this user in this course.
+        """
+        self.invalidate_for(self.user_id, self.course_key)
+        self.__dict__.pop('_cached_version', None)
+
+    def get_many(self, block_keys):
+        """
+        Returns a dict mapping each of the given block keys that is cached
+        to its state dict, which is empty if the block has no state.
+        """
+        if not block_keys or self._version is None:
+            return {}
+        cache_keys = {self._state_cache_key(block_key): block_key for block_key in block_keys}
+        cached = cache.get_many(cache_keys.keys())
+        self._accumulate('requested', len(cache_keys))
+        self._accumulate('hits', len(cached))
+        self._accumulate('bytes_read', sum(len(serialized_state) for serialized_state in cached.itervalues()))
+        return {
+            cache_keys[cache_key]: json.loads(serialized_state)
+            for cache_key, serialized_state in cached.iteritems()
+        }
+
+    def set_many(self, block_keys_to_state):
+        """
+        Caches the given dict mapping block keys to state dicts.
+        """
+        if self._version is None:
+            return
+        serialized_states = {
+            self._state_cache_key(block_key): json.dumps(state)
+            for block_key, state in block_keys_to_state.iteritems()
+        }
+        cache.set_many(serialized_states, settings.SHARED_USER_STATE_CACHE_TIMEOUT)
+        self._accumulate('bytes_written', sum(len(serialized_state) for serialized_state in serialized_states.itervalues()))
+
+    @property
+    def _version(self):
+        """
+        Returns the current version stamp of this user's state in this
+        course, creating it if needed, or None if the cache is unavailable.
+        """
+        if not hasattr(self, '_cached_version'):
+            version_cache_key = self._version_cache_key(self.user_id, self.course_key)
+            cache.add(version_cache_key, uuid4().hex, settings.SHARED_USER_STATE_CACHE_TIMEOUT)
+            # Reread the stamp, in case another process created it first.
+            self._cached_version = cache.get(version_cache_key)
+        return self._cached_version
+
+    @classmethod
+    def _version_cache_key(cls, user_id, course_key):
+        """
+        Returns the key of the version stamp of the given user's state in
+        the given course.
+        """
+        return cls.VERSION_CACHE_KEY.format(user_id=user_id, course_key=course_key)
+
+    def _state_cache_key(self, block_key):
+        """
+        Returns the key of the cached state of the given block.
+        """
+        return self.STATE_CACHE_KEY.format(
+            user_id=self.user_id,
+            course_key=self.course_key,
+            version=self._version,
+            block_key=block_key,
+        )
+
+    @staticmethod
+    def _accumulate(stat_name, value):
+        """
+        Accumulates the given stat of this cache as a custom metric.
+        """
+        monitoring_utils.accumulate(u'xb_user_state.shared_cache.{}'.format(stat_name), value)
@@ -0,0 +1,44 @@
+"""
+Asynchronous tasks for the courseware app.
+"""
+from logging import getLogger
+
+from celery import task
+from django.conf import settings
+from django.core.cache import cache
+from edx_django_utils.monitoring import set_custom_metric
+
+from .models import StudentModuleHistoryOutbox
+
+log = getLogger(__name__)
+
+FLUSH_SCHEDULED_CACHE_KEY = u'courseware.student_module_history_flush_scheduled'
+
+
+def schedule_student_module_history_flush():
+    """
+    Schedules a flush of the queued StudentModule history entries, unless
+    one is already scheduled, so that entries queued in quick succession
+    are written together.
+    """
+    delay = settings.CSMH_WRITE_BEHIND_FLUSH_DELAY
+    if cache.add(FLUSH_SCHEDULED_CACHE_KEY, True, delay):
+        flush_student_module_history.apply_async(countdown=delay)
+
+
+@task()
+def flush_student_module_history():
+    """
+    Writes the queued StudentModule history entries to the history tables.
+    """
+    # Entries queued from now on need a new flush, since this one may
+    # already have read past them.
+    cache.delete(FLUSH_SCHEDULED_CACHE_KEY)
+    num_flushed, max_lag = StudentModuleHistoryOutbox.flush(settings.CSMH_WRITE_BEHIND_BATCH_SIZE)
+    set_custom_metric('csmh_write_behind_flushed', num_flushed)
+    set_custom_metric('csmh_write_behind_max_lag_seconds', max_lag)
+    log.info(
+        u'Flushed %d StudentModule history entries; the oldest was queued %.1f seconds ago.',
+        num_flushed,
+        max_lag,
+    )
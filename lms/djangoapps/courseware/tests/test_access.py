@@ -18,6 +18,7 @@ from opaque_keys.edx.locator import CourseLocator
 
 import courseware.access as access
 import courseware.access_response as access_response
+from courseware.access_context import AccessContext
 from courseware.masquerade import CourseMasquerade
 from courseware.tests.factories import (
     BetaTesterFactory,
@@ -234,6 +235,51 @@ class AccessTestCase(LoginEnrollmentTestCase, ModuleStoreTestCase, MilestonesTes
 
         self.assertFalse(any(access.administrative_accesses_to_course_for_user(self.student, course_key)))
 
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_ACCESS_CONTEXT': True})
+    def test_access_context_memoizes_checks(self):
+        """
+        Tests that the roles of a user are evaluated once per request.
+        """
+        chapter = ItemFactory.create(category='chapter', parent_location=self.course.location)
+        AccessContext.clear()
+        with patch(
+            'courseware.access.administrative_accesses_to_course_for_user',
+            wraps=access.administrative_accesses_to_course_for_user,
+        ) as mock_administrative_accesses:
+            for __ in range(3):
+                self.assertTrue(access.has_access(self.course_staff, 'load', chapter, self.course.id))
+                self.assertTrue(access.has_access(self.course_staff, 'staff', self.course.id))
+        self.assertEqual(mock_administrative_accesses.call_count, 1)
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_ACCESS_CONTEXT': True})
+    def test_access_context_cleared_on_role_change(self):
+        """
+        Tests that the memoized access checks of a request are dropped when a role changes.
+        """
+        AccessContext.clear()
+        self.assertTrue(access.has_access(self.course_staff, 'staff', self.course.id))
+        CourseStaffRole(self.course.id).remove_users(self.course_staff)
+        self.assertFalse(access.has_access(self.course_staff, 'staff', self.course.id))
+        CourseStaffRole(self.course.id).add_users(self.course_staff)
+        self.assertTrue(access.has_access(self.course_staff, 'staff', self.course.id))
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_ACCESS_CONTEXT': True})
+    def test_access_context_masquerade(self):
+        """
+        Tests that block access checks are memoized per masquerade.
+        """
+        chapter = ItemFactory.create(
+            category='chapter', parent_location=self.course.location, visible_to_staff_only=True
+        )
+        AccessContext.clear()
+        self.assertTrue(access.has_access(self.course_staff, 'load', chapter, self.course.id))
+
+        self.course_staff.masquerade_settings = {self.course.id: CourseMasquerade(self.course.id, role='student')}
+        self.assertFalse(access.has_access(self.course_staff, 'load', chapter, self.course.id))
+
+        self.course_staff.masquerade_settings = {}
+        self.assertTrue(access.has_access(self.course_staff, 'load', chapter, self.course.id))
+
     def test_student_has_access(self):
         """
         Tests course student have right access to content w/o preview.
@@ -4,8 +4,9 @@ Test for lms courseware app, module data (runtime data storage for XBlocks)
 import json
 from functools import partial
 
+from django.core.cache import cache
 from django.db import DatabaseError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from mock import Mock, patch
 from xblock.core import XBlock
 from xblock.exceptions import KeyValueMultiSaveError
@@ -291,6 +292,60 @@ class TestMissingStudentModule(TestCase):
             self.assertFalse(self.kvs.has(user_state_key('a_field')))
 
 
+@patch.dict('django.conf.settings.FEATURES', {'ENABLE_SHARED_USER_STATE_CACHE': True})
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestSharedUserStateCache(TestCase):
+    """Tests for user_state read from the shared cache"""
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestSharedUserStateCache, self).setUp()
+        cache.clear()
+        student_module = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'}))
+        self.user = student_module.student
+        self.descriptors = [mock_descriptor([mock_field(Scope.user_state, 'a_field')])]
+
+        # The first FieldDataCache reads the StudentModule and caches its state
+        with self.assertNumQueries(1):
+            FieldDataCache(self.descriptors, course_id, self.user)
+
+    def test_read_from_shared_cache(self):
+        with self.assertNumQueries(0):
+            kvs = DjangoKeyValueStore(FieldDataCache(self.descriptors, course_id, self.user))
+            self.assertEquals('a_value', kvs.get(user_state_key('a_field')))
+
+    def test_missing_student_module_cached(self):
+        other_user = UserFactory.create()
+        with self.assertNumQueries(1):
+            FieldDataCache(self.descriptors, course_id, other_user)
+        with self.assertNumQueries(0):
+            kvs = DjangoKeyValueStore(FieldDataCache(self.descriptors, course_id, other_user))
+            self.assertFalse(kvs.has(DjangoKeyValueStore.Key(Scope.user_state, other_user.id, location('usage_id'), 'a_field')))
+
+    def test_invalidated_by_set_many(self):
+        kvs = DjangoKeyValueStore(FieldDataCache(self.descriptors, course_id, self.user))
+        kvs.set(user_state_key('a_field'), 'new_value')
+        with self.assertNumQueries(1):
+            kvs = DjangoKeyValueStore(FieldDataCache(self.descriptors, course_id, self.user))
+        self.assertEquals('new_value', kvs.get(user_state_key('a_field')))
+
+    def test_invalidated_by_delete(self):
+        kvs = DjangoKeyValueStore(FieldDataCache(self.descriptors, course_id, self.user))
+        kvs.delete(user_state_key('a_field'))
+        with self.assertNumQueries(1):
+            kvs = DjangoKeyValueStore(FieldDataCache(self.descriptors, course_id, self.user))
+        self.assertFalse(kvs.has(user_state_key('a_field')))
+
+    def test_invalidated_by_student_module_save(self):
+        student_module = StudentModule.objects.get(student=self.user)
+        student_module.state = json.dumps({'a_field': 'saved_value'})
+        student_module.save()
+        with self.assertNumQueries(1):
+            kvs = DjangoKeyValueStore(FieldDataCache(self.descriptors, course_id, self.user))
+        self.assertEquals('saved_value', kvs.get(user_state_key('a_field')))
+
+
 @attr(shard=1)
 class StorageTestBase(object):
     """
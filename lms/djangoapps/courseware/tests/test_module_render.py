@@ -45,6 +45,7 @@ from xblock.test.tools import TestRuntime
 
 from capa.tests.response_xml_factory import OptionResponseXMLFactory
 from course_modes.models import CourseMode
+from courseware import course_outline
 from courseware import module_render as render
 from courseware.courses import get_course_info_section, get_course_with_access
 from courseware.access_response import AccessResponse
@@ -57,6 +58,7 @@ from courseware.tests.test_submitting_problems import TestSubmittingProblems
 from courseware.tests.tests import LoginEnrollmentTestCase
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
+from openedx.core.djangoapps.course_groups.signals.signals import COHORT_MEMBERSHIP_UPDATED
 from openedx.core.djangoapps.credit.api import set_credit_requirement_status, set_credit_requirements
 from openedx.core.djangoapps.credit.models import CreditCourse
 from openedx.core.lib.courses import course_image_url
@@ -1069,6 +1071,32 @@ class TestTOC(ModuleStoreTestCase):
             self.assertEquals(actual['previous_of_active_section']['url_name'], 'Toy_Videos')
             self.assertEquals(actual['next_of_active_section']['url_name'], 'video_123456789012')
 
+    @ddt.data((ModuleStoreEnum.Type.mongo, 3, 0), (ModuleStoreEnum.Type.split, 6, 0))
+    @ddt.unpack
+    def test_toc_from_course_outline(self, default_ms, setup_finds, setup_sends):
+        with self.store.default_store(default_ms):
+            self.setup_request_and_course(setup_finds, setup_sends)
+            expected = render.toc_for_course(
+                self.request.user, self.request, self.toy_course, self.chapter, 'Welcome', self.field_data_cache
+            )
+            actual = render.toc_for_course_outline(self.request.user, self.toy_course, self.chapter, 'Welcome')
+        self.assertEqual(actual, expected)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_course_outline_cached(self):
+        self.setup_request_and_course(3, 0)
+        user = self.request.user
+        with patch(
+            'courseware.course_outline._build_course_outline', wraps=course_outline._build_course_outline
+        ) as mock_build:
+            render.toc_for_course_outline(user, self.toy_course, self.chapter, None)
+            render.toc_for_course_outline(user, self.toy_course, self.chapter, None)
+            self.assertEqual(mock_build.call_count, 1)
+
+            COHORT_MEMBERSHIP_UPDATED.send(sender=None, user=user, course_key=self.course_key)
+            render.toc_for_course_outline(user, self.toy_course, self.chapter, None)
+            self.assertEqual(mock_build.call_count, 2)
+
 
 @attr(shard=1)
 @ddt.ddt
@@ -6,7 +6,9 @@ defined in edx_user_state_client.
 from collections import defaultdict
 
 from edx_user_state_client.tests import UserStateClientTestBase
+from opaque_keys.edx.locator import CourseLocator
 
+from courseware.models import StudentModule
 from courseware.tests.factories import UserFactory
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -34,3 +36,45 @@ class TestDjangoUserStateClient(UserStateClientTestBase, ModuleStoreTestCase):
         super(TestDjangoUserStateClient, self).setUp()
         self.client = DjangoXBlockUserStateClient()
         self.users = defaultdict(UserFactory.create)
+
+
+class TestDjangoUserStateClientBulkWrites(ModuleStoreTestCase):
+    """
+    Tests of the bulk write path of DjangoXBlockUserStateClient.set_many.
+    """
+    shard = 4
+    multi_db = True
+
+    def setUp(self):
+        super(TestDjangoUserStateClientBulkWrites, self).setUp()
+        self.user = UserFactory.create()
+        self.client = DjangoXBlockUserStateClient(self.user)
+        course_key = CourseLocator('org', 'course', 'run')
+        self.block_keys = [course_key.make_usage_key('problem', 'problem_{}'.format(idx)) for idx in range(3)]
+
+    def _history_lengths(self):
+        """
+        Returns the number of history entries of each block.
+        """
+        return [len(list(self.client.get_history(self.user.username, block_key))) for block_key in self.block_keys]
+
+    def test_set_many_in_bulk(self):
+        self.client.set_many(self.user.username, {block_key: {'a': 1} for block_key in self.block_keys})
+        self.assertEqual(StudentModule.objects.filter(student=self.user).count(), 3)
+        self.assertEqual(self._history_lengths(), [1, 1, 1])
+
+        # Only the blocks whose state changed are written, along with their history.
+        self.client.set_many(self.user.username, {
+            self.block_keys[0]: {'a': 1},
+            self.block_keys[1]: {'b': 2},
+            self.block_keys[2]: {'a': 3},
+        })
+        self.assertEqual(self._history_lengths(), [1, 2, 2])
+        self.assertEqual(
+            {state.block_key: state.state for state in self.client.get_many(self.user.username, self.block_keys)},
+            {
+                self.block_keys[0]: {'a': 1},
+                self.block_keys[1]: {'a': 1, 'b': 2},
+                self.block_keys[2]: {'a': 3},
+            },
+        )
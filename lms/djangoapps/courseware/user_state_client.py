@@ -12,7 +12,9 @@ from django.conf import settings
 from django.core.paginator import Paginator
 from django.contrib.auth.models import User
 from django.db import transaction
+from django.db.models import Case, TextField, Value, When
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from edx_django_utils import monitoring as monitoring_utils
 from edx_user_state_client.interface import XBlockUserState, XBlockUserStateClient
 from xblock.fields import Scope
@@ -241,6 +243,29 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         evt_time = time()
 
+        if len(block_keys_to_state) > 1:
+            try:
+                with transaction.atomic():
+                    self._set_many_in_bulk(user, block_keys_to_state)
+            except IntegrityError:
+                # Another process created some of the rows after they were
+                # read, so fall back to writing the blocks one at a time.
+                log.warning("set_many: IntegrityError in bulk write for student {} - {} block keys".format(
+                    user, len(block_keys_to_state)
+                ))
+                self._set_many_per_block(user, block_keys_to_state)
+        else:
+            self._set_many_per_block(user, block_keys_to_state)
+
+        # Events for the entire set_many call.
+        finish_time = time()
+        duration = (finish_time - evt_time) * 1000  # milliseconds
+        self._nr_stat_accumulate('set_many', 'duration', duration)
+
+    def _set_many_per_block(self, user, block_keys_to_state):
+        """
+        Implements set_many with a get-or-create and a save per block.
+        """
         for usage_key, state in block_keys_to_state.items():
             try:
                 student_module, created = StudentModule.objects.get_or_create(
@@ -304,10 +329,69 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             # Event to record number of existing fields updated in set/set_many.
             num_fields_updated = max(0, len(state) - num_new_fields_set)
 
-        # Events for the entire set_many call.
-        finish_time = time()
-        duration = (finish_time - evt_time) * 1000  # milliseconds
-        self._nr_stat_accumulate('set_many', 'duration', duration)
+    def _set_many_in_bulk(self, user, block_keys_to_state):
+        """
+        Implements set_many with a single query reading all the existing
+        StudentModules, a single bulk_create for the new ones and a single
+        UPDATE for the existing ones whose state changed.
+        """
+        existing_modules = {
+            usage_key: student_module
+            for student_module, usage_key in self._get_student_modules(user.username, block_keys_to_state.keys())
+        }
+
+        new_modules, updated_modules, block_stats = [], [], []
+        for usage_key, state in block_keys_to_state.items():
+            student_module = existing_modules.get(usage_key)
+            if student_module is None:
+                student_module = StudentModule(
+                    student=user,
+                    course_id=usage_key.course_key,
+                    module_state_key=usage_key,
+                    module_type=usage_key.block_type,
+                    state=json.dumps(state),
+                )
+                new_modules.append(student_module)
+                block_stats.append((usage_key.block_type, 'blocks_created', len(student_module.state)))
+            else:
+                current_state = {} if student_module.state is None else json.loads(student_module.state)
+                current_state.update(state)
+                new_state = json.dumps(current_state)
+                if new_state != student_module.state:
+                    student_module.state = new_state
+                    updated_modules.append(student_module)
+                block_stats.append((usage_key.block_type, 'blocks_updated', len(student_module.state)))
+
+        if new_modules:
+            StudentModule.objects.bulk_create(new_modules)
+            if any(student_module.id is None for student_module in new_modules):
+                # Not all databases return the ids of bulk created rows, which
+                # the history entries need.
+                new_modules = [
+                    student_module for student_module, _ in self._get_student_modules(
+                        user.username,
+                        [student_module.module_state_key for student_module in new_modules],
+                    )
+                ]
+
+        if updated_modules:
+            modified = timezone.now()
+            StudentModule.objects.filter(id__in=[student_module.id for student_module in updated_modules]).update(
+                state=Case(
+                    *[When(id=student_module.id, then=Value(student_module.state)) for student_module in updated_modules],
+                    output_field=TextField()
+                ),
+                modified=modified,
+            )
+            for student_module in updated_modules:
+                student_module.modified = modified
+
+        BaseStudentModuleHistory.bulk_save_history(new_modules + updated_modules)
+
+        # DataDog and New Relic reporting, once the writes have succeeded.
+        for block_type, stat_name, size in block_stats:
+            self._nr_block_stat_accumulate('set_many', block_type, 'size', size)
+            self._nr_block_stat_increment('set_many', block_type, stat_name)
 
     def delete_many(self, username, block_keys, scope=Scope.user_state, fields=None):
         """
@@ -49,6 +49,7 @@ from xmodule.course_module import COURSE_VISIBILITY_PUBLIC
 from xmodule.x_module import PUBLIC_VIEW, STUDENT_VIEW
 from .views import CourseTabView
 from ..access import has_access
+from ..course_outline import is_course_outline_enabled
 from ..courses import check_course_access, get_course_with_access, get_current_child, get_studio_url
 from ..entrance_exams import (
     course_has_entrance_exam,
@@ -61,7 +62,7 @@ from ..masquerade import (
     check_content_start_date_for_masquerade_user
 )
 from ..model_data import FieldDataCache
-from ..module_render import get_module_for_descriptor, toc_for_course
+from ..module_render import get_module_for_descriptor, toc_for_course, toc_for_course_outline
 
 log = logging.getLogger("edx.courseware.views.index")
 
@@ -425,14 +426,7 @@ class CoursewareIndex(View):
                 self.effective_user,
             )
         )
-        table_of_contents = toc_for_course(
-            self.effective_user,
-            self.request,
-            self.course,
-            self.chapter_url_name,
-            self.section_url_name,
-            self.field_data_cache,
-        )
+        table_of_contents = self._get_table_of_contents()
         courseware_context['accordion'] = render_accordion(
             self.request,
             self.course,
@@ -472,6 +466,33 @@ class CoursewareIndex(View):
 
         return courseware_context
 
+    def _get_table_of_contents(self):
+        """
+        Returns the table of contents of the course for the effective user,
+        rendered from their materialized course outline when possible.
+        """
+        # Outlines don't reflect masquerades or CCX field overrides.
+        if (
+            is_course_outline_enabled() and
+            self.effective_user.is_authenticated and
+            not self.masquerade and
+            not getattr(self.course.id, 'ccx', None)
+        ):
+            return toc_for_course_outline(
+                self.effective_user,
+                self.course,
+                self.chapter_url_name,
+                self.section_url_name,
+            )
+        return toc_for_course(
+            self.effective_user,
+            self.request,
+            self.course,
+            self.chapter_url_name,
+            self.section_url_name,
+            self.field_data_cache,
+        )
+
     def _add_sequence_title_to_context(self, courseware_context):
         """
         Adds sequence title to the given context.
@@ -16,7 +16,7 @@ from django.db import models
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from courseware.models import BaseStudentModuleHistory, StudentModule
+from courseware.models import BaseStudentModuleHistory, StudentModule, history_write_behind_enabled
 from coursewarehistoryextended.fields import UnsignedBigIntAutoField
 
 
@@ -44,6 +44,8 @@ class StudentModuleHistoryExtended(BaseStudentModuleHistory):
         StudentModuleHistoryExtended entry if the module_type is one that
         we save.
         """
+        if history_write_behind_enabled():
+            return
         if instance.module_type in StudentModuleHistoryExtended.HISTORY_SAVING_TYPES:
             history_entry = StudentModuleHistoryExtended(student_module=instance,
                                                          version=None,
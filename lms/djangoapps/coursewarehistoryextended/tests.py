@@ -9,11 +9,18 @@ import json
 from unittest import skipUnless
 
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from mock import patch
 
-from courseware.models import BaseStudentModuleHistory, StudentModule, StudentModuleHistory
+from courseware.models import (
+    BaseStudentModuleHistory,
+    StudentModule,
+    StudentModuleHistory,
+    StudentModuleHistoryOutbox
+)
+from courseware.tasks import flush_student_module_history
 from courseware.tests.factories import StudentModuleFactory, course_id, location
+from coursewarehistoryextended.models import StudentModuleHistoryExtended
 
 
 @skipUnless(settings.FEATURES["ENABLE_CSMH_EXTENDED"], "CSMH Extended needs to be enabled")
@@ -78,3 +85,41 @@ class TestStudentModuleHistoryBackends(TestCase):
         student_module = StudentModule.objects.all()
         history = BaseStudentModuleHistory.get_history(student_module)
         self.assertEquals(len(history), 0)
+
+
+@skipUnless(settings.FEATURES["ENABLE_CSMH_EXTENDED"], "CSMH Extended needs to be enabled")
+@patch.dict("django.conf.settings.FEATURES", {"ENABLE_CSMH_WRITE_BEHIND": True})
+class TestStudentModuleHistoryWriteBehind(TestCase):
+    """ Tests of CSMH entries queued in the outbox and written behind """
+    multi_db = True
+    shard = 1
+
+    def setUp(self):
+        super(TestStudentModuleHistoryWriteBehind, self).setUp()
+        self.csm = StudentModuleFactory.create(module_state_key=location('usage_id'),
+                                               course_id=course_id,
+                                               state=json.dumps({'order': 1}))
+        for record in (2, 3):
+            self.csm.state = json.dumps({'order': record})
+            self.csm.save()
+
+    def assert_history_order(self, history):
+        """ Verifies that the history entries are listed from latest to earliest. """
+        self.assertEquals([3, 2, 1], [json.loads(entry.state)['order'] for entry in history])
+
+    def test_history_queued(self):
+        self.assertEquals(StudentModuleHistoryOutbox.objects.count(), 3)
+        self.assertFalse(StudentModuleHistoryExtended.objects.exists())
+        self.assert_history_order(BaseStudentModuleHistory.get_history([self.csm]))
+
+    def test_flush(self):
+        flush_student_module_history()
+        self.assertFalse(StudentModuleHistoryOutbox.objects.exists())
+        self.assert_history_order(StudentModuleHistoryExtended.objects.order_by('-id'))
+        self.assert_history_order(BaseStudentModuleHistory.get_history([self.csm]))
+
+    @override_settings(CSMH_WRITE_BEHIND_BATCH_SIZE=2)
+    def test_flush_in_batches(self):
+        flush_student_module_history()
+        self.assertFalse(StudentModuleHistoryOutbox.objects.exists())
+        self.assert_history_order(StudentModuleHistoryExtended.objects.order_by('-id'))
@@ -0,0 +1,439 @@
+"""
+Batch engine for computing and persisting the course grades of many
+learners at once.
+
+Rather than building a SubsectionGradeFactory per learner, which queries
+the learner's scores and persists the learner's grades one at a time, the
+engine loads the scores of a batch of learners with a few queries, lays
+them out as a learners x scorable blocks matrix, and aggregates them into
+subsection, assignment type and course grades with NumPy.
+"""
+from collections import OrderedDict
+from logging import getLogger
+
+import numpy as np
+from django.conf import settings
+
+from courseware.model_data import ScoresClient
+from lms.djangoapps.course_blocks.api import get_course_blocks_for_users
+from student.models import anonymous_id_for_user
+from submissions.models import ScoreSummary
+from submissions.serializers import UnannotatedScoreSerializer
+from xmodule.graders import AssignmentFormatGrader, WeightedSubsectionsGrader
+
+from .config import assume_zero_if_absent, should_persist_grades
+from .config.waffle import BATCH_GRADING, waffle
+from .course_data import CourseData
+from .course_grade import CourseGrade, CourseGradeBase
+from .models import BlockRecord, PersistentCourseGrade, PersistentSubsectionGrade
+from .scores import get_score, possibly_scored
+
+log = getLogger(__name__)
+
+
+class BatchCourseGrader(object):
+    """
+    Computes and persists the course grades of batches of users in a
+    course, with the same results as calling CourseGradeFactory().update
+    with force_update_subsections=True for each of them, up to floating
+    point rounding of the aggregated scores.
+    """
+    BATCH_SIZE = 200
+
+    def __init__(self, course_data):
+        """
+        Arguments:
+            course_data (CourseData) - The course to grade, created
+                without a user.
+        """
+        self.course_data = course_data
+        self._course = CourseGradeBase._prep_course_for_grading(course_data.course)  # pylint: disable=protected-access
+        self._layouts = {}
+
+    @classmethod
+    def is_supported(cls, course_data):
+        """
+        Returns whether the batch engine is enabled and supports grading
+        the given course: grades must be persisted and the course's
+        grader must be made of assignment type graders, which the engine
+        knows how to vectorize.
+        """
+        if not waffle().is_enabled(BATCH_GRADING):
+            return False
+        if settings.GENERATE_PROFILE_SCORES or not should_persist_grades(course_data.course_key):
+            return False
+        course = CourseGradeBase._prep_course_for_grading(course_data.course)  # pylint: disable=protected-access
+        return isinstance(course.grader, WeightedSubsectionsGrader) and all(
+            isinstance(subgrader, AssignmentFormatGrader) for subgrader, _, _ in course.grader.subgraders
+        )
+
+    def update(self, users):
+        """
+        Computes, persists and returns the CourseGrades of the given users,
+        in the order of the given users.
+        """
+        course_key = self.course_data.course_key
+        collected_structure = self.course_data.collected_structure
+        structures = get_course_blocks_for_users(
+            users,
+            self.course_data.location,
+            collected_block_structure=collected_structure,
+        )
+        scorable_locations = [block_key for block_key in collected_structure if possibly_scored(block_key)]
+        csm_scores = ScoresClient.create_for_users(course_key, [user.id for user in users], scorable_locations)
+        submissions_scores = _get_submissions_scores(course_key, users)
+
+        # Users sharing a transformed block structure share its layout and
+        # are laid out in the same matrices.
+        groups = OrderedDict()
+        for user, structure in zip(users, structures):
+            if id(structure) not in groups:
+                groups[id(structure)] = _UserGroupGrades(self._get_layout(structure), self._course)
+            groups[id(structure)].add_user(user, csm_scores[user.id], submissions_scores[user.id])
+
+        subsection_grade_params = []
+        for group in groups.itervalues():
+            group.compute_subsection_grades()
+            subsection_grade_params.extend(group.subsection_grade_params())
+        subsection_grade_models = PersistentSubsectionGrade.bulk_update_or_create_grades(
+            subsection_grade_params, course_key,
+        )
+
+        models_by_user = {}
+        for model in subsection_grade_models:
+            models_by_user.setdefault(model.user_id, {})[model.full_usage_key] = model
+
+        course_grades_by_user = {}
+        course_grade_params = []
+        assume_zero = assume_zero_if_absent(course_key)
+        for group in groups.itervalues():
+            group.compute_course_grades(models_by_user)
+            for index, user in enumerate(group.users):
+                course_data = CourseData(
+                    user,
+                    course=self.course_data.course,
+                    collected_block_structure=collected_structure,
+                    structure=group.layout.structure,
+                    course_key=course_key,
+                )
+                course_grade = CourseGrade(
+                    user, course_data, group.percents[index], group.letter_grades[index], group.passed[index],
+                )
+                course_grade._subsection_grade_factory.prime(  # pylint: disable=protected-access
+                    csm_scores[user.id],
+                    submissions_scores[user.id],
+                    models_by_user.get(user.id, {}).values(),
+                )
+                course_grades_by_user[user.id] = course_grade
+
+                if assume_zero or group.attempted[index]:
+                    course_grade_params.append(dict(
+                        user_id=user.id,
+                        course_version=course_data.version,
+                        course_edited_timestamp=course_data.edited_on,
+                        grading_policy_hash=course_data.grading_policy_hash,
+                        percent_grade=course_grade.percent,
+                        letter_grade=course_grade.letter_grade or "",
+                        passed=course_grade.passed,
+                    ))
+        PersistentCourseGrade.bulk_update_or_create(course_key, course_grade_params)
+
+        log.info(
+            u'Grades: Batch update, %s, users: %d, structures: %d, persisted course grades: %d',
+            self.course_data.full_string(), len(users), len(groups), len(course_grade_params),
+        )
+        return [course_grades_by_user[user.id] for user in users]
+
+    def _get_layout(self, structure):
+        """
+        Returns the cached _StructureLayout of the given transformed
+        block structure.
+        """
+        if id(structure) not in self._layouts:
+            self._layouts[id(structure)] = _StructureLayout(structure, self.course_data.location)
+        return self._layouts[id(structure)]
+
+
+class _StructureLayout(object):
+    """
+    The subsections and scorable blocks of a transformed block structure,
+    in the order the per-user grading code visits them, along with each
+    block's score for users who haven't attempted it.
+    """
+    def __init__(self, structure, course_location):
+        self.structure = structure
+
+        subsection_keys = OrderedDict()
+        for chapter_key in structure.get_children(course_location):
+            for subsection_key in structure.get_children(chapter_key):
+                subsection_keys[subsection_key] = None
+        self.subsections = [structure[subsection_key] for subsection_key in subsection_keys]
+
+        self.block_keys = []
+        self.default_scores = []
+        self.subsection_blocks = []
+        block_indices = {}
+        for subsection in self.subsections:
+            subsection_block_indices = OrderedDict()
+            for block_key in structure.post_order_traversal(
+                    filter_func=possibly_scored,
+                    start_node=subsection.location,
+            ):
+                block = structure[block_key]
+                if not getattr(block, 'has_score', False):
+                    continue
+                if block_key not in block_indices:
+                    block_indices[block_key] = len(self.block_keys)
+                    self.block_keys.append(block_key)
+                    self.default_scores.append(
+                        get_score(submissions_scores={}, csm_scores={}, persisted_block=None, block=block)
+                    )
+                subsection_block_indices[block_indices[block_key]] = None
+            self.subsection_blocks.append(subsection_block_indices.keys())
+
+        self.serialized_block_keys = [unicode(block_key) for block_key in self.block_keys]
+        self.block_subsections = [[] for _ in self.block_keys]
+        self.membership = np.zeros((len(self.block_keys), len(self.subsections)))
+        for subsection_index, subsection_block_indices in enumerate(self.subsection_blocks):
+            for block_index in subsection_block_indices:
+                self.block_subsections[block_index].append(subsection_index)
+                self.membership[block_index, subsection_index] = 1.0
+
+        self.default_earned, self.default_possible, self.default_graded = _score_vectors(self.default_scores)
+
+
+class _UserGroupGrades(object):
+    """
+    The scores and grades of the users sharing a transformed block
+    structure, as matrices with a row per user.
+    """
+    def __init__(self, layout, course):
+        self.layout = layout
+        self.course = course
+        self.users = []
+        self.user_scores = []
+
+    def add_user(self, user, csm_scores, submissions_scores):
+        """
+        Adds the given user, with the scores of the blocks the user has
+        scores for. The other blocks have their default scores.
+        """
+        scores = {}
+        for block_index, block_key in enumerate(self.layout.block_keys):
+            has_score = (
+                self.layout.serialized_block_keys[block_index] in submissions_scores or
+                csm_scores.get(block_key) is not None
+            )
+            if has_score:
+                scores[block_index] = get_score(
+                    submissions_scores, csm_scores, None, self.layout.structure[block_key],
+                )
+        self.users.append(user)
+        self.user_scores.append(scores)
+
+    def compute_subsection_grades(self):
+        """
+        Aggregates the users' block scores into subsection scores.
+        """
+        num_users = len(self.users)
+        earned = np.tile(self.layout.default_earned, (num_users, 1))
+        possible = np.tile(self.layout.default_possible, (num_users, 1))
+        graded = np.tile(self.layout.default_graded, (num_users, 1))
+        for user_index, scores in enumerate(self.user_scores):
+            for block_index, score in scores.iteritems():
+                earned[user_index, block_index] = score.earned if score else 0.0
+                possible[user_index, block_index] = score.possible if score else 0.0
+                graded[user_index, block_index] = 1.0 if score and score.graded else 0.0
+
+        membership = self.layout.membership
+        self.earned_all = np.dot(earned, membership)
+        self.possible_all = np.dot(possible, membership)
+        self.earned_graded = np.dot(earned * graded, membership)
+        self.possible_graded = np.dot(possible * graded, membership)
+        self.first_attempted_all, self.first_attempted_graded = self._first_attempted()
+
+    def subsection_grade_params(self):
+        """
+        Returns the parameters for persisting the users' subsection
+        grades, as in CreateSubsectionGrade._persisted_model_params.
+        """
+        default_visible_blocks = {}
+        params = []
+        for user_index, user in enumerate(self.users):
+            scores = self.user_scores[user_index]
+            for subsection_index, subsection in enumerate(self.layout.subsections):
+                block_indices = self.layout.subsection_blocks[subsection_index]
+                if any(block_index in scores for block_index in block_indices):
+                    visible_blocks = self._visible_blocks(block_indices, scores)
+                else:
+                    if subsection_index not in default_visible_blocks:
+                        default_visible_blocks[subsection_index] = self._visible_blocks(block_indices, {})
+                    visible_blocks = default_visible_blocks[subsection_index]
+                params.append(dict(
+                    user_id=user.id,
+                    usage_key=subsection.location,
+                    course_version=getattr(subsection, 'course_version', None),
+                    subtree_edited_timestamp=getattr(subsection, 'subtree_edited_on', None),
+                    earned_all=float(self.earned_all[user_index, subsection_index]),
+                    possible_all=float(self.possible_all[user_index, subsection_index]),
+                    earned_graded=float(self.earned_graded[user_index, subsection_index]),
+                    possible_graded=float(self.possible_graded[user_index, subsection_index]),
+                    visible_blocks=visible_blocks,
+                    first_attempted=self.first_attempted_all[user_index][subsection_index],
+                ))
+        return params
+
+    def compute_course_grades(self, models_by_user):
+        """
+        Computes the users' course grades per the course's grading
+        policy, from their subsection scores and any subsection grade
+        overrides on their persisted subsection grades.
+        """
+        earned_graded = self.earned_graded.copy()
+        possible_graded = self.possible_graded.copy()
+        self.attempted = []
+        for user_index, user in enumerate(self.users):
+            models = models_by_user.get(user.id, {})
+            attempted = False
+            for subsection_index, subsection in enumerate(self.layout.subsections):
+                model = models.get(subsection.location)
+                if model is not None and hasattr(model, 'override'):
+                    earned_graded[user_index, subsection_index] = model.override.earned_graded_override
+                    possible_graded[user_index, subsection_index] = model.override.possible_graded_override
+                    attempted = attempted or model.first_attempted is not None
+                else:
+                    attempted = attempted or self.first_attempted_all[user_index][subsection_index] is not None
+            self.attempted.append(attempted)
+
+        percent_graded = np.around(
+            np.where(possible_graded > 0, earned_graded / np.where(possible_graded > 0, possible_graded, 1.0), 0.0),
+            decimals=2,
+        )
+        course_percent = np.zeros(len(self.users))
+        for subgrader, _, weight in self.course.grader.subgraders:
+            course_percent += self._assignment_type_percent(subgrader, percent_graded, possible_graded) * weight
+
+        grade_cutoffs = self.course.grade_cutoffs
+        self.percents, self.letter_grades, self.passed = [], [], []
+        for raw_percent in course_percent:
+            percent = CourseGrade._compute_percent({'percent': float(raw_percent)})  # pylint: disable=protected-access
+            self.percents.append(percent)
+            self.letter_grades.append(CourseGrade._compute_letter_grade(grade_cutoffs, percent))  # pylint: disable=protected-access
+            self.passed.append(CourseGrade._compute_passed(grade_cutoffs, percent))  # pylint: disable=protected-access
+
+    def _assignment_type_percent(self, subgrader, percent_graded, possible_graded):
+        """
+        Returns the users' percents for the given assignment type grader,
+        as in AssignmentFormatGrader.grade: the average of the percents of
+        the graded subsections of its type with a possible score, padded
+        with zeros up to its min_count, after dropping the lowest
+        drop_count of them.
+        """
+        columns = [
+            subsection_index
+            for subsection_index, subsection in enumerate(self.layout.subsections)
+            if getattr(subsection, 'graded', False) and getattr(subsection, 'format', '') == subgrader.type
+        ]
+        num_users = len(self.users)
+        width = max(subgrader.min_count, len(columns))
+        if width == 0:
+            return np.zeros(num_users)
+
+        percents = np.zeros((num_users, width))
+        num_assignments = np.zeros(num_users, dtype=int)
+        if columns:
+            counted = possible_graded[:, columns] > 0
+            percents[:, :len(columns)] = np.where(counted, percent_graded[:, columns], 0.0)
+            num_assignments = counted.sum(axis=1)
+        num_kept = np.maximum(num_assignments, subgrader.min_count) - subgrader.drop_count
+
+        # Uncounted subsections and padding have a percent of zero, so the
+        # kept assignments are the highest num_kept percents of each row.
+        kept_totals = np.cumsum(-np.sort(-percents, axis=1), axis=1)[
+            np.arange(num_users), np.clip(num_kept - 1, 0, width - 1)
+        ]
+        return np.where(num_kept > 0, kept_totals / np.maximum(num_kept, 1), 0.0)
+
+    def _first_attempted(self):
+        """
+        Returns the first attempted dates of the users' subsections, among
+        all their blocks and among their graded blocks, as lists of lists
+        with a row per user.
+        """
+        all_rows, graded_rows = [], []
+        for scores in self.user_scores:
+            first_attempted_all = [None] * len(self.layout.subsections)
+            first_attempted_graded = [None] * len(self.layout.subsections)
+            for block_index, score in scores.iteritems():
+                if not (score and score.first_attempted):
+                    continue
+                for subsection_index in self.layout.block_subsections[block_index]:
+                    first_attempted_all[subsection_index] = _min_or_value(
+                        first_attempted_all[subsection_index], score.first_attempted,
+                    )
+                    if score.graded:
+                        first_attempted_graded[subsection_index] = _min_or_value(
+                            first_attempted_graded[subsection_index], score.first_attempted,
+                        )
+            all_rows.append(first_attempted_all)
+            graded_rows.append(first_attempted_graded)
+        return all_rows, graded_rows
+
+    def _visible_blocks(self, block_indices, scores):
+        """
+        Returns the BlockRecords of the given blocks with a score, using
+        the given user's scores or else the blocks' default scores.
+        """
+        visible_blocks = []
+        for block_index in block_indices:
+            score = scores[block_index] if block_index in scores else self.layout.default_scores[block_index]
+            if score:
+                visible_blocks.append(
+                    BlockRecord(self.layout.block_keys[block_index], score.weight, score.raw_possible, score.graded)
+                )
+        return visible_blocks
+
+
+def _score_vectors(scores):
+    """
+    Returns the earned, possible and graded values of the given
+    ProblemScores as arrays, with zeros for missing scores.
+    """
+    earned = np.zeros(len(scores))
+    possible = np.zeros(len(scores))
+    graded = np.zeros(len(scores))
+    for index, score in enumerate(scores):
+        if score:
+            earned[index] = score.earned
+            possible[index] = score.possible
+            graded[index] = 1.0 if score.graded else 0.0
+    return earned, possible, graded
+
+
+def _min_or_value(current, value):
+    """
+    Returns the lowest of the given values, ignoring a current value of None.
+    """
+    return value if current is None else min(current, value)
+
+
+def _get_submissions_scores(course_key, users):
+    """
+    Returns the scores stored by the Submissions API for the given users
+    in the course, as a dict of user ids to the same dicts returned by
+    submissions_api.get_scores for each user, with a single query.
+    """
+    user_ids_by_anonymous_id = {
+        anonymous_id_for_user(user, course_key, save=False): user.id
+        for user in users
+    }
+    scores = {user.id: {} for user in users}
+    score_summaries = ScoreSummary.objects.filter(
+        student_item__course_id=str(course_key),
+        student_item__student_id__in=user_ids_by_anonymous_id.keys(),
+    ).select_related('latest', 'latest__submission', 'student_item')
+    for summary in score_summaries:
+        if not summary.latest.is_hidden():
+            user_id = user_ids_by_anonymous_id[summary.student_item.student_id]
+            scores[user_id][summary.student_item.item_id] = UnannotatedScoreSerializer(summary.latest).data
+    return scores
@@ -2,12 +2,14 @@
 Course Grade Factory Class
 """
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 from six import text_type
 
 from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED, COURSE_GRADE_NOW_PASSED
 
+from .batch_grading import BatchCourseGrader
 from .config import assume_zero_if_absent, should_persist_grades
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
@@ -91,6 +93,10 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        When force_update is set and the batch_grading waffle switch is
+        enabled, students are graded in batches by the BatchCourseGrader,
+        if it supports the course.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
@@ -101,8 +107,40 @@ class CourseGradeFactory(object):
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
-        for user in users:
-            yield self._iter_grade_result(user, course_data, force_update)
+        if force_update and BatchCourseGrader.is_supported(course_data):
+            for result in self._iter_batch_grade_results(users, course_data):
+                yield result
+        else:
+            for user in users:
+                yield self._iter_grade_result(user, course_data, force_update)
+
+    def _iter_batch_grade_results(self, users, course_data):
+        """
+        Yields a GradeResult for every student, updating their grades in
+        batches. A batch that fails is updated again one student at a time,
+        so the failure is reported for the students it actually affects.
+        """
+        batch_grader = BatchCourseGrader(course_data)
+        users = iter(users)
+        while True:
+            batch = list(islice(users, batch_grader.BATCH_SIZE))
+            if not batch:
+                break
+            try:
+                course_grades = batch_grader.update(batch)
+            except Exception as exc:  # pylint: disable=broad-except
+                log.exception(
+                    'Cannot batch grade %d students in course %s because of exception: %s',
+                    len(batch),
+                    course_data.course_key,
+                    text_type(exc)
+                )
+                for user in batch:
+                    yield self._iter_grade_result(user, course_data, force_update=True)
+            else:
+                for user, course_grade in zip(batch, course_grades):
+                    self._send_grade_signals(user, course_data, course_grade)
+                    yield self.GradeResult(user, course_grade, None)
 
     def _iter_grade_result(self, user, course_data, force_update):
         try:
@@ -191,6 +229,21 @@ class CourseGradeFactory(object):
                 passed=course_grade.passed,
             )
 
+        CourseGradeFactory._send_grade_signals(user, course_data, course_grade)
+
+        log.info(
+            u'Grades: Update, %s, User: %s, %s, persisted: %s',
+            course_data.full_string(), user.id, course_grade, should_persist,
+        )
+
+        return course_grade
+
+    @staticmethod
+    def _send_grade_signals(user, course_data, course_grade):
+        """
+        Sends a COURSE_GRADE_CHANGED signal to listeners and a
+        COURSE_GRADE_NOW_PASSED if learner has passed course.
+        """
         COURSE_GRADE_CHANGED.send_robust(
             sender=None,
             user=user,
@@ -204,10 +257,3 @@ class CourseGradeFactory(object):
                 user=user,
                 course_id=course_data.course_key,
             )
-
-        log.info(
-            u'Grades: Update, %s, User: %s, %s, persisted: %s',
-            course_data.full_string(), user.id, course_grade, should_persist,
-        )
-
-        return course_grade
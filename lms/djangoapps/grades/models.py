@@ -226,6 +226,34 @@ class VisibleBlocks(models.Model):
         non_existent_brls = {brl.hash_value for brl in block_record_lists if brl.hash_value not in cached_records}
         cls.bulk_create(user_id, course_key, non_existent_brls)
 
+    @classmethod
+    def bulk_get_or_create_shared(cls, course_key, block_record_lists):
+        """
+        Bulk creates VisibleBlocks for the given iterator of
+        BlockRecordList objects, regardless of which users they
+        belong to, but only for those that aren't already created.
+        Does not use the per-user request cache.
+
+        Returns a dict of the block record lists' hash values to their
+        VisibleBlocks.
+        """
+        brls_by_hash = {brl.hash_value: brl for brl in block_record_lists}
+        visible_blocks = {
+            visible_block.hashed: visible_block
+            for visible_block in cls.objects.filter(hashed__in=brls_by_hash.keys())
+        }
+        created = cls.objects.bulk_create([
+            VisibleBlocks(
+                blocks_json=brl.json_value,
+                hashed=hash_value,
+                course_id=course_key,
+            )
+            for hash_value, brl in brls_by_hash.iteritems()
+            if hash_value not in visible_blocks
+        ])
+        visible_blocks.update({visible_block.hashed: visible_block for visible_block in created})
+        return visible_blocks
+
     @classmethod
     def _initialize_cache(cls, user_id, course_key):
         """
@@ -457,6 +485,70 @@ class PersistentSubsectionGrade(TimeStampedModel):
             cls._emit_grade_calculated_event(grade)
         return grades
 
+    @classmethod
+    def bulk_update_or_create_grades(cls, grade_params_list, course_key):
+        """
+        Bulk version of update_or_create_grade, for the grades of any
+        number of users in the given course.  Creates the grades that
+        don't exist yet with a single bulk_create and only updates the
+        existing grades whose values have changed.
+
+        Returns the grades in the order of the given parameters.
+        """
+        if not grade_params_list:
+            return []
+
+        map(cls._prepare_params, grade_params_list)
+        visible_blocks = VisibleBlocks.bulk_get_or_create_shared(
+            course_key, [params['visible_blocks'] for params in grade_params_list]
+        )
+        existing_grades = {
+            (grade.user_id, grade.full_usage_key): grade
+            for grade in cls.objects.select_related('override').filter(
+                user_id__in={params['user_id'] for params in grade_params_list},
+                course_id=course_key,
+            )
+        }
+
+        grades, new_grades = [], []
+        for params in grade_params_list:
+            params['visible_blocks'] = visible_blocks[params['visible_blocks'].hash_value]
+            grade = existing_grades.get((params['user_id'], params['usage_key']))
+            if grade is None:
+                grade = PersistentSubsectionGrade(**params)
+                new_grades.append(grade)
+            else:
+                cls._update_grade_if_changed(grade, params)
+            grades.append(grade)
+
+        cls.objects.bulk_create(new_grades)
+        for grade in grades:
+            cls._emit_grade_calculated_event(grade)
+        return grades
+
+    @classmethod
+    def _update_grade_if_changed(cls, grade, params):
+        """
+        Updates the given existing grade with the given parameters,
+        with the same semantics as update_or_create_grade, but without
+        any query if none of its values have changed.
+        """
+        first_attempted = params.pop('first_attempted')
+        if first_attempted is not None and grade.first_attempted is None:
+            params['first_attempted'] = first_attempted
+        visible_blocks = params.pop('visible_blocks')
+        params['visible_blocks_id'] = visible_blocks.hashed
+        for unchanging_field in ('user_id', 'usage_key', 'course_id'):
+            params.pop(unchanging_field)
+
+        changed = {name: value for name, value in params.iteritems() if getattr(grade, name) != value}
+        if changed:
+            changed['modified'] = now()
+            cls.objects.filter(id=grade.id).update(**changed)
+            for name, value in changed.iteritems():
+                setattr(grade, name, value)
+        grade.visible_blocks = visible_blocks
+
     @classmethod
     def _prepare_params(cls, params):
         """
@@ -608,6 +700,54 @@ class PersistentCourseGrade(TimeStampedModel):
         cls._update_cache(course_id, user_id, grade)
         return grade
 
+    @classmethod
+    def bulk_update_or_create(cls, course_id, grade_params_list):
+        """
+        Bulk version of update_or_create, for the grades of any number of
+        users in the given course.  Creates the grades that don't exist
+        yet with a single bulk_create and only updates the existing grades
+        whose values have changed.
+
+        Returns the grades in the order of the given parameters.
+        """
+        existing_grades = {
+            grade.user_id: grade
+            for grade in cls.objects.filter(
+                user_id__in=[params['user_id'] for params in grade_params_list],
+                course_id=course_id,
+            )
+        }
+
+        grades, new_grades = [], []
+        for params in grade_params_list:
+            user_id = params.pop('user_id')
+            passed = params.pop('passed')
+            if params.get('course_version', None) is None:
+                params['course_version'] = ""
+
+            grade = existing_grades.get(user_id)
+            if grade is None:
+                grade = cls(user_id=user_id, course_id=course_id, **params)
+                if passed:
+                    grade.passed_timestamp = now()
+                new_grades.append(grade)
+            else:
+                if passed and not grade.passed_timestamp:
+                    params['passed_timestamp'] = now()
+                changed = {name: value for name, value in params.iteritems() if getattr(grade, name) != value}
+                if changed:
+                    changed['modified'] = now()
+                    cls.objects.filter(id=grade.id).update(**changed)
+                    for name, value in changed.iteritems():
+                        setattr(grade, name, value)
+            grades.append(grade)
+
+        cls.objects.bulk_create(new_grades)
+        for grade in grades:
+            cls._emit_grade_calculated_event(grade)
+            cls._update_cache(course_id, grade.user_id, grade)
+        return grades
+
     @classmethod
     def _update_cache(cls, course_id, user_id, grade):
         course_cache = get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(course_id))
@@ -63,6 +63,17 @@ class SubsectionGradeFactory(object):
         )
         self._unsaved_subsection_grades.clear()
 
+    def prime(self, csm_scores, submissions_scores, subsection_grade_models):
+        """
+        Primes this factory with the already loaded scores and persisted
+        subsection grades of its student, as loaded for many students at
+        once by the batch grading engine, so they aren't queried again.
+        """
+        # pylint: disable=attribute-defined-outside-init
+        self._csm_scores = csm_scores
+        self._submissions_scores = submissions_scores
+        self._cached_subsection_grades = {model.full_usage_key: model for model in subsection_grade_models}
+
     def update(self, subsection, only_if_higher=None, score_deleted=False, force_update_subsections=False, persist_grade=True):
         """
         Updates the SubsectionGrade object for the student and subsection.
@@ -126,6 +126,43 @@ def compute_grades_for_course(course_key, offset, batch_size, **kwargs):  # pyli
             raise result.error
 
 
+@task(
+    bind=True,
+    base=LoggedPersistOnFailureTask,
+    default_retry_delay=RETRY_DELAY_SECONDS,
+    max_retries=1,
+    time_limit=COURSE_GRADE_TIMEOUT_SECONDS,
+    routing_key=settings.RECALCULATE_GRADES_ROUTING_KEY
+)
+def recalculate_grades_for_users(self, **kwargs):
+    """
+    Recalculates the subsection and course grades of the users with the given
+    ``user_ids`` in the course with the given ``course_key``, e.g. once the
+    scores of a problem were rescored for many of them at once.
+
+    The users are graded together, so that the batch grading engine grades
+    them when it is enabled.
+    """
+    if 'event_transaction_id' in kwargs:
+        set_event_transaction_id(kwargs['event_transaction_id'])
+
+    if 'event_transaction_type' in kwargs:
+        set_event_transaction_type(kwargs['event_transaction_type'])
+
+    course_key = CourseKey.from_string(kwargs['course_key'])
+    if are_grades_frozen(course_key):
+        log.info("Attempted recalculate_grades_for_users for course '%s', but grades are frozen.", course_key)
+        return
+
+    try:
+        users = User.objects.filter(id__in=kwargs['user_ids'])
+        for result in CourseGradeFactory().iter(users=users, course_key=course_key, force_update=True):
+            if result.error is not None:
+                raise result.error
+    except Exception as exc:
+        raise self.retry(kwargs=kwargs, exc=exc)
+
+
 @task(
     bind=True,
     base=LoggedPersistOnFailureTask,
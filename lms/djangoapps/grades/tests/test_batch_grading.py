@@ -0,0 +1,133 @@
+"""
+Tests for the batch grading engine.
+"""
+import ddt
+import numpy as np
+from mock import Mock, patch
+
+from courseware.model_data import set_score
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory
+from xmodule.graders import AggregatedScore, AssignmentFormatGrader
+
+from ..batch_grading import BatchCourseGrader, _UserGroupGrades
+from ..config.waffle import BATCH_GRADING, waffle
+from ..course_grade_factory import CourseGradeFactory
+from ..models import PersistentCourseGrade, PersistentSubsectionGrade
+from .base import GradeTestBase
+
+
+@ddt.ddt
+class TestBatchCourseGrader(GradeTestBase):
+    """
+    Tests that the batch grading engine grades users the same way
+    CourseGradeFactory grades them one at a time.
+    """
+    def setUp(self):
+        super(TestBatchCourseGrader, self).setUp()
+        self.users = [self.request.user] + [UserFactory.create() for _ in range(3)]
+        for user in self.users[1:]:
+            CourseEnrollment.enroll(user, self.course.id)
+        set_score(self.users[0].id, self.problem.location, 1, 2)
+        set_score(self.users[1].id, self.problem.location, 2, 2)
+        set_score(self.users[1].id, self.problem2.location, 1, 1)
+        set_score(self.users[2].id, self.problem2.location, 0, 1)
+
+    def _iter_grades(self, batch_grading):
+        """
+        Returns the GradeResults of a forced update of all users' grades,
+        with or without the batch grading engine.
+        """
+        with waffle().override(BATCH_GRADING, active=batch_grading):
+            return list(CourseGradeFactory().iter(self.users, self.course, force_update=True))
+
+    def _persisted_grades(self):
+        """
+        Returns the persisted subsection and course grades of all users.
+        """
+        subsection_grades = {
+            (grade.user_id, grade.usage_key): (
+                grade.earned_all, grade.possible_all, grade.earned_graded, grade.possible_graded,
+                grade.visible_blocks_id, grade.first_attempted,
+            )
+            for grade in PersistentSubsectionGrade.objects.filter(course_id=self.course.id)
+        }
+        course_grades = {
+            grade.user_id: (grade.percent_grade, grade.letter_grade, grade.passed_timestamp is not None)
+            for grade in PersistentCourseGrade.objects.filter(course_id=self.course.id)
+        }
+        return subsection_grades, course_grades
+
+    def test_is_supported(self):
+        course_data = Mock(course=self.course, course_key=self.course.id)
+        self.assertFalse(BatchCourseGrader.is_supported(course_data))
+        with waffle().override(BATCH_GRADING, active=True):
+            self.assertTrue(BatchCourseGrader.is_supported(course_data))
+
+    def test_same_grades_as_per_user(self):
+        batch_results = self._iter_grades(batch_grading=True)
+        batch_persisted_grades = self._persisted_grades()
+        per_user_results = self._iter_grades(batch_grading=False)
+
+        self.assertEqual(self._persisted_grades(), batch_persisted_grades)
+        for batch_result, per_user_result in zip(batch_results, per_user_results):
+            self.assertEqual(batch_result.student, per_user_result.student)
+            self.assertIsNone(batch_result.error)
+            self.assertEqual(batch_result.course_grade.percent, per_user_result.course_grade.percent)
+            self.assertEqual(batch_result.course_grade.letter_grade, per_user_result.course_grade.letter_grade)
+            self.assertEqual(batch_result.course_grade.passed, per_user_result.course_grade.passed)
+            self.assertEqual(batch_result.course_grade.summary, per_user_result.course_grade.summary)
+
+    def test_unattempted_course_grade_not_persisted(self):
+        self._iter_grades(batch_grading=True)
+        _, course_grades = self._persisted_grades()
+        self.assertEqual(set(course_grades), {user.id for user in self.users[:3]})
+        self.assertEqual(course_grades[self.users[1].id], (1.0, u'Pass', True))
+
+    def test_signals_sent(self):
+        with patch('lms.djangoapps.grades.course_grade_factory.COURSE_GRADE_CHANGED.send_robust') as mock_signal:
+            self._iter_grades(batch_grading=True)
+        self.assertEqual(mock_signal.call_count, len(self.users))
+
+    def test_failed_batch_falls_back_to_per_user(self):
+        with patch.object(BatchCourseGrader, 'update', side_effect=Exception('batch failure')):
+            results = self._iter_grades(batch_grading=True)
+        self.assertEqual([result.student for result in results], self.users)
+        self.assertTrue(all(result.error is None for result in results))
+        self.assertEqual(results[1].course_grade.percent, 1.0)
+
+    @ddt.data(
+        # min_count, drop_count, graded subsection scores (None if not counted)
+        (0, 0, [(1, 2), (1, 1)]),
+        (4, 0, [(1, 2), None]),
+        (2, 1, [(1, 2), (3, 4), None]),
+        (1, 2, [(1, 2), (0, 1)]),
+        (0, 0, [None, None]),
+        (3, 0, []),
+    )
+    @ddt.unpack
+    def test_assignment_type_percent(self, min_count, drop_count, subsection_scores):
+        subgrader = AssignmentFormatGrader('Homework', min_count, drop_count)
+        subsections = [Mock(graded=True, format='Homework') for _ in subsection_scores]
+        group = _UserGroupGrades(Mock(subsections=subsections), course=None)
+        group.users = [Mock()]
+
+        earned_graded = np.array([[score[0] if score else 0.0 for score in subsection_scores]], dtype=float)
+        possible_graded = np.array([[score[1] if score else 0.0 for score in subsection_scores]], dtype=float)
+        percent_graded = np.around(
+            np.where(possible_graded > 0, earned_graded / np.where(possible_graded > 0, possible_graded, 1.0), 0.0),
+            decimals=2,
+        )
+        grade_sheet = {'Homework': {
+            index: Mock(
+                graded_total=AggregatedScore(earned, possible, graded=True, first_attempted=None),
+                percent_graded=round(float(earned) / possible, 2),
+                display_name=u'Subsection',
+            )
+            for index, (earned, possible) in enumerate(score for score in subsection_scores if score)
+        }}
+
+        self.assertAlmostEqual(
+            group._assignment_type_percent(subgrader, percent_graded, possible_graded)[0],  # pylint: disable=protected-access
+            subgrader.grade(grade_sheet)['percent'],
+        )
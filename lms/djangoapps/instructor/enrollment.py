@@ -20,7 +20,7 @@ from edx_ace.recipient import Recipient
 from six import text_type
 
 from course_modes.models import CourseMode
-from courseware.models import StudentModule
+from courseware.models import StudentModule, chunks
 from eventtracking import tracker
 from lms.djangoapps.grades.constants import ScoreDatabaseTableEnum
 from lms.djangoapps.grades.events import STATE_DELETED_EVENT_TYPE
@@ -56,6 +56,9 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 
 log = logging.getLogger(__name__)
 
+# Number of emails or users in each query made by EmailEnrollmentState.for_emails and enroll_emails
+EMAIL_QUERY_CHUNK_SIZE = 1000
+
 
 class EmailEnrollmentState(object):
     """ Store the complete enrollment state of an email in a class """
@@ -86,6 +89,50 @@ class EmailEnrollmentState(object):
         self.full_name = full_name
         self.mode = mode
 
+    @classmethod
+    def for_emails(cls, course_id, emails):
+        """
+        Returns a dict mapping each of the given emails to its
+        EmailEnrollmentState, read with a few queries for all of them.
+        """
+        users = {}
+        enrollments = {}
+        ceas = {}
+        for emails_chunk in chunks(list(set(emails)), EMAIL_QUERY_CHUNK_SIZE):
+            users.update(
+                (user.email, user)
+                for user in User.objects.filter(email__in=emails_chunk).select_related('profile')
+            )
+            for cea in CourseEnrollmentAllowed.objects.filter(email__in=emails_chunk, course_id=course_id).order_by('id'):
+                ceas.setdefault(cea.email, []).append(cea)
+        for users_chunk in chunks(users.values(), EMAIL_QUERY_CHUNK_SIZE):
+            enrollments.update(
+                (enrollment.user_id, enrollment)
+                for enrollment in CourseEnrollment.objects.filter(user__in=users_chunk, course_id=course_id)
+            )
+
+        states = {}
+        for email in emails:
+            state = cls.__new__(cls)
+            user = users.get(email)
+            email_ceas = ceas.get(email, [])
+            if user:
+                enrollment = enrollments.get(user.id)
+                state.user = True
+                state.enrollment = bool(enrollment and enrollment.is_active)
+                state.full_name = user.profile.name
+                state.mode = enrollment.mode if enrollment else None
+                email_ceas = [cea for cea in email_ceas if cea.user_id in (None, user.id)]
+            else:
+                state.user = False
+                state.enrollment = False
+                state.full_name = None
+                state.mode = None
+            state.allowed = bool(email_ceas)
+            state.auto_enroll = bool(email_ceas and email_ceas[0].auto_enroll)
+            states[email] = state
+        return states
+
     def __repr__(self):
         return "{}(user={}, enrollment={}, allowed={}, auto_enroll={})".format(
             self.__class__.__name__,
@@ -176,6 +223,71 @@ def enroll_email(course_id, student_email, auto_enroll=False, email_students=Fal
     return previous_state, after_state, enrollment_obj
 
 
+def enroll_emails(course_id, student_emails, auto_enroll=False, email_students=False, email_params=None,
+                  languages=None):
+    """
+    Enroll students by email, as enroll_email does for each of them, but
+    with CourseEnrollment.bulk_enroll for the registered students.
+
+    `student_emails` is a list of student's emails e.g. ["foo@bar.com"]
+    `languages` maps student's emails to the languages used to render their emails.
+
+    returns a list of (previous_state, after_state, enrollment_obj) tuples,
+        one per email, with the EmailEnrollmentState's representing the
+        state before and after the action.
+    """
+    languages = languages or {}
+    previous_states = EmailEnrollmentState.for_emails(course_id, student_emails)
+    registered_emails = [email for email in previous_states if previous_states[email].user]
+    users = {}
+    for emails_chunk in chunks(registered_emails, EMAIL_QUERY_CHUNK_SIZE):
+        users.update((user.email, user) for user in User.objects.filter(email__in=emails_chunk))
+
+    # Students who are already enrolled keep their mode; see enroll_email.
+    if CourseMode.is_white_label(course_id):
+        default_course_mode = CourseMode.DEFAULT_SHOPPINGCART_MODE_SLUG
+    else:
+        default_course_mode = None
+    users_by_mode = {}
+    for email in registered_emails:
+        previous_state = previous_states[email]
+        course_mode = previous_state.mode if previous_state.enrollment else default_course_mode
+        users_by_mode.setdefault(course_mode, []).append(users[email])
+
+    enrollments = {}
+    for course_mode, mode_users in users_by_mode.iteritems():
+        enrollments.update(CourseEnrollment.bulk_enroll(mode_users, course_id, course_mode))
+
+    for email in student_emails:
+        previous_state = previous_states[email]
+        if previous_state.user:
+            if email_students:
+                email_params['message_type'] = 'enrolled_enroll'
+                email_params['email_address'] = email
+                email_params['full_name'] = previous_state.full_name
+                send_mail_to_student(email, email_params, language=languages.get(email))
+
+        elif not is_email_retired(email):
+            cea, _ = CourseEnrollmentAllowed.objects.get_or_create(course_id=course_id, email=email)
+            cea.auto_enroll = auto_enroll
+            cea.save()
+            if email_students:
+                email_params['message_type'] = 'allowed_enroll'
+                email_params['email_address'] = email
+                send_mail_to_student(email, email_params, language=languages.get(email))
+
+    after_states = EmailEnrollmentState.for_emails(course_id, student_emails)
+
+    return [
+        (
+            previous_states[email],
+            after_states[email],
+            enrollments.get(users[email].id) if email in users else None,
+        )
+        for email in student_emails
+    ]
+
+
 def unenroll_email(course_id, student_email, email_students=False, email_params=None, language=None):
     """
     Unenroll a student by email.
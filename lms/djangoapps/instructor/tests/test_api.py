@@ -1142,6 +1142,40 @@ class TestInstructorAPIEnrollment(SharedModuleStoreTestCase, LoginEnrollmentTest
         response = self.client.post(url, {'identifiers': self.enrolled_student.email, 'action': action})
         self.assertEqual(response.status_code, 400)
 
+    @patch.dict(settings.FEATURES, {'ENABLE_SET_BASED_BATCH_ENROLLMENT': True})
+    def test_set_based_batch_enrollment(self):
+        url = reverse('students_update_enrollment', kwargs={'course_id': text_type(self.course.id)})
+        identifiers = [
+            self.enrolled_student.email,
+            self.notenrolled_student.username,
+            'robot-not-an-email',
+            self.allowed_email,
+            self.notregistered_email,
+        ]
+        response = self.client.post(url, {'identifiers': ','.join(identifiers), 'action': 'enroll'})
+        self.assertEqual(response.status_code, 200)
+
+        results = json.loads(response.content)['results']
+        self.assertEqual([result['identifier'] for result in results], identifiers)
+        self.assertTrue(results[2]['invalidIdentifier'])
+        self.assertEqual(
+            [(result['before']['enrollment'], result['after']['enrollment']) for result in results if 'after' in result],
+            [(True, True), (False, True), (False, False), (False, False)],
+        )
+        self.assertTrue(results[4]['after']['allowed'])
+        self.assertTrue(CourseEnrollment.is_enrolled(self.notenrolled_student, self.course.id))
+        self.assertTrue(CourseEnrollmentAllowed.objects.filter(email=self.notregistered_email).exists())
+
+        self.assertEqual(
+            sorted(ManualEnrollmentAudit.objects.values_list('enrolled_email', 'state_transition')),
+            sorted([
+                (self.enrolled_student.email, ENROLLED_TO_ENROLLED),
+                (self.notenrolled_student.email, UNENROLLED_TO_ENROLLED),
+                (self.allowed_email, UNENROLLED_TO_ALLOWEDTOENROLL),
+                (self.notregistered_email, UNENROLLED_TO_ALLOWEDTOENROLL),
+            ]),
+        )
+
     def test_invalid_email(self):
         url = reverse('students_update_enrollment', kwargs={'course_id': text_type(self.course.id)})
         response = self.client.post(url, {'identifiers': 'percivaloctavius@', 'action': 'enroll', 'email_students': False})
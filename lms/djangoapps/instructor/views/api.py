@@ -75,6 +75,7 @@ from edxmako.shortcuts import render_to_string
 from lms.djangoapps.instructor.access import ROLES, allow_access, list_with_level, revoke_access, update_forum_role
 from lms.djangoapps.instructor.enrollment import (
     enroll_email,
+    enroll_emails,
     get_email_params,
     get_user_email_language,
     send_beta_role_email,
@@ -678,6 +679,9 @@ def students_update_enrollment(request, course_id):
         email_params = get_email_params(course, auto_enroll, secure=request.is_secure())
 
     results = []
+    # (index in results, identifier, email, language) of the students to enroll with enroll_emails
+    pending_enrollments = []
+    batch_enrollment = action == 'enroll' and settings.FEATURES.get('ENABLE_SET_BASED_BATCH_ENROLLMENT', False)
     for identifier in identifiers:
         # First try to get a user object from the identifer
         user = None
@@ -696,28 +700,17 @@ def students_update_enrollment(request, course_id):
             # validity (obviously, cannot check if email actually /exists/,
             # simply that it is plausibly valid)
             validate_email(email)  # Raises ValidationError if invalid
+            if batch_enrollment:
+                # The results of batch enrollments are filled in below.
+                pending_enrollments.append((len(results), identifier, email, language))
+                results.append(None)
+                continue
+
             if action == 'enroll':
                 before, after, enrollment_obj = enroll_email(
                     course_id, email, auto_enroll, email_students, email_params, language=language
                 )
-                before_enrollment = before.to_dict()['enrollment']
-                before_user_registered = before.to_dict()['user']
-                before_allowed = before.to_dict()['allowed']
-                after_enrollment = after.to_dict()['enrollment']
-                after_allowed = after.to_dict()['allowed']
-
-                if before_user_registered:
-                    if after_enrollment:
-                        if before_enrollment:
-                            state_transition = ENROLLED_TO_ENROLLED
-                        else:
-                            if before_allowed:
-                                state_transition = ALLOWEDTOENROLL_TO_ENROLLED
-                            else:
-                                state_transition = UNENROLLED_TO_ENROLLED
-                else:
-                    if after_allowed:
-                        state_transition = UNENROLLED_TO_ALLOWEDTOENROLL
+                state_transition = _get_enroll_state_transition(before, after, state_transition)
 
             elif action == 'unenroll':
                 before, after = unenroll_email(
@@ -768,6 +761,38 @@ def students_update_enrollment(request, course_id):
                 'after': after.to_dict(),
             })
 
+    if pending_enrollments:
+        try:
+            enrollment_results = enroll_emails(
+                course_id,
+                [email for __, __, email, __ in pending_enrollments],
+                auto_enroll,
+                email_students,
+                email_params,
+                languages={email: language for __, __, email, language in pending_enrollments},
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception(u"Error while batch enrolling students")
+            log.exception(exc)
+            for index, identifier, __, __ in pending_enrollments:
+                results[index] = {
+                    'identifier': identifier,
+                    'error': True,
+                }
+        else:
+            audits = []
+            for (index, identifier, email, __), (before, after, enrollment_obj) in zip(
+                pending_enrollments, enrollment_results
+            ):
+                state_transition = _get_enroll_state_transition(before, after, DEFAULT_TRANSITION_STATE)
+                audits.append((email, state_transition, enrollment_obj))
+                results[index] = {
+                    'identifier': identifier,
+                    'before': before.to_dict(),
+                    'after': after.to_dict(),
+                }
+            ManualEnrollmentAudit.bulk_create_manual_enrollment_audits(request.user, audits, reason, role)
+
     response_payload = {
         'action': action,
         'results': results,
@@ -776,6 +801,33 @@ def students_update_enrollment(request, course_id):
     return JsonResponse(response_payload)
 
 
+def _get_enroll_state_transition(before, after, state_transition):
+    """
+    Returns the ManualEnrollmentAudit state transition of a student enrolled
+    by email, given the EmailEnrollmentStates before and after enrolling,
+    or `state_transition` if none applies.
+    """
+    before_enrollment = before.to_dict()['enrollment']
+    before_user_registered = before.to_dict()['user']
+    before_allowed = before.to_dict()['allowed']
+    after_enrollment = after.to_dict()['enrollment']
+    after_allowed = after.to_dict()['allowed']
+
+    if before_user_registered:
+        if after_enrollment:
+            if before_enrollment:
+                state_transition = ENROLLED_TO_ENROLLED
+            else:
+                if before_allowed:
+                    state_transition = ALLOWEDTOENROLL_TO_ENROLLED
+                else:
+                    state_transition = UNENROLLED_TO_ENROLLED
+    else:
+        if after_allowed:
+            state_transition = UNENROLLED_TO_ALLOWEDTOENROLL
+    return state_transition
+
+
 def _bulk_enrollment_csv_validator(file_storage, file_to_validate):
     """
     Verifies that the expected columns are present in the CSV used to enroll users to course.
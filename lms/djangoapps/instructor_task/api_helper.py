@@ -17,6 +17,7 @@ from six import text_type
 from courseware.courses import get_problems_in_section
 from courseware.module_render import get_xqueue_callback_url_prefix
 from lms.djangoapps.instructor_task.models import PROGRESS, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import aggregate_subtask_progress
 from util.db import outer_atomic
 from xmodule.modulestore.django import modulestore
 
@@ -208,8 +209,10 @@ def _update_instructor_task(instructor_task, task_result):
         # meaning that the subtasks have successfully been defined.  However, the InstructorTask
         # will be marked as in PROGRESS, until the last subtask completes and marks it as SUCCESS.
         # We want to ignore the parent SUCCESS if subtasks are still running, and just trust the
-        # contents of the InstructorTask.
+        # contents of the InstructorTask, aggregating the progress its subtasks have logged
+        # since it was last saved, if they log their progress.
         entry_needs_updating = False
+        aggregate_subtask_progress(instructor_task)
     elif result_state in [PROGRESS, SUCCESS]:
         # construct a status message directly from the task result's result:
         # it needs to go back with the entry passed in.
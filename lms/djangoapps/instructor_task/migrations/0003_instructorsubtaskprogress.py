@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor_task', '0002_gradereportsetting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstructorSubtaskProgress',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('subtask_id', models.CharField(max_length=255, db_index=True)),
+                ('state', models.CharField(max_length=50)),
+                ('status', models.TextField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('instructor_task', models.ForeignKey(to='instructor_task.InstructorTask', on_delete=django.db.models.deletion.CASCADE)),
+            ],
+        ),
+    ]
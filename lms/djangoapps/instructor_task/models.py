@@ -18,12 +18,14 @@ import hashlib
 import json
 import logging
 import os.path
+import shutil
+from tempfile import SpooledTemporaryFile
 from uuid import uuid4
 
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import models, transaction
 from opaque_keys.edx.django.models import CourseKeyField
 from six import text_type
@@ -180,12 +182,93 @@ class InstructorTask(models.Model):
         return json.dumps({'message': 'Task revoked before running'})
 
 
+class InstructorSubtaskProgress(models.Model):
+    """
+    Stores the statuses reported by the subtasks of an InstructorTask whose
+    subtasks log their progress (see instructor_task.subtasks).
+
+    Subtasks insert a row for each status they report, rather than updating
+    the `subtasks` and `task_output` fields of their InstructorTask, so that
+    they don't contend for its row lock.  The latest row of a subtask is its
+    current status, and the InstructorTask's progress is aggregated from them.
+
+    `instructor_task` is the parent InstructorTask of the subtask.
+    `subtask_id` stores the celery task id of the subtask.
+    `state` stores the state of the subtask, as in its status.
+    `status` stores the status of the subtask, as a JSON-serialized
+        SubtaskStatus.to_dict().
+    `created` stores the date that the status was reported.
+    """
+    class Meta(object):
+        app_label = "instructor_task"
+
+    instructor_task = models.ForeignKey(InstructorTask, on_delete=models.CASCADE)
+    subtask_id = models.CharField(max_length=255, db_index=True)
+    state = models.CharField(max_length=50)
+    status = models.TextField()  # JSON dictionary
+    created = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def latest_statuses(cls, entry_id, subtask_id=None):
+        """
+        Returns a dict mapping the id of each subtask of the given
+        InstructorTask that reported a status, or only of the given subtask,
+        to its latest status dict.
+        """
+        progress_rows = cls.objects.filter(instructor_task_id=entry_id)
+        if subtask_id is not None:
+            progress_rows = progress_rows.filter(subtask_id=subtask_id)
+        return {
+            row_subtask_id: json.loads(status)
+            for row_subtask_id, status in progress_rows.order_by('id').values_list('subtask_id', 'status')
+        }
+
+
+class ReportFile(object):
+    """
+    A CSV file for reports download, that rows can be appended to as they're
+    generated and that is stored with ReportStore.store_report_file once
+    complete. Its contents are kept in memory up to
+    REPORT_FILE_SPOOL_MAX_SIZE bytes, and in a temporary file on disk past
+    that, so that the memory used doesn't grow with the size of the report.
+    """
+    def __init__(self):
+        self.file = SpooledTemporaryFile(max_size=settings.REPORT_FILE_SPOOL_MAX_SIZE)
+        # Adding unicode signature (BOM) for MS Excel 2013 compatibility
+        self.file.write(codecs.BOM_UTF8)
+        self._csvwriter = csv.writer(self.file)
+        self.num_rows = 0
+
+    def write_rows(self, rows):
+        """
+        Appends the given rows (each row is an iterable of strings) to the
+        file, encoding them as utf-8 one at a time.
+        """
+        for row in rows:
+            self._csvwriter.writerow([unicode(item).encode('utf-8') for item in row])
+            self.num_rows += 1
+
+    def write_csv_file(self, csv_file):
+        """
+        Appends the rows of the given CSV file, as written by a ReportFile,
+        to the file, without the file's unicode signature.
+        """
+        if csv_file.read(len(codecs.BOM_UTF8)) != codecs.BOM_UTF8:
+            csv_file.seek(0)
+        shutil.copyfileobj(csv_file, self.file)
+
+    def close(self):
+        """
+        Closes the file, deleting it from disk.
+        """
+        self.file.close()
+
+
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Reports can be stored from a complete list of rows, or appended
+    to a ReportFile as they're generated and stored from it.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -217,15 +300,6 @@ class ReportStore(object):
             )
         return DjangoStorageReportStore.from_config(config_name)
 
-    def _get_utf8_encoded_rows(self, rows):
-        """
-        Given a list of `rows` containing unicode strings, return a
-        new list of rows with those strings encoded as utf-8 for CSV
-        compatibility.
-        """
-        for row in rows:
-            yield [unicode(item).encode('utf-8') for item in row]
-
 
 class DjangoStorageReportStore(ReportStore):
     """
@@ -270,13 +344,46 @@ class DjangoStorageReportStore(ReportStore):
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
         """
-        output_buffer = ContentFile('')
-        # Adding unicode signature (BOM) for MS Excel 2013 compatibility
-        output_buffer.write(codecs.BOM_UTF8)
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        report_file = ReportFile()
+        try:
+            report_file.write_rows(rows)
+            self.store_report_file(course_id, filename, report_file)
+        finally:
+            report_file.close()
+
+    def store_report_file(self, course_id, filename, report_file):
+        """
+        Given a course_id, filename, and ReportFile, write the contents of
+        the ReportFile to the storage backend, reading them from disk if they
+        were spooled there.
+        """
+        report_file.file.seek(0)
+        self.store(course_id, filename, File(report_file.file))
+
+    def open(self, course_id, filename):
+        """
+        Opens the file named `filename` stored for `course_id` for reading.
+        """
+        return self.storage.open(self.path_to(course_id, filename))
+
+    def delete(self, course_id, filename):
+        """
+        Deletes the file named `filename` stored for `course_id`.
+        """
+        self.storage.delete(self.path_to(course_id, filename))
+
+    def filenames_in(self, course_id, dirname):
+        """
+        For a given `course_id`, return the sorted names of the files stored
+        in its subdirectory `dirname`.
+        """
+        try:
+            _, filenames = self.storage.listdir(self.path_to(course_id, dirname))
+        except OSError:
+            # Django's FileSystemStorage fails with an OSError if the
+            # directory does not exist; other storage types return an empty list.
+            return []
+        return sorted(filenames)
 
     def links_for(self, course_id):
         """
@@ -9,13 +9,14 @@ from uuid import uuid4
 
 import psutil
 from celery.states import READY_STATES, RETRY, SUCCESS
+from django.conf import settings
 from django.core.cache import cache
 from django.db import DatabaseError, transaction
 
 from util.db import outer_atomic
 
 from .exceptions import DuplicateTaskException
-from .models import PROGRESS, QUEUING, InstructorTask
+from .models import PROGRESS, QUEUING, InstructorSubtaskProgress, InstructorTask
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -60,6 +61,47 @@ def track_memory_usage(metric, course_id):
         memory_used = total_usage - baseline_usage
 
 
+def _get_subtask_boundaries(item_querysets, item_id_field, items_per_task, total_num_subtasks):
+    """
+    Determines where each chunk of "items" generated by _generate_items_for_subtask starts.
+
+    Only the `item_id_field` of the items is read, in a single pass over each queryset
+    ordered by that field.  Each boundary is a tuple of the index of a queryset in
+    `item_querysets` and the `item_id_field` of the first item of the chunk in it.
+    At most `total_num_subtasks` boundaries are returned, so any items beyond
+    `total_num_subtasks` * `items_per_task` are left to the last chunk.
+    """
+    boundaries = []
+    num_items = 0
+    for queryset_index, queryset in enumerate(item_querysets):
+        item_ids = queryset.order_by(item_id_field).values_list(item_id_field, flat=True)
+        for item_id in item_ids.iterator():
+            if num_items % items_per_task == 0 and len(boundaries) < total_num_subtasks:
+                boundaries.append((queryset_index, item_id))
+            num_items += 1
+    return boundaries
+
+
+def _get_items_between(item_querysets, item_id_field, item_fields, start, end):
+    """
+    Returns the "items" of the querysets from the `start` boundary up to, but not including,
+    the `end` boundary, or up to the end of the last queryset if `end` is None.
+
+    Each queryset is read with a range query on `item_id_field`, so that the items of each
+    chunk are found by seeking to its boundary rather than by skipping the preceding items.
+    """
+    items = []
+    last_queryset_index = end[0] if end is not None else len(item_querysets) - 1
+    for queryset_index in range(start[0], last_queryset_index + 1):
+        queryset = item_querysets[queryset_index]
+        if queryset_index == start[0]:
+            queryset = queryset.filter(**{item_id_field + '__gte': start[1]})
+        if end is not None and queryset_index == end[0]:
+            queryset = queryset.filter(**{item_id_field + '__lt': end[1]})
+        items.extend(queryset.order_by(item_id_field).values(*item_fields))
+    return items
+
+
 def _generate_items_for_subtask(
     item_querysets,  # pylint: disable=bad-continuation
     item_fields,
@@ -67,6 +109,7 @@ def _generate_items_for_subtask(
     items_per_task,
     total_num_subtasks,
     course_id,
+    item_id_field='pk',
 ):
     """
     Generates a chunk of "items" that should be passed into a subtask.
@@ -76,9 +119,11 @@ def _generate_items_for_subtask(
         `item_fields` : the fields that should be included in the dict that is returned.
             These are in addition to the 'pk' field.
         `total_num_items` : the result of summing the count of each queryset in `item_querysets`.
-        `items_per_query` : size of chunks to break the query operation into.
         `items_per_task` : maximum size of chunks to break each query chunk into for use by a subtask.
+        `total_num_subtasks` : the number of chunks to generate, at most.
         `course_id` : course_id of the course. Only needed for the track_memory_usage context manager.
+        `item_id_field` : a field that is unique for the items of each queryset, by which the
+            items are ordered and chunked (see _get_subtask_boundaries).
 
     Returns:  yields a list of dicts, where each dict contains the fields in `item_fields`, plus the 'pk' field.
 
@@ -87,24 +132,14 @@ def _generate_items_for_subtask(
     num_items_queued = 0
     all_item_fields = list(item_fields)
     all_item_fields.append('pk')
-    num_subtasks = 0
-
-    items_for_task = []
 
     with track_memory_usage('course_email.subtask_generation.memory', course_id):
-        for queryset in item_querysets:
-            for item in queryset.values(*all_item_fields).iterator():
-                if len(items_for_task) == items_per_task and num_subtasks < total_num_subtasks - 1:
-                    yield items_for_task
-                    num_items_queued += items_per_task
-                    items_for_task = []
-                    num_subtasks += 1
-                items_for_task.append(item)
-
-        # yield remainder items for task, if any
-        if items_for_task:
-            yield items_for_task
-            num_items_queued += len(items_for_task)
+        boundaries = _get_subtask_boundaries(item_querysets, item_id_field, items_per_task, total_num_subtasks)
+        for start, end in zip(boundaries, boundaries[1:] + [None]):
+            items_for_task = _get_items_between(item_querysets, item_id_field, all_item_fields, start, end)
+            if items_for_task:
+                yield items_for_task
+                num_items_queued += len(items_for_task)
 
     # Note, depending on what kind of DB is used, it's possible for the queryset
     # we iterate over to change in the course of the query. Therefore it's
@@ -234,6 +269,10 @@ def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
     Monitoring code should assume that if an InstructorTask has subtask information, that it should
     rely on the status stored in the InstructorTask object, rather than status stored in the
     corresponding AsyncResult.
+
+    If FEATURES['ENABLE_SUBTASK_PROGRESS_LOG'] is on, the "subtasks" field is marked with a
+    'progress_log' key, and the subtasks log their statuses to InstructorSubtaskProgress instead
+    of updating the InstructorTask (see update_subtask_status).
     """
     task_progress = {
         'action_name': action_name,
@@ -259,6 +298,8 @@ def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
         'failed': 0,
         'status': subtask_status
     }
+    if settings.FEATURES.get('ENABLE_SUBTASK_PROGRESS_LOG', False):
+        subtask_dict['progress_log'] = True
     entry.subtasks = json.dumps(subtask_dict)
 
     # and save the entry immediately, before any subtasks actually start work:
@@ -275,6 +316,8 @@ def queue_subtasks_for_query(
     item_fields,
     items_per_task,
     total_num_items,
+    final_subtask_id=None,
+    item_id_field='pk',
 ):
     """
     Generates and queues subtasks to each execute a chunk of "items" generated by a queryset.
@@ -290,6 +333,11 @@ def queue_subtasks_for_query(
             These are in addition to the 'pk' field.
         `items_per_task` : maximum size of chunks to break each query chunk into for use by a subtask.
         `total_num_items` : total amount of items that will be put into subtasks
+        `final_subtask_id` : optional id of a subtask that is not queued here, but by the other
+            subtasks once they are all done, e.g. to combine their results.  The InstructorTask
+            only succeeds once this subtask is done too.
+        `item_id_field` : a field that is unique for the items of each queryset, by whose ranges
+            the items are chunked into subtasks.  Defaults to the primary key.
 
     Returns:  the task progress as stored in the InstructorTask object.
 
@@ -310,7 +358,12 @@ def queue_subtasks_for_query(
     )
     # Make sure this is committed to database before handing off subtasks to celery.
     with outer_atomic():
-        progress = initialize_subtask_info(entry, action_name, total_num_items, subtask_id_list)
+        progress = initialize_subtask_info(
+            entry,
+            action_name,
+            total_num_items,
+            subtask_id_list + ([final_subtask_id] if final_subtask_id else []),
+        )
 
     # Construct a generator that will return the recipients to use for each subtask.
     # Pass in the desired fields to fetch for each recipient.
@@ -321,6 +374,7 @@ def queue_subtasks_for_query(
         items_per_task,
         total_num_subtasks,
         entry.course_id,
+        item_id_field,
     )
 
     # Now create the subtasks, and start them running.
@@ -417,6 +471,8 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
 
     # Confirm that the InstructorTask doesn't think that this subtask has already been
     # performed successfully.
+    if subtask_dict.get('progress_log'):
+        subtask_status_info.update(InstructorSubtaskProgress.latest_statuses(entry_id, current_task_id))
     subtask_status = SubtaskStatus.from_dict(subtask_status_info[current_task_id])
     subtask_state = subtask_status.state
     if subtask_state in READY_STATES:
@@ -459,9 +515,16 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 
     The subtask lock acquired in the call to check_subtask_is_valid() is released here, only when
     the attempting of retries has concluded.
+
+    If the subtasks of the InstructorTask log their progress, the status is appended to the log
+    instead, without locking the InstructorTask (see _log_subtask_status).
     """
     try:
-        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        subtask_dict = json.loads(InstructorTask.objects.get(pk=entry_id).subtasks)
+        if subtask_dict.get('progress_log'):
+            _log_subtask_status(entry_id, subtask_dict, current_task_id, new_subtask_status)
+        else:
+            _update_subtask_status(entry_id, current_task_id, new_subtask_status)
     except DatabaseError:
         # If we fail, try again recursively.
         retry_count += 1
@@ -569,3 +632,101 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     except Exception:
         TASK_LOG.exception("Unexpected error while updating InstructorTask.")
         raise
+
+
+def _log_subtask_status(entry_id, subtask_dict, current_task_id, new_subtask_status):
+    """
+    Append the status of the subtask to the progress log of the parent InstructorTask.
+
+    Unlike _update_subtask_status, this doesn't lock the InstructorTask, so any number of
+    subtasks can report their statuses at the same time.  The InstructorTask's progress is
+    aggregated from the log and saved only when this is the last subtask to complete, and
+    at most every SUBTASK_PROGRESS_AGGREGATION_INTERVAL seconds before that, so that its
+    progress is kept current for the instructor dashboard.
+    """
+    TASK_LOG.info("Preparing to log status for subtask %s for instructor task %d with status %s",
+                  current_task_id, entry_id, new_subtask_status)
+
+    if current_task_id not in subtask_dict['status']:
+        # unexpected error -- raise an exception
+        format_str = "Unexpected task_id '{}': unable to log status for subtask of instructor task '{}'"
+        msg = format_str.format(current_task_id, entry_id)
+        TASK_LOG.warning(msg)
+        raise ValueError(msg)
+
+    InstructorSubtaskProgress.objects.create(
+        instructor_task_id=entry_id,
+        subtask_id=current_task_id,
+        state=new_subtask_status.state,
+        status=json.dumps(new_subtask_status.to_dict()),
+    )
+
+    # Subtasks that complete concurrently may all see the others' statuses
+    # here, but at least the last of them does.
+    num_completed = InstructorSubtaskProgress.objects.filter(
+        instructor_task_id=entry_id, state__in=READY_STATES
+    ).values('subtask_id').distinct().count()
+    is_done = num_completed >= subtask_dict['total']
+    key = "subtask-progress-{}".format(entry_id)
+    if is_done or cache.add(key, 'true', settings.SUBTASK_PROGRESS_AGGREGATION_INTERVAL):
+        _save_subtask_progress(entry_id)
+
+
+@transaction.atomic
+def _save_subtask_progress(entry_id):
+    """
+    Save the progress of the InstructorTask aggregated from its subtasks' progress log.
+
+    The InstructorTask is locked while its progress is aggregated, so that progress
+    aggregated earlier, from fewer statuses, can't be saved over it.
+    """
+    entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
+    if aggregate_subtask_progress(entry):
+        entry.save()
+        TASK_LOG.info("Task output aggregated to %s for instructor task %d", entry.task_output, entry_id)
+
+
+def aggregate_subtask_progress(entry):
+    """
+    Update the "subtasks" and "task_output" fields of the InstructorTask from its subtasks'
+    progress log, if its subtasks log their progress and it is still in progress.
+
+    The InstructorTask is only updated in memory.  Its counters are computed as
+    _update_subtask_status accumulates them, from the latest status of each subtask that is
+    done, and it is marked as SUCCESS once all of its subtasks are done.
+
+    Returns whether the InstructorTask was updated.
+    """
+    if entry.task_state != PROGRESS or len(entry.subtasks) == 0:
+        return False
+    subtask_dict = json.loads(entry.subtasks)
+    if not subtask_dict.get('progress_log'):
+        return False
+
+    subtask_status_info = subtask_dict['status']
+    for subtask_id, subtask_status in InstructorSubtaskProgress.latest_statuses(entry.id).iteritems():
+        if subtask_id in subtask_status_info:
+            subtask_status_info[subtask_id] = subtask_status
+
+    task_progress = json.loads(entry.task_output)
+    new_duration = int((time() - task_progress['start_time']) * 1000)
+    task_progress['duration_ms'] = max(task_progress['duration_ms'], new_duration)
+    for statname in ['attempted', 'succeeded', 'failed', 'skipped']:
+        task_progress[statname] = 0
+    subtask_dict['succeeded'] = 0
+    subtask_dict['failed'] = 0
+    for subtask_status in subtask_status_info.itervalues():
+        state = subtask_status['state']
+        if state in READY_STATES:
+            for statname in ['attempted', 'succeeded', 'failed', 'skipped']:
+                task_progress[statname] += subtask_status[statname]
+        if state == SUCCESS:
+            subtask_dict['succeeded'] += 1
+        elif state in READY_STATES:
+            subtask_dict['failed'] += 1
+
+    if subtask_dict['total'] - subtask_dict['succeeded'] - subtask_dict['failed'] <= 0:
+        entry.task_state = SUCCESS
+    entry.subtasks = json.dumps(subtask_dict)
+    entry.task_output = InstructorTask.create_output_for_success(task_progress)
+    return True
@@ -19,14 +19,24 @@ a problem URL and optionally a student.  These are used to set up the initial va
 of the query for traversing StudentModule objects.
 
 """
+import json
 import logging
 from functools import partial
 
 from celery import task
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.utils.translation import ugettext_noop
 
 from bulk_email.tasks import perform_delegate_email_batches
+from lms.djangoapps.instructor_task.exceptions import DuplicateTaskException
+from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    aggregate_subtask_progress,
+    check_subtask_is_valid,
+    update_subtask_status
+)
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
@@ -188,6 +198,107 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
+def calculate_grades_csv_shard(entry_id, xmodule_instance_args, first_user_id, last_user_id,
+                               merge_subtask_id, subtask_status_dict):
+    """
+    Grade the enrolled users of a course with ids from first_user_id to
+    last_user_id, as a subtask of a sharded calculate_grades_csv, and store
+    their part of the report.  The last shard to complete queues
+    calculate_grades_csv_merge to merge the parts.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('graded')
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    try:
+        task_progress = CourseGradeReport.generate_shard(
+            xmodule_instance_args,
+            entry_id,
+            entry.course_id,
+            json.loads(entry.task_input),
+            action_name,
+            first_user_id,
+            last_user_id,
+        )
+    except Exception:
+        TASK_LOG.exception(
+            u'InstructorTask ID: %s, Grade report shard %s for users %s to %s failed',
+            entry_id, current_task_id, first_user_id, last_user_id
+        )
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        _queue_grades_csv_merge_if_done(entry_id, xmodule_instance_args, merge_subtask_id)
+        raise
+
+    subtask_status.increment(
+        succeeded=task_progress['succeeded'],
+        failed=task_progress['failed'],
+        state=SUCCESS,
+    )
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    _queue_grades_csv_merge_if_done(entry_id, xmodule_instance_args, merge_subtask_id)
+    return subtask_status.to_dict()
+
+
+@task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
+def calculate_grades_csv_merge(entry_id, xmodule_instance_args, merge_subtask_id):
+    """
+    Merge the parts of a sharded grade report, once all of its shards are done,
+    and push the results to an S3 bucket for download.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    action_name = ugettext_noop('graded')
+    subtask_status = SubtaskStatus.create(merge_subtask_id)
+    try:
+        check_subtask_is_valid(entry_id, merge_subtask_id, subtask_status)
+    except DuplicateTaskException:
+        # Another shard queued the merge too; leave the InstructorTask to it.
+        return subtask_status.to_dict()
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    aggregate_subtask_progress(entry)
+    subtask_dict = json.loads(entry.subtasks)
+    if subtask_dict['failed'] > 0:
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, merge_subtask_id, subtask_status)
+        raise ValueError(
+            u'InstructorTask ID: {}, {} grade report shards failed'.format(entry_id, subtask_dict['failed'])
+        )
+
+    try:
+        CourseGradeReport.generate_merged(
+            xmodule_instance_args, entry_id, entry.course_id, json.loads(entry.task_input), action_name
+        )
+    except Exception:
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, merge_subtask_id, subtask_status)
+        raise
+
+    subtask_status.increment(state=SUCCESS)
+    update_subtask_status(entry_id, merge_subtask_id, subtask_status)
+    return subtask_status.to_dict()
+
+
+def _queue_grades_csv_merge_if_done(entry_id, xmodule_instance_args, merge_subtask_id):
+    """
+    Queues calculate_grades_csv_merge if only it remains to be done of the
+    subtasks of the given InstructorTask.  If several shards complete at
+    once, check_subtask_is_valid rejects all but one of the merges queued.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    aggregate_subtask_progress(entry)
+    subtask_dict = json.loads(entry.subtasks)
+    if subtask_dict['total'] - subtask_dict['succeeded'] - subtask_dict['failed'] == 1:
+        calculate_grades_csv_merge.apply_async(
+            (entry_id, xmodule_instance_args, merge_subtask_id),
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+        )
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
@@ -1,22 +1,29 @@
 """
 Functionality for generating grade reports.
 """
+import json
 import logging
+import os.path
 import re
 from collections import defaultdict, OrderedDict
 from datetime import datetime
-from itertools import chain, izip, izip_longest
+from itertools import chain, groupby, islice, izip_longest
+from tempfile import SpooledTemporaryFile
 from time import time
+from uuid import uuid4
 
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from lazy import lazy
+from xblock.fields import Scope
+from edx_user_state_client.interface import XBlockUserState
 from opaque_keys.edx.keys import UsageKey
 from pytz import UTC
 from six import text_type
 
 from course_blocks.api import get_course_blocks
 from courseware.courses import get_course_by_id
+from courseware.models import StudentModule
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from instructor_analytics.basic import list_problem_responses
 from instructor_analytics.csvs import format_dictlist
@@ -24,6 +31,8 @@ from lms.djangoapps.certificates.models import CertificateWhitelist, GeneratedCe
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
 from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportFile, ReportStore
+from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -37,11 +46,13 @@ from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import upload_csv_to_report_store, upload_report_file_to_report_store
 
 WAFFLE_NAMESPACE = 'instructor_task'
 WAFFLE_SWITCHES = WaffleSwitchNamespace(name=WAFFLE_NAMESPACE)
 OPTIMIZE_GET_LEARNERS_FOR_COURSE = 'optimize_get_learners_for_course'
+SHARDED_GRADE_REPORTS = 'sharded_grade_reports'
+SET_BASED_PROBLEM_RESPONSES = 'set_based_problem_responses'
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -87,6 +98,9 @@ class _CourseGradeReportContext(object):
         self.action_name = action_name
         self.course_id = course_id
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
+        # The (first, last) ids of the users to report on, when generating
+        # a shard of a sharded report.
+        self.user_id_range = None
 
     @lazy
     def course(self):
@@ -201,32 +215,192 @@ class CourseGradeReport(object):
     # Batch size for chunking the list of enrollees in the course.
     USER_BATCH_SIZE = 100
 
+    # Directory of the report store in which the shards of sharded reports
+    # store their parts, and suffix of the parts of the error report.
+    PARTS_DIR = u'grade_report_parts'
+    ERROR_PART_SUFFIX = u'_err.csv'
+
     @classmethod
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
         """
         Public method to generate a grade report.
+
+        If the `sharded_grade_reports` switch is on and the course has more
+        than GRADE_REPORT_USERS_PER_SHARD enrollments, this only queues a
+        subtask per shard of GRADE_REPORT_USERS_PER_SHARD enrollments, whose
+        parts of the report are merged by generate_merged once all are done.
         """
+        if WAFFLE_SWITCHES.is_enabled(SHARDED_GRADE_REPORTS):
+            enrollments = CourseEnrollment.objects.filter(course_id=course_id).order_by('user_id')
+            total_num_enrollments = enrollments.count()
+            if total_num_enrollments > settings.GRADE_REPORT_USERS_PER_SHARD:
+                return cls._queue_shards(
+                    _xmodule_instance_args, _entry_id, action_name, enrollments, total_num_enrollments
+                )
+
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
             return CourseGradeReport()._generate(context)
 
+    @classmethod
+    def generate_shard(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name,
+                       first_user_id, last_user_id):
+        """
+        Public method to generate the part of a sharded grade report for the
+        enrolled users with ids from first_user_id to last_user_id.
+        """
+        with modulestore().bulk_operations(course_id):
+            context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
+            context.user_id_range = (first_user_id, last_user_id)
+            return CourseGradeReport()._generate_part(context, _entry_id)
+
+    @classmethod
+    def generate_merged(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+        """
+        Public method to merge the parts of a sharded grade report.
+        """
+        with modulestore().bulk_operations(course_id):
+            context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
+            return CourseGradeReport()._merge_parts(context, _entry_id)
+
+    @classmethod
+    def _queue_shards(cls, _xmodule_instance_args, _entry_id, action_name, enrollments, total_num_enrollments):
+        """
+        Queues a calculate_grades_csv_shard subtask for each range of
+        GRADE_REPORT_USERS_PER_SHARD of the given enrollments, ordered by
+        user id, and registers the calculate_grades_csv_merge subtask that
+        the last of them to complete queues.
+        """
+        # Imported here since the tasks module imports this one.
+        from lms.djangoapps.instructor_task.tasks import calculate_grades_csv_shard
+
+        entry = InstructorTask.objects.get(pk=_entry_id)
+        merge_subtask_id = str(uuid4())
+
+        def _create_shard_subtask(shard_enrollments, initial_subtask_status):
+            """Creates a subtask to generate the part of the report of the given enrollments."""
+            return calculate_grades_csv_shard.subtask(
+                (
+                    _entry_id,
+                    _xmodule_instance_args,
+                    shard_enrollments[0]['user_id'],
+                    shard_enrollments[-1]['user_id'],
+                    merge_subtask_id,
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            )
+
+        TASK_LOG.info(
+            u'InstructorTask ID: %s, Course: %s, Queuing grade report shards for %s enrollments',
+            _entry_id,
+            entry.course_id,
+            total_num_enrollments,
+        )
+        return queue_subtasks_for_query(
+            entry,
+            action_name,
+            _create_shard_subtask,
+            [enrollments],
+            ['user_id'],
+            settings.GRADE_REPORT_USERS_PER_SHARD,
+            total_num_enrollments,
+            final_subtask_id=merge_subtask_id,
+            item_id_field='user_id',
+        )
+
     def _generate(self, context):
         """
         Internal method for generating a grade report for the given context.
         """
         context.update_status(u'Starting grades')
-        success_headers = self._success_headers(context)
-        error_headers = self._error_headers()
-        batched_rows = self._batched_rows(context)
+        success_file, error_file = ReportFile(), ReportFile()
+        try:
+            success_file.write_rows([self._success_headers(context)])
+            error_file.write_rows([self._error_headers()])
+            batched_rows = self._batched_rows(context)
+
+            context.update_status(u'Compiling grades')
+            self._compile(context, batched_rows, success_file, error_file)
 
-        context.update_status(u'Compiling grades')
-        success_rows, error_rows = self._compile(context, batched_rows)
+            context.update_status(u'Uploading grades')
+            self._upload(context, success_file, error_file)
+        finally:
+            success_file.close()
+            error_file.close()
+
+        return context.update_status(u'Completed grades')
+
+    def _generate_part(self, context, entry_id):
+        """
+        Internal method for generating the part of a sharded grade report
+        for the given context, and storing it for _merge_parts.
+        """
+        context.update_status(u'Starting grades')
+        success_file, error_file = ReportFile(), ReportFile()
+        try:
+            context.update_status(u'Compiling grades')
+            self._compile(context, self._batched_rows(context), success_file, error_file)
+
+            context.update_status(u'Uploading grades')
+            report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+            part_name = self._part_name(entry_id, context.user_id_range[0])
+            report_store.store_report_file(context.course_id, part_name + u'.csv', success_file)
+            if error_file.num_rows > 0:
+                report_store.store_report_file(context.course_id, part_name + self.ERROR_PART_SUFFIX, error_file)
+        finally:
+            success_file.close()
+            error_file.close()
+
+        return context.update_status(u'Completed grades')
 
-        context.update_status(u'Uploading grades')
-        self._upload(context, success_headers, success_rows, error_headers, error_rows)
+    def _merge_parts(self, context, entry_id):
+        """
+        Internal method for merging the parts of a sharded grade report for
+        the given context, in the order of their users' ids, and uploading
+        the merged reports.
+        """
+        context.update_status(u'Merging grades')
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        parts_dir = self._part_name(entry_id)
+        part_names = report_store.filenames_in(context.course_id, parts_dir)
+        error_part_names = [part_name for part_name in part_names if part_name.endswith(self.ERROR_PART_SUFFIX)]
+
+        success_file, error_file = ReportFile(), ReportFile()
+        try:
+            success_file.write_rows([self._success_headers(context)])
+            error_file.write_rows([self._error_headers()])
+            for part_name in part_names:
+                report_file = error_file if part_name in error_part_names else success_file
+                with report_store.open(context.course_id, os.path.join(parts_dir, part_name)) as part_file:
+                    report_file.write_csv_file(part_file)
+
+            context.update_status(u'Uploading grades')
+            date = datetime.now(UTC)
+            upload_report_file_to_report_store(success_file, 'grade_report', context.course_id, date)
+            if error_part_names:
+                upload_report_file_to_report_store(error_file, 'grade_report_err', context.course_id, date)
+        finally:
+            success_file.close()
+            error_file.close()
+            for part_name in part_names:
+                report_store.delete(context.course_id, os.path.join(parts_dir, part_name))
 
         return context.update_status(u'Completed grades')
 
+    def _part_name(self, entry_id, first_user_id=None):
+        """
+        Returns the name of the directory of the parts of the sharded grade
+        report of the given InstructorTask, or the name of the part of the
+        shard starting with the given user id, without its extension.
+        Part names sort in the order of their users' ids.
+        """
+        parts_dir = os.path.join(self.PARTS_DIR, unicode(entry_id))
+        if first_user_id is None:
+            return parts_dir
+        return os.path.join(parts_dir, u'{:012d}'.format(first_user_id))
+
     def _success_headers(self, context):
         """
         Returns a list of all applicable column headers for this grade report.
@@ -256,32 +430,33 @@ class CourseGradeReport(object):
             users = filter(lambda u: u is not None, users)
             yield self._rows_for_users(context, users)
 
-    def _compile(self, context, batched_rows):
+    def _compile(self, context, batched_rows, success_file, error_file):
         """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
+        Writes the success and error rows of the given batched_rows to the
+        given ReportFiles one batch at a time, updating the task's progress
+        after each batch.
         """
-        # partition and chain successes and errors
-        success_rows, error_rows = izip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
+        for success_rows, error_rows in batched_rows:
+            success_file.write_rows(success_rows)
+            error_file.write_rows(error_rows)
+
+            # update metrics on task status
+            context.task_progress.succeeded += len(success_rows)
+            context.task_progress.failed += len(error_rows)
+            context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
+            context.task_progress.update_task_state(extra_meta={'step': u'Compiling grades'})
 
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
-        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
         context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
 
-    def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
+    def _upload(self, context, success_file, error_file):
         """
-        Creates and uploads a CSV for the given headers and rows.
+        Uploads the CSVs written to the given ReportFiles.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
-        if len(error_rows) > 0:
-            error_rows = [error_headers] + error_rows
-            upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
+        upload_report_file_to_report_store(success_file, 'grade_report', context.course_id, date)
+        # The error file always has a header row.
+        if error_file.num_rows > 1:
+            upload_report_file_to_report_store(error_file, 'grade_report_err', context.course_id, date)
 
     def _grades_header(self, context):
         """
@@ -339,7 +514,26 @@ class CourseGradeReport(object):
                 ).select_related('profile')
                 yield users
 
+        def users_for_shard(course_id, first_user_id, last_user_id):
+            """
+            Get the users of a shard of a sharded report chunk by chunk.
+            """
+            filter_kwargs = {
+                'courseenrollment__course_id': course_id,
+                'id__gte': first_user_id,
+                'id__lte': last_user_id,
+            }
+            user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
+            for user_ids in grouper(user_ids_list):
+                yield get_user_model().objects.filter(
+                    id__in=[user_id for user_id in user_ids if user_id is not None],
+                ).select_related('profile').order_by('id')
+
         task_log_message = u'{}, Task type: {}'.format(context.task_info_string, context.action_name)
+        if context.user_id_range is not None:
+            TASK_LOG.info(u'%s, Creating Course Grade for users %s to %s', task_log_message, *context.user_id_range)
+            return users_for_shard(context.course_id, *context.user_id_range)
+
         if WAFFLE_SWITCHES.is_enabled(OPTIMIZE_GET_LEARNERS_FOR_COURSE):
             TASK_LOG.info(u'%s, Creating Course Grade with optimization', task_log_message)
             return users_for_course_v2(context.course_id)
@@ -598,6 +792,9 @@ class ProblemGradeReport(object):
 
 
 class ProblemResponses(object):
+    # Number of blocks whose StudentModules are read by each query of the
+    # set-based report.
+    BLOCKS_PER_QUERY = 20
 
     @classmethod
     def _build_problem_list(cls, course_blocks, root, path=None):
@@ -705,16 +902,212 @@ class ProblemResponses(object):
                     if max_count <= 0:
                         break
 
+        return student_data, cls._student_data_keys_list(student_data_keys)
+
+    @classmethod
+    def _write_student_data(cls, report_file, user_id, course_key, usage_key_str):
+        """
+        Write the CSV of the problem responses to all problems under the
+        ``problem_location`` root to the given ReportFile a block at a time,
+        with the same columns and rows as those built by _build_student_data.
+
+        The columns added by the blocks' report generators are only known once
+        all blocks were read, so each block's responses are first spooled to a
+        temporary file, one JSON object per line, which is kept on disk past
+        REPORT_FILE_SPOOL_MAX_SIZE bytes, and then written below the header.
+
+        Arguments:
+            report_file (ReportFile): The file to write the CSV to.
+            user_id (int): The user id for the user generating the report
+            course_key (CourseKey): The ``CourseKey`` for the course whose report
+                is being generated
+            usage_key_str (str): The generated report will include this
+                block and it child blocks.
+
+        Returns:
+            int: The number of responses written.
+        """
+        usage_key = UsageKey.from_string(usage_key_str).map_into_course(course_key)
+        user = get_user_model().objects.get(pk=user_id)
+        course_blocks = get_course_blocks(user, usage_key)
+        max_count = settings.FEATURES.get('MAX_PROBLEM_RESPONSES_COUNT')
+
+        num_responses = 0
+        student_data_keys = set()
+        responses_file = SpooledTemporaryFile(max_size=settings.REPORT_FILE_SPOOL_MAX_SIZE)
+        try:
+            for responses, user_state_keys in cls._iter_block_responses(course_key, course_blocks, usage_key, max_count):
+                for response in responses:
+                    responses_file.write(json.dumps(response, default=unicode) + '\n')
+                num_responses += len(responses)
+                student_data_keys.update(user_state_keys)
+
+            student_data_keys = cls._student_data_keys_list(student_data_keys)
+            report_file.write_rows([student_data_keys])
+            responses_file.seek(0)
+            report_file.write_rows(
+                [response.get(key, '') for key in student_data_keys]
+                for response in (json.loads(line) for line in responses_file)
+            )
+        finally:
+            responses_file.close()
+        return num_responses
+
+    @classmethod
+    def _student_data_keys_list(cls, student_data_keys):
+        """
+        Returns the keys of the student data to include in the CSV, given the
+        keys of the user states returned by the xblock report generators.
+        """
         # Keep the keys in a useful order, starting with username, title and location,
         # then the columns returned by the xblock report generator in sorted order and
         # finally end with the more machine friendly block_key and state.
-        student_data_keys_list = (
+        return (
             ['username', 'title', 'location'] +
             sorted(student_data_keys) +
             ['block_key', 'state']
         )
 
-        return student_data, student_data_keys_list
+    @classmethod
+    def _iter_block_responses(cls, course_key, course_blocks, usage_key, max_count):
+        """
+        Generate the problem responses to all blocks under the ``usage_key``
+        root block, a block at a time, in the order of the blocks' keys.
+
+        Unlike the per-block report, this loads the blocks with a single
+        modulestore query, and reads the StudentModules of BLOCKS_PER_QUERY
+        blocks at a time, instead of querying StudentModules twice per block.
+
+        Arguments:
+            course_key (CourseKey): The course of the report.
+            course_blocks (BlockStructureBlockData): Block structure for the
+                blocks of the course visible to the user generating the report.
+            usage_key (UsageKey): The root block of the report.
+            max_count (int|None): The maximum number of responses to generate.
+
+        Yields:
+            Tuple[List[Dict], Set[str]]: The responses to a block, and the
+                keys of the user states added to them by the block's
+                report generator.
+        """
+        store = modulestore()
+        with store.bulk_operations(course_key):
+            problems = {
+                block_key.map_into_course(course_key): (title, path, block_key)
+                for title, path, block_key in cls._build_problem_list(course_blocks, usage_key)
+                # Chapter and sequential blocks are filtered out since they include state
+                # which isn't useful for this report.
+                if block_key.block_type not in ('sequential', 'chapter')
+            }
+            blocks = cls._load_blocks(store.get_item(usage_key, depth=None), course_key, problems)
+
+            for block_key, student_modules in cls._iter_student_modules(course_key, sorted(problems, key=unicode)):
+                title, path, problem_key = problems[block_key]
+                if max_count is not None:
+                    student_modules = student_modules[:max_count]
+
+                # Blocks can implement the generate_report_data method to provide their own
+                # human-readable formatting for user state.
+                generated_report_data = defaultdict(list)
+                block = blocks.get(block_key)
+                if hasattr(block, 'generate_report_data'):
+                    user_states = (
+                        (username, json.loads(state), modified)
+                        for username, state, modified in student_modules
+                        if state
+                    )
+                    user_state_iterator = (
+                        XBlockUserState(username, block_key, state, modified, Scope.user_state)
+                        for username, state, modified in user_states
+                        # Like DjangoXBlockUserStateClient.iter_all_for_block, skip empty states.
+                        if state
+                    )
+                    try:
+                        for username, user_state in block.generate_report_data(user_state_iterator, max_count):
+                            generated_report_data[username].append(user_state)
+                    except NotImplementedError:
+                        pass
+
+                responses = []
+                user_state_keys = set()
+                for username, state, _ in student_modules:
+                    response = {
+                        'username': username,
+                        'state': state,
+                        'title': title,
+                        'location': ' > '.join(path),
+                        'block_key': str(problem_key),
+                    }
+                    # A block that has a single state per user can contain multiple responses
+                    # within the same state.
+                    for user_state in generated_report_data.get(username, []):
+                        user_response = response.copy()
+                        user_response.update(user_state)
+                        user_state_keys.update(user_state.keys())
+                        responses.append(user_response)
+                    if username not in generated_report_data:
+                        responses.append(response)
+
+                yield responses, user_state_keys
+
+                if max_count is not None:
+                    max_count -= len(responses)
+                    if max_count <= 0:
+                        return
+
+    @classmethod
+    def _load_blocks(cls, block, course_key, problems):
+        """
+        Returns a dict mapping the keys in ``problems`` to their descriptors,
+        found among the given descriptor and its descendants.
+        """
+        blocks = {}
+        stack = [block]
+        while stack:
+            block = stack.pop()
+            block_key = block.location.map_into_course(course_key)
+            if block_key in problems:
+                blocks[block_key] = block
+            if block.has_children:
+                stack.extend(block.get_children())
+        return blocks
+
+    @classmethod
+    def _iter_student_modules(cls, course_key, block_keys):
+        """
+        Generate the StudentModules of the given blocks, grouped by block in
+        the order of the given keys, with those of each block ordered by
+        student, as a tuple of the block key and a list of (username, state,
+        modified) tuples of the block's StudentModules, with their states
+        still serialized.
+        """
+        block_keys = iter(block_keys)
+        while True:
+            chunk = list(islice(block_keys, cls.BLOCKS_PER_QUERY))
+            if not chunk:
+                return
+            student_modules = StudentModule.objects.filter(
+                course_id=course_key,
+                module_state_key__in=chunk,
+            ).order_by('module_state_key', 'student_id').values_list(
+                'module_state_key', 'student__username', 'state', 'modified',
+            )
+            for module_state_key, rows in groupby(student_modules.iterator(), key=lambda row: row[0]):
+                yield module_state_key.map_into_course(course_key), [
+                    (username, state, modified) for _, username, state, modified in rows
+                ]
+
+    @classmethod
+    def _update_progress(cls, task_progress, num_rows):
+        """
+        Records the given number of rows as the task's results, before the
+        CSV is uploaded.
+        """
+        task_progress.attempted = task_progress.succeeded = num_rows
+        task_progress.skipped = task_progress.total - task_progress.attempted
+
+        current_step = {'step': 'Uploading CSV'}
+        task_progress.update_task_state(extra_meta=current_step)
 
     @classmethod
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, task_input, action_name):
@@ -729,32 +1122,41 @@ class ProblemResponses(object):
         current_step = {'step': 'Calculating students answers to problem'}
         task_progress.update_task_state(extra_meta=current_step)
         problem_location = task_input.get('problem_location')
+        csv_name = 'student_state_from_{}'.format(re.sub(r'[:/]', '_', problem_location))
+
+        if WAFFLE_SWITCHES.is_enabled(SET_BASED_PROBLEM_RESPONSES):
+            report_file = ReportFile()
+            try:
+                num_responses = cls._write_student_data(
+                    report_file,
+                    user_id=task_input.get('user_id'),
+                    course_key=course_id,
+                    usage_key_str=problem_location
+                )
+                cls._update_progress(task_progress, num_responses)
+                report_name = upload_report_file_to_report_store(report_file, csv_name, course_id, start_date)
+            finally:
+                report_file.close()
+        else:
+            # Compute result table and format it
+            student_data, student_data_keys = cls._build_student_data(
+                user_id=task_input.get('user_id'),
+                course_key=course_id,
+                usage_key_str=problem_location
+            )
 
-        # Compute result table and format it
-        student_data, student_data_keys = cls._build_student_data(
-            user_id=task_input.get('user_id'),
-            course_key=course_id,
-            usage_key_str=problem_location
-        )
-
-        for data in student_data:
-            for key in student_data_keys:
-                data.setdefault(key, '')
-
-        header, rows = format_dictlist(student_data, student_data_keys)
+            for data in student_data:
+                for key in student_data_keys:
+                    data.setdefault(key, '')
 
-        task_progress.attempted = task_progress.succeeded = len(rows)
-        task_progress.skipped = task_progress.total - task_progress.attempted
+            header, rows = format_dictlist(student_data, student_data_keys)
+            cls._update_progress(task_progress, len(rows))
 
-        rows.insert(0, header)
+            rows.insert(0, header)
 
-        current_step = {'step': 'Uploading CSV'}
-        task_progress.update_task_state(extra_meta=current_step)
+            # Perform the upload
+            report_name = upload_csv_to_report_store(rows, csv_name, course_id, start_date)
 
-        # Perform the upload
-        problem_location = re.sub(r'[:/]', '_', problem_location)
-        csv_name = 'student_state_from_{}'.format(problem_location)
-        report_name = upload_csv_to_report_store(rows, csv_name, course_id, start_date)
         current_step = {'step': 'CSV uploaded', 'report_name': report_name}
 
         return task_progress.update_task_state(extra_meta=current_step)
@@ -3,31 +3,54 @@ Instructor Tasks related to module state.
 """
 import json
 import logging
+from itertools import islice
 from time import time
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, FloatField, TextField, Value, When
+from django.utils import timezone
 from django.utils.translation import ugettext_noop
+from edx_django_utils.monitoring import set_custom_metric
 from opaque_keys.edx.keys import UsageKey
 
+from capa.capa_problem import LoncapaProblem, LoncapaSystem
+from capa.correctmap import CorrectMap
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from courseware.courses import get_course_by_id, get_problems_in_section
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache
-from courseware.models import StudentModule
+from courseware.models import BaseStudentModuleHistory, StudentModule
 from courseware.module_render import get_module_for_descriptor_internal
+from courseware.shared_user_state_cache import SharedUserStateCache
 from lms.djangoapps.grades.events import GRADES_OVERRIDE_EVENT_TYPE, GRADES_RESCORE_EVENT_TYPE
+from lms.djangoapps.grades.tasks import recalculate_grades_for_users
+from openedx.core.lib.grade_utils import is_score_higher_or_equal
 from student.models import get_user_by_username_or_email
-from track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
+from track.event_transaction_utils import (
+    create_new_event_transaction_id,
+    get_event_transaction_id,
+    set_event_transaction_type
+)
 from track.views import task_track
 from util.db import outer_atomic
 
 from xblock.runtime import KvsFieldData
 from xblock.scorable import Score
+from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
+from xmodule.util.sandboxing import can_execute_unsafe_code, get_python_lib_zip
 from ..exceptions import UpdateProblemModuleStateError
+from .grades import WAFFLE_SWITCHES
 from .runner import TaskProgress
 from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED, UPDATE_STATUS_SUCCEEDED
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
+BATCHED_RESCORING = 'batched_rescoring'
+
+# Number of StudentModules rescored and written together by batched rescoring.
+BATCHED_RESCORE_CHUNK_SIZE = 100
+
 
 def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
     """
@@ -86,6 +109,12 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
     task_progress.update_task_state()
 
+    if action_name == ugettext_noop('rescored') and len(problems) == 1:
+        problem_descriptor = problems.values()[0]
+        if _is_batched_rescore_supported(problem_descriptor):
+            _perform_batched_rescore(problem_descriptor, modules_to_update, task_input, task_progress)
+            return task_progress.update_task_state()
+
     for module_to_update in modules_to_update:
         task_progress.attempted += 1
         module_descriptor = problems[unicode(module_to_update.module_state_key)]
@@ -106,6 +135,27 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     return task_progress.update_task_state()
 
 
+class _CapaModuleStub(object):
+    """
+    Stands in for the CapaModule of the LoncapaProblems of batched rescoring,
+    for the responses that log the extended hints of the answers they grade.
+    No learner's module is bound, so those hint events are dropped.
+    """
+    class _Runtime(object):
+        """
+        A runtime that drops tracking events.
+        """
+        def track_function(self, event_type, event):  # pylint: disable=unused-argument
+            """
+            Drops the given tracking event.
+            """
+            pass
+
+    def __init__(self, location):
+        self.location = location
+        self.runtime = self._Runtime()
+
+
 @outer_atomic
 def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
     '''
@@ -193,6 +243,258 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
         return UPDATE_STATUS_SUCCEEDED
 
 
+def _is_batched_rescore_supported(problem_descriptor):
+    """
+    Returns whether the given problem is rescored in batches, without
+    instantiating an XModule per StudentModule.
+
+    Batched rescoring grades saved answers with a LoncapaProblem built without
+    a learner, so it doesn't support problems that refer to the learner's
+    anonymous id.  Since it doesn't send PROBLEM_WEIGHTED_SCORE_CHANGED, it
+    doesn't support courses whose scores are passed back to LTI consumers
+    either, and since the recalculated grades don't send
+    SUBSECTION_SCORE_CHANGED, it doesn't support courses with subsection
+    gating, whose prerequisites are evaluated on that signal.
+    """
+    course_key = problem_descriptor.location.course_key
+    return (
+        WAFFLE_SWITCHES.is_enabled(BATCHED_RESCORING) and
+        problem_descriptor.category == 'problem' and
+        'anonymous_student_id' not in problem_descriptor.data and
+        not _has_lti_graded_assignments(course_key) and
+        not modulestore().get_course(course_key, depth=0).enable_subsection_gating
+    )
+
+
+def _has_lti_graded_assignments(course_key):
+    """
+    Returns whether LTI consumers expect scores of the given course to be
+    passed back to them.
+    """
+    if not settings.FEATURES.get('ENABLE_LTI_PROVIDER', False):
+        return False
+    # Imported here since the lti_provider app is only installed if enabled.
+    from lti_provider.models import GradedAssignment
+    return GradedAssignment.objects.filter(course_key=course_key).exists()
+
+
+def _perform_batched_rescore(problem_descriptor, modules_to_update, task_input, task_progress):
+    """
+    Rescores the saved answers of the given StudentModules of the given capa
+    problem BATCHED_RESCORE_CHUNK_SIZE at a time, like rescore_problem_module_state
+    does one at a time, updating task_progress as it goes.
+
+    The problem is parsed once per random seed rather than once per learner.
+    The new states and scores of each chunk are written with a single UPDATE,
+    and the grades of the learners whose scores changed are recalculated by a
+    single recalculate_grades_for_users task per chunk.
+
+    Unlike rescore_problem_module_state, this doesn't send the per-learner
+    PROBLEM_WEIGHTED_SCORE_CHANGED and SUBSECTION_SCORE_CHANGED signals, so
+    their other receivers (such as LTI outcome passback and subsection gating,
+    see _is_batched_rescore_supported) aren't run, and it doesn't emit the
+    problem_rescore or hint feedback tracking events.
+    """
+    start_time = time()
+    compiled_problems = _CompiledProblems(problem_descriptor)
+    only_if_higher = task_input['only_if_higher']
+    modules_to_update = iter(modules_to_update)
+    while True:
+        chunk = list(islice(modules_to_update, BATCHED_RESCORE_CHUNK_SIZE))
+        if not chunk:
+            break
+
+        rescored_modules = []
+        for student_module in chunk:
+            task_progress.attempted += 1
+            try:
+                update_status = _rescore_student_module(compiled_problems, student_module, only_if_higher)
+            except UpdateProblemModuleStateError:
+                raise
+            except Exception:  # pylint: disable=broad-except
+                TASK_LOG.exception(
+                    u"unexpected error in batched rescore for course %s, problem %s and student %s",
+                    student_module.course_id, student_module.module_state_key, student_module.student_id,
+                )
+                update_status = UPDATE_STATUS_FAILED
+            if update_status == UPDATE_STATUS_SUCCEEDED:
+                task_progress.succeeded += 1
+                rescored_modules.append(student_module)
+            elif update_status == UPDATE_STATUS_FAILED:
+                task_progress.failed += 1
+            else:
+                task_progress.skipped += 1
+
+        if rescored_modules:
+            _save_rescored_modules(rescored_modules)
+        task_progress.update_task_state()
+
+    duration = time() - start_time
+    rows_per_second = task_progress.attempted / duration if duration > 0 else 0
+    set_custom_metric('instructor_task.batched_rescore.rows', task_progress.attempted)
+    set_custom_metric('instructor_task.batched_rescore.rows_per_second', rows_per_second)
+    TASK_LOG.info(
+        u"Batched rescore of problem %s: %d rows in %.1f seconds (%.1f rows/sec)",
+        problem_descriptor.location, task_progress.attempted, duration, rows_per_second,
+    )
+
+
+def _rescore_student_module(compiled_problems, student_module, only_if_higher):
+    """
+    Rescores the saved answers of the given StudentModule, updating its state,
+    and its grade and max_grade if its score changed, but not saving it.
+
+    Returns UPDATE_STATUS_SKIPPED if the problem wasn't answered, and marks a
+    StudentModule whose score changed with a `score_changed` attribute.
+    """
+    state = json.loads(student_module.state) if student_module.state else {}
+    # Like CapaMixin.has_submitted_answer.
+    if not state.get('done'):
+        return UPDATE_STATUS_SKIPPED
+
+    lcp = compiled_problems.for_state(state)
+    try:
+        # Like CapaMixin.update_correctness and calculate_score.
+        lcp.correct_map.update(lcp.get_grade_from_current_answers(None))
+        lcp_score = lcp.calculate_score()
+    except (LoncapaProblemError, StudentInputError, ResponseError):
+        TASK_LOG.warning(
+            u"error processing rescore call for course %(course)s, problem %(loc)s "
+            u"and student %(student)s",
+            dict(
+                course=student_module.course_id,
+                loc=student_module.module_state_key,
+                student=student_module.student_id
+            )
+        )
+        return UPDATE_STATUS_FAILED
+
+    # Like CapaMixin.set_state_from_lcp.
+    state.update(lcp.get_state())
+
+    # Like the grades app's score_published_handler.
+    raw_earned, raw_possible = lcp_score['score'], lcp_score['total']
+    student_module.score_changed = not (
+        only_if_higher and
+        student_module.grade is not None and
+        not is_score_higher_or_equal(student_module.grade, student_module.max_grade, raw_earned, raw_possible)
+    )
+    if student_module.score_changed:
+        state['score'] = {'raw_earned': raw_earned, 'raw_possible': raw_possible}
+        student_module.grade = raw_earned
+        student_module.max_grade = raw_possible
+
+    student_module.state = json.dumps(state)
+    return UPDATE_STATUS_SUCCEEDED
+
+
+def _save_rescored_modules(student_modules):
+    """
+    Saves the state, grade and max_grade of the given rescored StudentModules
+    with a single UPDATE, and queues the recalculation of the grades of the
+    learners whose scores changed.
+    """
+    modified = timezone.now()
+    with outer_atomic():
+        StudentModule.objects.filter(id__in=[student_module.id for student_module in student_modules]).update(
+            state=Case(
+                *[When(id=student_module.id, then=Value(student_module.state)) for student_module in student_modules],
+                output_field=TextField()
+            ),
+            grade=Case(
+                *[When(id=student_module.id, then=Value(student_module.grade)) for student_module in student_modules],
+                output_field=FloatField()
+            ),
+            max_grade=Case(
+                *[When(id=student_module.id, then=Value(student_module.max_grade)) for student_module in student_modules],
+                output_field=FloatField()
+            ),
+            modified=modified,
+        )
+        for student_module in student_modules:
+            student_module.modified = modified
+        BaseStudentModuleHistory.bulk_save_history(student_modules)
+
+    if SharedUserStateCache.is_enabled():
+        for student_module in student_modules:
+            SharedUserStateCache.invalidate_for(student_module.student_id, student_module.course_id)
+
+    user_ids = [student_module.student_id for student_module in student_modules if student_module.score_changed]
+    if user_ids:
+        create_new_event_transaction_id()
+        set_event_transaction_type(GRADES_RESCORE_EVENT_TYPE)
+        recalculate_grades_for_users.apply_async(kwargs={
+            'course_key': unicode(student_modules[0].course_id),
+            'user_ids': user_ids,
+            'event_transaction_id': unicode(get_event_transaction_id()),
+            'event_transaction_type': GRADES_RESCORE_EVENT_TYPE,
+        })
+
+
+class _CompiledProblems(object):
+    """
+    The LoncapaProblems of a capa problem, parsed once per random seed and
+    reused to grade the saved answers of each learner with that seed.
+    """
+    # Number of parsed problems kept at once, for problems randomized
+    # without a limit on their number of seeds.
+    MAX_PROBLEMS = 100
+
+    def __init__(self, problem_descriptor):
+        self.problem_descriptor = problem_descriptor
+        course_id = problem_descriptor.location.course_key
+        self.capa_system = LoncapaSystem(
+            ajax_url=None,
+            anonymous_student_id=None,
+            cache=cache,
+            can_execute_unsafe_code=lambda: can_execute_unsafe_code(course_id),
+            get_python_lib_zip=lambda: get_python_lib_zip(contentstore, course_id),
+            DEBUG=None,
+            filestore=problem_descriptor.runtime.resources_fs,
+            i18n=problem_descriptor.runtime.service(problem_descriptor, "i18n"),
+            node_path=None,
+            render_template=None,
+            seed=1,
+            STATIC_URL=None,
+            xqueue=None,
+            matlab_api_key=problem_descriptor.matlab_api_key,
+        )
+        self._problems = {}
+
+    def for_state(self, state):
+        """
+        Returns the LoncapaProblem for the seed of the given learner state,
+        loaded with the state's answers and correctness.
+        """
+        seed = state.get('seed', 1)
+        lcp = self._problems.get(seed)
+        if lcp is None:
+            if len(self._problems) >= self.MAX_PROBLEMS:
+                self._problems.clear()
+            lcp = self._problems[seed] = LoncapaProblem(
+                problem_text=self.problem_descriptor.data,
+                id=self.problem_descriptor.location.html_id(),
+                capa_system=self.capa_system,
+                capa_module=_CapaModuleStub(self.problem_descriptor.location),
+                seed=seed,
+                extract_tree=False,
+            )
+            if not lcp.supports_rescoring():
+                msg = "Specified module {0} does not support rescoring.".format(self.problem_descriptor.location)
+                raise UpdateProblemModuleStateError(msg)
+
+        # Like LoncapaProblem.__init__, for the learner's state.
+        lcp.student_answers = state.get('student_answers', {})
+        lcp.has_saved_answers = state.get('has_saved_answers', False)
+        lcp.correct_map = CorrectMap()
+        lcp.correct_map.set_dict(state.get('correct_map', {}))
+        lcp.done = state.get('done', False)
+        lcp.input_state = state.get('input_state', {})
+        # Like CapaMixin.update_correctness.
+        lcp.context['attempt'] = max(state.get('attempts', 0), 1)
+        return lcp
+
+
 @outer_atomic
 def override_score_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
     '''
@@ -28,7 +28,8 @@ from lms.djangoapps.instructor_task.api import (
     submit_reset_problem_attempts_for_all_students
 )
 from lms.djangoapps.instructor_task.models import InstructorTask
-from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport
+from lms.djangoapps.instructor_task.tasks_helper.grades import WAFFLE_SWITCHES, CourseGradeReport
+from lms.djangoapps.instructor_task.tasks_helper.module_state import BATCHED_RESCORING
 from lms.djangoapps.instructor_task.tests.test_base import (
     OPTION_1,
     OPTION_2,
@@ -227,6 +228,84 @@ class TestRescoringTask(TestIntegrationTask):
             problem_edit, new_expected_scores, new_expected_max, rescore_if_higher=True,
         )
 
+    @ddt.data(
+        (RescoreTestData(edit=dict(correct_answer=OPTION_2), new_expected_scores=(0, 1, 1, 2), new_expected_max=2),
+         False),
+        (RescoreTestData(edit=dict(num_inputs=2), new_expected_scores=(2, 1, 1, 0), new_expected_max=4),
+         False),
+        (RescoreTestData(edit=dict(correct_answer=OPTION_2), new_expected_scores=(2, 1, 1, 2), new_expected_max=2),
+         True),
+    )
+    @ddt.unpack
+    def test_batched_rescoring(self, rescore_test_data, rescore_if_higher):
+        """
+        Verify that batched rescoring updates grades the same way as rescoring
+        one StudentModule at a time.
+        """
+        with WAFFLE_SWITCHES.override(BATCHED_RESCORING, active=True):
+            with patch('lms.djangoapps.instructor_task.tasks.rescore_problem_module_state') as mock_rescore:
+                self.verify_rescore_results(
+                    rescore_test_data.edit,
+                    rescore_test_data.new_expected_scores,
+                    rescore_test_data.new_expected_max,
+                    rescore_if_higher=rescore_if_higher,
+                )
+        self.assertFalse(mock_rescore.called)
+
+    def test_batched_rescoring_hinted_problem(self):
+        """
+        Verify that batched rescoring grades problems with extended hints,
+        which log the hints of the answers they grade.
+        """
+        problem_url_name = 'H1P1'
+        ItemFactory.create(
+            parent_location=self.problem_section.location,
+            parent=self.problem_section,
+            category="problem",
+            display_name=problem_url_name,
+            data=textwrap.dedent("""
+                <problem>
+                <optionresponse>
+                    <optioninput>
+                        <option correct="True">{option_1}<optionhint>Right</optionhint></option>
+                        <option correct="False">{option_2}<optionhint>Wrong</optionhint></option>
+                    </optioninput>
+                </optionresponse>
+                </problem>
+            """.format(option_1=OPTION_1, option_2=OPTION_2))
+        )
+        location = InstructorTaskModuleTestCase.problem_location(problem_url_name)
+        descriptor = self.module_store.get_item(location)
+        self.submit_student_answer('u1', problem_url_name, [OPTION_1])
+        self.submit_student_answer('u2', problem_url_name, [OPTION_2])
+
+        with WAFFLE_SWITCHES.override(BATCHED_RESCORING, active=True):
+            with patch('lms.djangoapps.instructor_task.tasks.rescore_problem_module_state') as mock_rescore:
+                instructor_task = self.submit_rescore_all_student_answers('instructor', problem_url_name)
+
+        self.assertFalse(mock_rescore.called)
+        task_output = json.loads(InstructorTask.objects.get(id=instructor_task.id).task_output)
+        self.assertEqual((task_output['succeeded'], task_output['failed']), (2, 0))
+        self.check_state(self.user1, descriptor, 1, 1)
+        self.check_state(self.user2, descriptor, 0, 1)
+
+    def test_batched_rescoring_gated_course(self):
+        """
+        Verify that problems of courses with subsection gating are rescored
+        one StudentModule at a time, since batched rescoring doesn't send
+        SUBSECTION_SCORE_CHANGED.
+        """
+        problem_url_name = 'H1P1'
+        self.define_option_problem(problem_url_name)
+        self.submit_student_answer('u1', problem_url_name, [OPTION_1, OPTION_1])
+        self.course.enable_subsection_gating = True
+        self.module_store.update_item(self.course, self.user.id)
+
+        with WAFFLE_SWITCHES.override(BATCHED_RESCORING, active=True):
+            with patch('lms.djangoapps.instructor_task.tasks.rescore_problem_module_state') as mock_rescore:
+                self.submit_rescore_all_student_answers('instructor', problem_url_name)
+        self.assertTrue(mock_rescore.called)
+
     def test_rescoring_if_higher_scores_equal(self):
         """
         Specifically tests rescore when the previous and new raw scores are equal. In this case, the scores should
@@ -1,6 +1,7 @@
 """
 Tests for instructor_task/models.py.
 """
+import codecs
 import copy
 import time
 from cStringIO import StringIO
@@ -12,7 +13,7 @@ from mock import patch
 from opaque_keys.edx.locator import CourseLocator
 
 from common.test.utils import MockS3Mixin
-from lms.djangoapps.instructor_task.models import ReportStore
+from lms.djangoapps.instructor_task.models import ReportFile, ReportStore
 from lms.djangoapps.instructor_task.tests.test_base import TestReportMixin
 
 
@@ -51,6 +52,29 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    @override_settings(REPORT_FILE_SPOOL_MAX_SIZE=16)
+    def test_store_report_file(self):
+        """
+        Test that rows appended to a ReportFile past its spool size are
+        stored as a CSV.
+        """
+        report_store = self.create_report_store()
+        report_file = ReportFile()
+        report_file.write_rows([[u'Username', u'Grade']])
+        report_file.write_rows(([u'student{}'.format(index), index / 10.0] for index in range(10)))
+        self.assertTrue(report_file.file._rolled)  # pylint: disable=protected-access
+
+        report_store.store_report_file(self.course_id, 'report.csv', report_file)
+        report_file.close()
+
+        with report_store.storage.open(report_store.path_to(self.course_id, 'report.csv')) as stored_file:
+            self.assertEqual(
+                stored_file.read(),
+                codecs.BOM_UTF8 + 'Username,Grade\r\n' + ''.join(
+                    'student{},{}\r\n'.format(index, index / 10.0) for index in range(10)
+                ),
+            )
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
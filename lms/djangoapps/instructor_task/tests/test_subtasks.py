@@ -1,11 +1,23 @@
 """
 Unit tests for instructor_task subtasks.
 """
+import json
 from uuid import uuid4
 
+from celery.states import FAILURE, RETRY, SUCCESS
+from django.conf import settings
 from mock import Mock, patch
 
-from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
+from lms.djangoapps.instructor_task.exceptions import DuplicateTaskException
+from lms.djangoapps.instructor_task.models import PROGRESS, InstructorSubtaskProgress, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    _generate_items_for_subtask,
+    check_subtask_is_valid,
+    initialize_subtask_info,
+    queue_subtasks_for_query,
+    update_subtask_status
+)
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskCourseTestCase
 from student.models import CourseEnrollment
@@ -80,3 +92,70 @@ class TestSubtasks(InstructorTaskCourseTestCase):
         self.assertEqual(len(mock_create_subtask_fcn_args[0][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[1][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[2][0][0]), 5)
+
+    def test_generate_items_for_subtask_id_ranges(self):
+        """Test that _generate_items_for_subtask() chunks items by ranges of ids, with a query per chunk."""
+
+        self._enroll_students_in_course(self.course.id, 8)
+        enrollments = CourseEnrollment.objects.filter(course_id=self.course.id)
+        user_ids = sorted(enrollments.values_list('user_id', flat=True))
+
+        # One query for the boundaries of the chunks, and one for the items of each.
+        with self.assertNumQueries(4):
+            item_lists = list(_generate_items_for_subtask(
+                item_querysets=[enrollments],
+                item_fields=['user_id'],
+                total_num_items=len(user_ids),
+                items_per_task=3,
+                total_num_subtasks=3,
+                course_id=self.course.id,
+                item_id_field='user_id',
+            ))
+
+        self.assertEqual(
+            [[item['user_id'] for item in item_list] for item_list in item_lists],
+            [user_ids[:3], user_ids[3:6], user_ids[6:]],
+        )
+
+    def test_subtask_progress_log(self):
+        """Test that subtasks logging their progress update the InstructorTask once they're all done."""
+
+        instructor_task = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='bulk_course_email',
+        )
+        with patch.dict(settings.FEATURES, {'ENABLE_SUBTASK_PROGRESS_LOG': True}):
+            initialize_subtask_info(instructor_task, 'emailed', 5, ['subtask1', 'subtask2'])
+
+        def report_status(subtask_id, retried_nomax=0, **increments):
+            """Run the given (retried) subtask until it reports a status with the given increments."""
+            subtask_status = SubtaskStatus.create(subtask_id, retried_nomax=retried_nomax)
+            check_subtask_is_valid(instructor_task.id, subtask_id, subtask_status)
+            subtask_status.increment(**increments)
+            update_subtask_status(instructor_task.id, subtask_id, subtask_status)
+
+        # Keep the first status from being aggregated before all subtasks are done.
+        with patch('lms.djangoapps.instructor_task.subtasks.cache.add', return_value=False):
+            report_status('subtask1', succeeded=1, state=RETRY)
+            report_status('subtask1', retried_nomax=1, succeeded=2, failed=1, state=SUCCESS)
+            entry = InstructorTask.objects.get(pk=instructor_task.id)
+            self.assertEqual(entry.task_state, PROGRESS)
+            self.assertEqual(json.loads(entry.task_output)['succeeded'], 0)
+            with self.assertRaises(DuplicateTaskException):
+                check_subtask_is_valid(instructor_task.id, 'subtask1', SubtaskStatus.create('subtask1'))
+
+            report_status('subtask2', succeeded=1, skipped=1, state=FAILURE)
+
+        self.assertEqual(InstructorSubtaskProgress.objects.filter(instructor_task=instructor_task).count(), 3)
+        entry = InstructorTask.objects.get(pk=instructor_task.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        task_progress = json.loads(entry.task_output)
+        self.assertEqual(
+            [task_progress[statname] for statname in ['attempted', 'succeeded', 'failed', 'skipped', 'total']],
+            [4, 3, 1, 1, 5],
+        )
+        subtask_dict = json.loads(entry.subtasks)
+        self.assertEqual((subtask_dict['succeeded'], subtask_dict['failed']), (1, 1))
+        self.assertEqual(subtask_dict['status']['subtask1']['succeeded'], 2)
@@ -8,6 +8,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 import tempfile
@@ -67,6 +68,9 @@ from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
 from lms.djangoapps.instructor_task.tasks_helper.grades import (
     ENROLLED_IN_COURSE,
     NOT_ENROLLED_IN_COURSE,
+    SET_BASED_PROBLEM_RESPONSES,
+    SHARDED_GRADE_REPORTS,
+    WAFFLE_SWITCHES,
     CourseGradeReport,
     ProblemGradeReport,
     ProblemResponses,
@@ -76,6 +80,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data,
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -88,7 +93,7 @@ from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
 from openedx.core.djangoapps.credit.tests.factories import CreditCourseFactory
 from openedx.core.djangoapps.user_api.partition_schemes import RandomUserPartitionScheme
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase, TestConditionalContent
-from ..models import ReportStore
+from ..models import ReportFile, ReportStore
 from ..tasks_helper.utils import UPDATE_STATUS_FAILED, UPDATE_STATUS_SUCCEEDED
 
 
@@ -441,6 +446,49 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
             {'attempted': expected_students, 'succeeded': expected_students, 'failed': 0}, result
         )
 
+    def _read_grade_reports(self):
+        """
+        Returns the rows of the grade report and the grade error report of
+        self.course, if any, in the order of their users.
+        """
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        reports = {}
+        for report_csv_filename, _ in report_store.links_for(self.course.id):
+            report_name = 'grade_report_err' if 'grade_report_err' in report_csv_filename else 'grade_report'
+            with report_store.storage.open(report_store.path_to(self.course.id, report_csv_filename)) as csv_file:
+                reports[report_name] = sorted(unicodecsv.reader(csv_file, encoding='utf-8-sig'))
+        return reports
+
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    def test_sharded_report(self):
+        """
+        Test that a sharded grade report is the same as an unsharded one,
+        and that its parts are deleted once merged.
+        """
+        for i in range(5):
+            self.create_student('student{0}'.format(i), 'student{0}@example.com'.format(i))
+
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+            CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+        expected_reports = self._read_grade_reports()
+        shutil.rmtree(self.tmp_dir)
+
+        entry = InstructorTaskFactory.create(
+            task_type='grade_course', course_id=self.course.id, task_id='sharded-grade-report'
+        )
+        with WAFFLE_SWITCHES.override(SHARDED_GRADE_REPORTS, active=True):
+            with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+                result = CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+
+        self.assertDictContainsSubset({'total': 5}, result)
+        entry.refresh_from_db()
+        self.assertEqual(entry.task_state, 'SUCCESS')
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0}, json.loads(entry.task_output))
+        self.assertDictContainsSubset({'total': 4, 'succeeded': 4, 'failed': 0}, json.loads(entry.subtasks))
+        self.assertEqual(self._read_grade_reports(), expected_reports)
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(report_store.filenames_in(self.course.id, CourseGradeReport.PARTS_DIR + '/' + str(entry.id)), [])
+
 
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
@@ -480,6 +528,7 @@ class TestTeamGradeReport(InstructorGradeReportTestCase):
 
 
 # pylint: disable=protected-access
+@ddt.ddt
 class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
     """
     Tests that generation of CSV files listing student answers to a
@@ -634,6 +683,51 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         mock_generate_report_data.assert_called_with(ANY, ANY)
         mock_list_problem_responses.assert_called_with(self.course.id, ANY, ANY)
 
+    @ddt.data(None, 3)
+    def test_write_student_data_set_based(self, max_count):
+        """
+        Ensure that the set-based report writes the same responses as the
+        per-block report builds, and reads the StudentModules of several
+        blocks at once.
+        """
+        self.define_option_problem(u'Problem1')
+        self.define_option_problem(u'Problem2')
+        for ctr in range(2):
+            student = self.create_student('student{}'.format(ctr))
+            self.submit_student_answer(student.username, u'Problem1', ['Option 1'])
+            self.submit_student_answer(student.username, u'Problem2', ['Option 2'])
+
+        report_file = ReportFile()
+        self.addCleanup(report_file.close)
+        with patch.dict('django.conf.settings.FEATURES', {'MAX_PROBLEM_RESPONSES_COUNT': max_count}):
+            per_block_data, per_block_keys = ProblemResponses._build_student_data(
+                user_id=self.instructor.id,
+                course_key=self.course.id,
+                usage_key_str=str(self.course.location),
+            )
+            with patch.object(
+                ProblemResponses, '_iter_student_modules', wraps=ProblemResponses._iter_student_modules
+            ) as mock_iter:
+                num_responses = ProblemResponses._write_student_data(
+                    report_file,
+                    user_id=self.instructor.id,
+                    course_key=self.course.id,
+                    usage_key_str=str(self.course.location),
+                )
+
+        self.assertEqual(mock_iter.call_count, 1)
+        self.assertEqual(num_responses, max_count or 4)
+        report_file.file.seek(0)
+        reader = unicodecsv.DictReader(report_file.file, encoding='utf-8-sig')
+        set_based_data = list(reader)
+        self.assertEqual(reader.fieldnames, per_block_keys)
+        self.assertEqual(len(set_based_data), num_responses)
+        for data in per_block_data:
+            for key in per_block_keys:
+                data.setdefault(key, '')
+        sort_key = lambda data: (data['block_key'], data['username'])
+        self.assertEqual(sorted(set_based_data, key=sort_key), sorted(per_block_data, key=sort_key))
+
     def test_success(self):
         task_input = {
             'problem_location': str(self.course.location),
@@ -660,6 +754,27 @@ class TestProblemResponsesReport(TestReportMixin, InstructorTaskModuleTestCase):
         self.assertDictContainsSubset({'attempted': 3, 'succeeded': 3, 'failed': 0}, result)
         self.assertIn("report_name", result)
 
+    def test_success_set_based(self):
+        self.define_option_problem(u'Problem1')
+        for ctr in range(3):
+            student = self.create_student('student{}'.format(ctr))
+            self.submit_student_answer(student.username, u'Problem1', ['Option 1'])
+        task_input = {
+            'problem_location': str(self.course.location),
+            'user_id': self.instructor.id
+        }
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+            with WAFFLE_SWITCHES.override(SET_BASED_PROBLEM_RESPONSES, active=True):
+                result = ProblemResponses.generate(
+                    None, None, self.course.id, task_input, 'calculated'
+                )
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+
+        self.assertEquals(len(links), 1)
+        self.assertDictContainsSubset({'attempted': 3, 'succeeded': 3, 'failed': 0}, result)
+        self.assertIn("report_name", result)
+
 
 @ddt.ddt
 @patch.dict('django.conf.settings.FEATURES', {'ENABLE_PAID_COURSE_REGISTRATION': True})
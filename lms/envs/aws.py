@@ -245,6 +245,7 @@ BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = ENV_TOKENS.get(
     'BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS',
     BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS
 )
+BULK_EMAIL_CONNECTION_MAX_IDLE = ENV_TOKENS.get('BULK_EMAIL_CONNECTION_MAX_IDLE', BULK_EMAIL_CONNECTION_MAX_IDLE)
 # We want Bulk Email running on the high-priority queue, so we define the
 # routing key that points to it. At the moment, the name is the same.
 # We have to reset the value here, since we have changed the value of the queue name.
@@ -564,6 +565,10 @@ XQUEUE_INTERFACE = AUTH_TOKENS['XQUEUE_INTERFACE']
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
 CONTENTSTORE = AUTH_TOKENS.get('CONTENTSTORE', CONTENTSTORE)
 DOC_STORE_CONFIG = AUTH_TOKENS.get('DOC_STORE_CONFIG', DOC_STORE_CONFIG)
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES',
+    COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES
+)
 MONGODB_LOG = AUTH_TOKENS.get('MONGODB_LOG', {})
 
 EMAIL_HOST_USER = AUTH_TOKENS.get('EMAIL_HOST_USER', '')  # django default is ''
@@ -643,6 +648,11 @@ DISABLE_ACCOUNT_ACTIVATION_REQUIREMENT_SWITCH = ENV_TOKENS.get(
 GRADES_DOWNLOAD_ROUTING_KEY = ENV_TOKENS.get('GRADES_DOWNLOAD_ROUTING_KEY', HIGH_MEM_QUEUE)
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
+REPORT_FILE_SPOOL_MAX_SIZE = ENV_TOKENS.get("REPORT_FILE_SPOOL_MAX_SIZE", REPORT_FILE_SPOOL_MAX_SIZE)
+GRADE_REPORT_USERS_PER_SHARD = ENV_TOKENS.get("GRADE_REPORT_USERS_PER_SHARD", GRADE_REPORT_USERS_PER_SHARD)
+SUBTASK_PROGRESS_AGGREGATION_INTERVAL = ENV_TOKENS.get(
+    "SUBTASK_PROGRESS_AGGREGATION_INTERVAL", SUBTASK_PROGRESS_AGGREGATION_INTERVAL
+)
 
 # Rate limit for regrading tasks that a grading policy change can kick off
 POLICY_CHANGE_TASK_RATE_LIMIT = ENV_TOKENS.get('POLICY_CHANGE_TASK_RATE_LIMIT', POLICY_CHANGE_TASK_RATE_LIMIT)
@@ -913,6 +923,12 @@ MICROSITE_DATABASE_TEMPLATE_CACHE_TTL = ENV_TOKENS.get(
 STUDENTMODULEHISTORYEXTENDED_OFFSET = ENV_TOKENS.get(
     'STUDENTMODULEHISTORYEXTENDED_OFFSET', STUDENTMODULEHISTORYEXTENDED_OFFSET
 )
+CSMH_WRITE_BEHIND_FLUSH_DELAY = ENV_TOKENS.get('CSMH_WRITE_BEHIND_FLUSH_DELAY', CSMH_WRITE_BEHIND_FLUSH_DELAY)
+CSMH_WRITE_BEHIND_BATCH_SIZE = ENV_TOKENS.get('CSMH_WRITE_BEHIND_BATCH_SIZE', CSMH_WRITE_BEHIND_BATCH_SIZE)
+SHARED_USER_STATE_CACHE_TIMEOUT = ENV_TOKENS.get('SHARED_USER_STATE_CACHE_TIMEOUT', SHARED_USER_STATE_CACHE_TIMEOUT)
+COURSE_OUTLINE_CACHE_TIMEOUT = ENV_TOKENS.get('COURSE_OUTLINE_CACHE_TIMEOUT', COURSE_OUTLINE_CACHE_TIMEOUT)
+BULK_ENROLLMENT_SIGNALS_BATCH_SIZE = ENV_TOKENS.get('BULK_ENROLLMENT_SIGNALS_BATCH_SIZE', BULK_ENROLLMENT_SIGNALS_BATCH_SIZE)
+ENROLLMENT_STATE_CACHE_TIMEOUT = ENV_TOKENS.get('ENROLLMENT_STATE_CACHE_TIMEOUT', ENROLLMENT_STATE_CACHE_TIMEOUT)
 
 # Cutoff date for granting audit certificates
 if ENV_TOKENS.get('AUDIT_CERT_CUTOFF_DATE', None):
@@ -356,6 +356,40 @@ FEATURES = {
     # extended history table.
     'ENABLE_CSMH_EXTENDED': False,
 
+    # Queue new CSM history entries in an outbox table, to be written to
+    # the history tables in bulk by a celery task, instead of writing them
+    # while saving each StudentModule.
+    'ENABLE_CSMH_WRITE_BEHIND': False,
+
+    # Cache the XBlock user state loaded by FieldDataCache across requests,
+    # for SHARED_USER_STATE_CACHE_TIMEOUT seconds.
+    'ENABLE_SHARED_USER_STATE_CACHE': False,
+
+    # Render the courseware table of contents from a cached per-user outline
+    # of the course's transformed blocks, instead of the course's XModules.
+    'ENABLE_MATERIALIZED_COURSE_OUTLINE': False,
+
+    # Memoize the role, milestone, partition group and block access checks
+    # of has_access for each user and course, for the rest of the request.
+    'ENABLE_ACCESS_CONTEXT': False,
+
+    # Enroll the students of instructor batch enrollments with set-based
+    # writes, sending their enrollment signals from celery tasks.
+    'ENABLE_SET_BASED_BATCH_ENROLLMENT': False,
+
+    # Cache the mode and activation of enrollments across requests, for
+    # ENROLLMENT_STATE_CACHE_TIMEOUT seconds.
+    'ENABLE_SHARED_ENROLLMENT_STATE_CACHE': False,
+
+    # Have the subtasks of instructor tasks append their statuses to a
+    # progress log, instead of updating their parent InstructorTask under a
+    # row lock, and aggregate the parent's progress from that log.
+    'ENABLE_SUBTASK_PROGRESS_LOG': False,
+
+    # Send bulk course emails from messages rendered once per subtask, over
+    # a connection kept open across the subtasks run by each worker.
+    'ENABLE_PIPELINED_BULK_EMAIL': False,
+
     # Read from both the CSMH and CSMHE history tables.
     # This is the default, but can be disabled if all history
     # lives in the Extended table, saving the frontend from
@@ -903,6 +937,11 @@ MODULESTORE = {
     }
 }
 
+# Maximum total size, in bytes of pickled data, of the deserialized course
+# structures kept in memory by each process in front of the
+# 'course_structure_cache'. 0 disables it.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -1948,6 +1987,19 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum total size, in bytes of serialized data, of the deserialized
+    # block structures kept in memory by each process. 0 disables it.
+    # Only the process handling a course publish clears its own copies, so
+    # other processes serve the previous version until LOCAL_CACHE_TIMEOUT
+    # unless storage backing is enabled, in which case entries are keyed
+    # by the stored version.
+    LOCAL_CACHE_MAX_BYTES=0,
+
+    # Time, in seconds, after which a block structure kept in memory
+    # expires. This bounds how long a process may serve a structure
+    # updated by another process when storage backing is disabled.
+    LOCAL_CACHE_TIMEOUT=60,
 )
 
 ################################ Bulk Email ###################################
@@ -1994,6 +2046,10 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Seconds that the connection used to send bulk email may be left idle between
+# subtasks before it is reopened, when FEATURES['ENABLE_PIPELINED_BULK_EMAIL'] is on.
+BULK_EMAIL_CONNECTION_MAX_IDLE = 30
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -2595,6 +2651,8 @@ CERT_NAME_LONG = "Certificate of Achievement"
 
 ############## Settings for QVerse registration app ##############
 OTP_LINK_TIMEOUT = 60 # # Shows number of days and it's minimum value can be 1 day
+# Number of admission file rows processed by a single bulk user registration task
+BULK_USER_REGISTRATION_CHUNK_SIZE = 500
 
 #################### OpenBadges Settings #######################
 
@@ -2619,6 +2677,19 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+# Bytes of a CSV report kept in memory while it's generated, past which it's
+# spooled to a temporary file on disk.
+REPORT_FILE_SPOOL_MAX_SIZE = 10 * 1024 * 1024
+
+# Number of enrollments graded by each subtask of a sharded grade report, when
+# the instructor_task.sharded_grade_reports waffle switch is on.
+GRADE_REPORT_USERS_PER_SHARD = 5000
+
+# Minimum number of seconds between saves of the progress of an instructor
+# task aggregated from its subtasks' progress log, before all of them are done,
+# when FEATURES['ENABLE_SUBTASK_PROGRESS_LOG'] is on.
+SUBTASK_PROGRESS_AGGREGATION_INTERVAL = 30
+
 FINANCIAL_REPORTS = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-financial-reports',
@@ -2975,6 +3046,13 @@ DEFAULT_MOBILE_AVAILABLE = True
 # Enrollment API Cache Timeout
 ENROLLMENT_COURSE_DETAILS_CACHE_TIMEOUT = 60
 
+# Number of enrollments whose signals each task sent by CourseEnrollment.bulk_enroll sends
+BULK_ENROLLMENT_SIGNALS_BATCH_SIZE = 100
+
+# Seconds to cache enrollment states for, when
+# FEATURES['ENABLE_SHARED_ENROLLMENT_STATE_CACHE'] is on.
+ENROLLMENT_STATE_CACHE_TIMEOUT = 300
+
 # These tabs are currently disabled
 NOTES_DISABLED_TABS = ['course_structure', 'tags']
 
@@ -3280,6 +3358,19 @@ APP_UPGRADE_CACHE_TIMEOUT = 3600
 # if you want to avoid an overlap in ids while searching for history across the two tables.
 STUDENTMODULEHISTORYEXTENDED_OFFSET = 10000
 
+# Seconds to wait before flushing queued CSM history entries, and the number
+# of entries written per batch, when FEATURES['ENABLE_CSMH_WRITE_BEHIND'] is on.
+CSMH_WRITE_BEHIND_FLUSH_DELAY = 5
+CSMH_WRITE_BEHIND_BATCH_SIZE = 1000
+
+# Seconds to cache XBlock user state for, when
+# FEATURES['ENABLE_SHARED_USER_STATE_CACHE'] is on.
+SHARED_USER_STATE_CACHE_TIMEOUT = 300
+
+# Seconds to cache per-user course outlines for, when
+# FEATURES['ENABLE_MATERIALIZED_COURSE_OUTLINE'] is on.
+COURSE_OUTLINE_CACHE_TIMEOUT = 600
+
 # Cutoff date for granting audit certificates
 
 AUDIT_CERT_CUTOFF_DATE = None
@@ -218,6 +218,9 @@ CACHES = {
     },
 }
 
+# Course structures are not kept in memory across tests.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
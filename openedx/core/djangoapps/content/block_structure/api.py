@@ -43,6 +43,15 @@ def clear_course_from_cache(course_key):
     get_block_structure_manager(course_key).clear()
 
 
+def clear_course_from_local_cache(course_key):
+    """
+    A higher order function implemented on top of the
+    block_structure.clear_local_cache function that clears the block
+    structure from the process-local cache for the given course_key.
+    """
+    get_block_structure_manager(course_key).clear_local_cache()
+
+
 def get_block_structure_manager(course_key):
     """
     Returns the manager for managing Block Structures for the given course.
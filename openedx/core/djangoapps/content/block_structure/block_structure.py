@@ -8,7 +8,6 @@ The following internal data structures are implemented:
     _BlockRelations - Data structure for a single block's relations.
     _BlockData - Data structure for a single block's data.
 """
-from copy import deepcopy
 from functools import partial
 from logging import getLogger
 
@@ -39,6 +38,16 @@ class _BlockRelations(object):
         # list [UsageKey]
         self.children = []
 
+    def copy(self):
+        """
+        Returns a new instance of _BlockRelations with copies of this
+        instance's parents and children lists.
+        """
+        block_relations = _BlockRelations()
+        block_relations.parents = list(self.parents)
+        block_relations.children = list(self.children)
+        return block_relations
+
 
 class BlockStructure(object):
     """
@@ -62,6 +71,13 @@ class BlockStructure(object):
         # dict {UsageKey: _BlockRelations}
         self._block_relations = {}
 
+        # Set of usage keys of the blocks whose relations are owned by
+        # this structure, or None if this structure does not share its
+        # relations with a copy of it. Shared relations are copied on
+        # their first modification.
+        # set {UsageKey} or None
+        self._owned_block_relations = None
+
         # Add the root block.
         self._add_block(self._block_relations, root_block_usage_key)
 
@@ -120,7 +136,7 @@ class BlockStructure(object):
                 new root of the block structure.
         """
         self.root_block_usage_key = usage_key
-        self._block_relations[usage_key].parents = []
+        self._get_mutable_relations(usage_key).parents = []
 
     def __contains__(self, usage_key):
         """
@@ -205,29 +221,25 @@ class BlockStructure(object):
         """
         Mutates this block structure by removing any unreachable blocks.
         """
-
-        # Create a new block relations map to store only those blocks
-        # that are still linked
-        pruned_block_relations = {}
-        old_block_relations = self._block_relations
-
-        # Build the structure from the leaves up by doing a post-order
-        # traversal of the old structure, thereby encountering only
+        # A post-order traversal of the structure encounters only
         # reachable blocks.
-        for block_key in self.post_order_traversal():
-            # If the block is in the old structure,
-            if block_key in old_block_relations:
-                # Add it to the new pruned structure
-                self._add_block(pruned_block_relations, block_key)
-
-                # Add a relationship to only those old children that
-                # were also added to the new pruned structure.
-                for child in old_block_relations[block_key].children:
-                    if child in pruned_block_relations:
-                        self._add_to_relations(pruned_block_relations, block_key, child)
-
-        # Replace this structure's relations with the newly pruned one.
-        self._block_relations = pruned_block_relations
+        reachable_block_keys = {
+            block_key for block_key in self.post_order_traversal() if block_key in self._block_relations
+        }
+
+        for block_key in self._block_relations.keys():
+            if block_key not in reachable_block_keys:
+                del self._block_relations[block_key]
+
+        # Only the relations that refer to pruned blocks are updated, so
+        # that relations shared with a copy of this structure are copied
+        # only when they actually change.
+        for block_key in reachable_block_keys:
+            block_relations = self._block_relations[block_key]
+            if not all(key in reachable_block_keys for key in block_relations.parents + block_relations.children):
+                block_relations = self._get_mutable_relations(block_key)
+                block_relations.parents = [key for key in block_relations.parents if key in reachable_block_keys]
+                block_relations.children = [key for key in block_relations.children if key in reachable_block_keys]
 
     def _add_relation(self, parent_key, child_key):
         """
@@ -237,28 +249,32 @@ class BlockStructure(object):
             parent_key (UsageKey) - Usage key of the parent block.
             child_key (UsageKey) - Usage key of the child block.
         """
-        self._add_to_relations(self._block_relations, parent_key, child_key)
+        self._get_mutable_relations(parent_key).children.append(child_key)
+        self._get_mutable_relations(child_key).parents.append(parent_key)
 
-    @staticmethod
-    def _add_to_relations(block_relations, parent_key, child_key):
+    def _get_mutable_relations(self, usage_key):
         """
-        Adds a parent to child relationship in the given block
-        relations map.
+        Returns the _BlockRelations of the given block, first copying
+        them if they are shared with a copy of this structure. If not
+        found, creates and returns a new _BlockRelations and maps it to
+        the given key.
 
         Arguments:
-            block_relations (dict({UsageKey: _BlockRelations})) -
-                Internal map of a block's usage key to its
-                parents/children relations.
-
-            parent_key (UsageKey) - Usage key of the parent block.
-
-            child_key (UsageKey) - Usage key of the child block.
+            usage_key (UsageKey) - Usage key of the block whose
+                relations are to be modified.
         """
-        BlockStructure._add_block(block_relations, parent_key)
-        BlockStructure._add_block(block_relations, child_key)
+        block_relations = self._block_relations.get(usage_key)
+        if block_relations is None:
+            block_relations = _BlockRelations()
+        elif self._owned_block_relations is None or usage_key in self._owned_block_relations:
+            return block_relations
+        else:
+            block_relations = block_relations.copy()
 
-        block_relations[child_key].parents.append(parent_key)
-        block_relations[parent_key].children.append(child_key)
+        self._block_relations[usage_key] = block_relations
+        if self._owned_block_relations is not None:
+            self._owned_block_relations.add(usage_key)
+        return block_relations
 
     @staticmethod
     def _add_block(block_relations, usage_key):
@@ -414,24 +430,58 @@ class BlockStructureBlockData(BlockStructure):
         # Map of a transformer's name to its non-block-specific data.
         self.transformer_data = TransformerDataMap()
 
+        # Maps of an xBlock field name and of a transformer's name to a
+        # callable returning the field's value or the transformer's
+        # TransformerData for each block, for data that is not yet loaded
+        # into the blocks' BlockData. These are populated when the block
+        # structure is deserialized from the columnar format, so that only
+        # the data that is actually accessed gets decoded.
+        # dict {string: callable}
+        self._unloaded_xblock_fields = {}
+        self._unloaded_transformer_block_data = {}
+
+        # Sets of usage keys of the blocks and of names of the
+        # transformers whose data is owned by this structure, or None if
+        # this structure does not share its data with a copy of it.
+        # Shared data is copied on its first modification.
+        # set {UsageKey} or None
+        self._owned_block_data = None
+        # set {string} or None
+        self._owned_transformer_data = None
+
     def copy(self):
         """
-        Returns a new instance of BlockStructureBlockData with a
-        deep-copy of this instance's contents.
+        Returns a new instance of BlockStructureBlockData with the
+        same contents as this instance.
+
+        The relations and data of the blocks are shared between both
+        instances until either instance modifies them, so that copying
+        a collected block structure does not depend on its size.
         """
         from .factory import BlockStructureFactory
-        return BlockStructureFactory.create_new(
+        block_structure = BlockStructureFactory.create_new(
             self.root_block_usage_key,
-            deepcopy(self._block_relations),
-            deepcopy(self.transformer_data),
-            deepcopy(self._block_data_map),
+            dict(self._block_relations),
+            TransformerDataMap(self.transformer_data),
+            dict(self._block_data_map),
         )
+        # The loaders return new objects on each call, so they can be shared.
+        block_structure._unloaded_xblock_fields = dict(self._unloaded_xblock_fields)
+        block_structure._unloaded_transformer_block_data = dict(self._unloaded_transformer_block_data)
+
+        # Neither instance owns any of the shared relations and data.
+        for shared_block_structure in (self, block_structure):
+            shared_block_structure._owned_block_relations = set()
+            shared_block_structure._owned_block_data = set()
+            shared_block_structure._owned_transformer_data = set()
+        return block_structure
 
     def iteritems(self):
         """
         Returns iterator of (UsageKey, BlockData) pairs for all
         blocks in the BlockStructure.
         """
+        self._load_all_sections()
         return self._block_data_map.iteritems()
 
     def itervalues(self):
@@ -439,12 +489,14 @@ class BlockStructureBlockData(BlockStructure):
         Returns iterator of BlockData for all blocks in the
         BlockStructure.
         """
+        self._load_all_sections()
         return self._block_data_map.itervalues()
 
     def __getitem__(self, usage_key):
         """
         Returns the BlockData associated with the given key.
         """
+        self._load_all_sections()
         return self._block_data_map[usage_key]
 
     def get_xblock_field(self, usage_key, field_name, default=None):
@@ -463,6 +515,8 @@ class BlockStructureBlockData(BlockStructure):
             default (any type) - The value to return if a field value is
                 not found.
         """
+        if field_name in self._unloaded_xblock_fields:
+            self._load_xblock_field(field_name)
         block_data = self._block_data_map.get(usage_key)
         return getattr(block_data, field_name, default) if block_data else default
 
@@ -479,8 +533,9 @@ class BlockStructureBlockData(BlockStructure):
 
             override_data (object) - The data you want to set
         """
-        block_data = self._block_data_map.get(usage_key)
-        setattr(block_data, field_name, override_data)
+        if field_name in self._unloaded_xblock_fields:
+            self._load_xblock_field(field_name)
+        setattr(self._get_or_create_block(usage_key), field_name, override_data)
 
     def get_transformer_data(self, transformer, key, default=None):
         """
@@ -513,7 +568,7 @@ class BlockStructureBlockData(BlockStructure):
             value (any picklable type) - The value to associate with the
                 given key for the given transformer's data.
         """
-        setattr(self.transformer_data.get_or_create(transformer), key, value)
+        setattr(self._get_mutable_transformer_data(transformer), key, value)
 
     def get_transformer_block_data(self, usage_key, transformer):
         """
@@ -529,6 +584,8 @@ class BlockStructureBlockData(BlockStructure):
             transformer (BlockStructureTransformer) - The transformer
                 whose dictionary data is requested.
         """
+        if self._unloaded_transformer_block_data:
+            self._load_transformer_block_data(transformer)
         return self._block_data_map[usage_key].transformer_data[transformer]
 
     def get_transformer_block_field(self, usage_key, transformer, key, default=None):
@@ -574,6 +631,8 @@ class BlockStructureBlockData(BlockStructure):
                 given key for the given transformer's data for the
                 requested block.
         """
+        if self._unloaded_transformer_block_data:
+            self._load_transformer_block_data(transformer)
         setattr(
             self._get_or_create_block(usage_key).transformer_data.get_or_create(transformer),
             key,
@@ -594,9 +653,10 @@ class BlockStructureBlockData(BlockStructure):
         """
         try:
             transformer_block_data = self.get_transformer_block_data(usage_key, transformer)
-            delattr(transformer_block_data, key)
-        except (AttributeError, KeyError):
-            pass
+        except KeyError:
+            return
+        if key in transformer_block_data.fields:
+            delattr(self._get_or_create_block(usage_key).transformer_data[transformer], key)
 
     def remove_block(self, usage_key, keep_descendants):
         """
@@ -623,11 +683,11 @@ class BlockStructureBlockData(BlockStructure):
 
         # Remove block from its children.
         for child in children:
-            self._block_relations[child].parents.remove(usage_key)
+            self._get_mutable_relations(child).parents.remove(usage_key)
 
         # Remove block from its parents.
         for parent in parents:
-            self._block_relations[parent].children.remove(usage_key)
+            self._get_mutable_relations(parent).children.remove(usage_key)
 
         # Remove block.
         self._block_relations.pop(usage_key, None)
@@ -750,18 +810,134 @@ class BlockStructureBlockData(BlockStructure):
             raise TransformerException('Version attributes are not set on transformer {0}.', transformer.name())
         self.set_transformer_data(transformer, TRANSFORMER_VERSION_KEY, transformer.WRITE_VERSION)
 
+    def _add_unloaded_xblock_field(self, field_name, loader):
+        """
+        Registers the given loader for lazily loading the given xBlock
+        field's values into the blocks' data.
+
+        Arguments:
+            field_name (string) - The name of the xBlock field.
+
+            loader (() -> dict {UsageKey: any type}) - A callable
+                returning the field's value for each block.
+        """
+        self._unloaded_xblock_fields[field_name] = loader
+
+    def _add_unloaded_transformer_block_data(self, transformer, loader):
+        """
+        Registers the given loader for lazily loading the given
+        transformer's block data into the blocks' data.
+
+        Arguments:
+            transformer (BlockStructureTransformer or string) - The
+                transformer or its name.
+
+            loader (() -> dict {UsageKey: TransformerData}) - A callable
+                returning the transformer's data for each block.
+        """
+        self._unloaded_transformer_block_data[self.transformer_data._translate_key(transformer)] = loader
+
+    def _load_xblock_field(self, field_name):
+        """
+        Loads the values of the given xBlock field into the blocks' data,
+        if they have not been loaded yet.
+        """
+        loader = self._unloaded_xblock_fields.pop(field_name, None)
+        if loader is None:
+            return
+        for usage_key, value in loader().iteritems():
+            block_data = self._block_data_map.get(usage_key)
+            if block_data is not None:
+                block_data.fields.setdefault(field_name, value)
+
+    def _load_transformer_block_data(self, transformer):
+        """
+        Loads the given transformer's block data into the blocks' data,
+        if it has not been loaded yet.
+        """
+        transformer_name = self.transformer_data._translate_key(transformer)
+        loader = self._unloaded_transformer_block_data.pop(transformer_name, None)
+        if loader is None:
+            return
+        for usage_key, transformer_block_data in loader().iteritems():
+            block_data = self._block_data_map.get(usage_key)
+            if block_data is not None:
+                block_data.transformer_data.setdefault(transformer_name, transformer_block_data)
+
+    def _load_all_sections(self):
+        """
+        Loads all the xBlock fields and transformers' block data that
+        have not been loaded yet.
+        """
+        for field_name in list(self._unloaded_xblock_fields):
+            self._load_xblock_field(field_name)
+        for transformer_name in list(self._unloaded_transformer_block_data):
+            self._load_transformer_block_data(transformer_name)
+
     def _get_or_create_block(self, usage_key):
         """
-        Returns the BlockData associated with the given usage_key.
+        Returns the BlockData associated with the given usage_key,
+        first copying it if it is shared with a copy of this structure.
         If not found, creates and returns a new BlockData and
         maps it to the given key.
         """
-        try:
-            return self._block_data_map[usage_key]
-        except KeyError:
+        block_data = self._block_data_map.get(usage_key)
+        if block_data is None:
             block_data = BlockData(usage_key)
-            self._block_data_map[usage_key] = block_data
+        elif self._owned_block_data is None or usage_key in self._owned_block_data:
             return block_data
+        else:
+            block_data = self._copy_block_data(block_data)
+
+        self._block_data_map[usage_key] = block_data
+        if self._owned_block_data is not None:
+            self._owned_block_data.add(usage_key)
+        return block_data
+
+    def _get_mutable_transformer_data(self, transformer):
+        """
+        Returns the non-block-specific TransformerData of the given
+        transformer, first copying it if it is shared with a copy of
+        this structure. If not found, creates and returns a new
+        TransformerData and maps it to the given transformer.
+        """
+        transformer_name = self.transformer_data._translate_key(transformer)
+        transformer_data = self.transformer_data.get(transformer_name)
+        if transformer_data is None:
+            transformer_data = TransformerData()
+        elif self._owned_transformer_data is None or transformer_name in self._owned_transformer_data:
+            return transformer_data
+        else:
+            transformer_data = self._copy_transformer_data(transformer_data)
+
+        self.transformer_data[transformer_name] = transformer_data
+        if self._owned_transformer_data is not None:
+            self._owned_transformer_data.add(transformer_name)
+        return transformer_data
+
+    @staticmethod
+    def _copy_block_data(block_data):
+        """
+        Returns a copy of the given BlockData, including copies of its
+        transformers' data. The field values themselves are not copied.
+        """
+        block_data_copy = BlockData(block_data.location)
+        block_data_copy.fields = dict(block_data.fields)
+        for transformer_name, transformer_block_data in block_data.transformer_data.iteritems():
+            block_data_copy.transformer_data[transformer_name] = (
+                BlockStructureBlockData._copy_transformer_data(transformer_block_data)
+            )
+        return block_data_copy
+
+    @staticmethod
+    def _copy_transformer_data(transformer_data):
+        """
+        Returns a copy of the given TransformerData. The field values
+        themselves are not copied.
+        """
+        transformer_data_copy = TransformerData()
+        transformer_data_copy.fields = dict(transformer_data.fields)
+        return transformer_data_copy
 
 
 class BlockStructureModulestoreData(BlockStructureBlockData):
@@ -0,0 +1,570 @@
+"""
+Module for a compact, integer-indexed representation of block structures.
+
+BlockStructureBlockData keeps a _BlockRelations object with lists of
+parent and child usage keys for each block, and a BlockData object,
+with its own fields dict and TransformerDataMap, for each block. For
+large courses, this amounts to hundreds of thousands of small objects
+per request.
+
+CompactBlockStructure provides the same read, traversal and removal
+interface over a constant number of containers instead:
+
+    * each block's usage key is interned to an integer block id, its
+      index in the list of block keys,
+    * the parents and children relations are stored as integer arrays
+      in a compressed sparse row (CSR) layout,
+    * each xBlock field and each transformer's block data is stored in
+      a single list column indexed by block id,
+    * removed blocks are tracked in a byte array, rather than by
+      mutating the relations arrays.
+
+Traversals operate over the integer arrays and only translate block ids
+back to usage keys when calling the filter functions and yielding.
+"""
+from array import array
+from copy import deepcopy
+from functools import partial
+
+from .block_structure import TRANSFORMER_VERSION_KEY, TransformerData, TransformerDataMap
+
+
+# Type code of the integer arrays.
+_ARRAY_TYPECODE = 'l'
+
+# States of a block in the removed byte array.
+_PRESENT = 0
+_REMOVED = 1
+_REMOVED_KEEPING_DESCENDANTS = 2
+
+# Value of an xBlock field column entry for blocks without that field.
+_MISSING = object()
+
+
+class CompactBlockStructure(object):
+    """
+    Compact, integer-indexed alternative to BlockStructureBlockData,
+    supporting its block relations, traversal, removal, xBlock field
+    and transformer data methods.
+
+    When a block is removed while keeping its descendants, its children
+    take its place in the ordered children of each of its parents.
+    """
+    __slots__ = (
+        'root_block_usage_key',
+        'transformer_data',
+        '_block_keys',
+        '_block_ids',
+        '_children_offsets',
+        '_children',
+        '_parents_offsets',
+        '_parents',
+        '_removed',
+        '_num_removed',
+        '_xblock_fields',
+        '_transformer_block_fields',
+    )
+
+    def __init__(self, root_block_usage_key, block_keys, children_offsets, children, parents_offsets, parents):
+        """
+        Arguments:
+            root_block_usage_key (UsageKey) - The usage key of the root
+                block of the structure.
+
+            block_keys ([UsageKey]) - The usage keys of all the blocks,
+                indexed by block id.
+
+            children_offsets, children (array) - The CSR arrays of the
+                children relations. The children of block id i are
+                children[children_offsets[i]:children_offsets[i + 1]].
+
+            parents_offsets, parents (array) - The CSR arrays of the
+                parents relations.
+        """
+        self.root_block_usage_key = root_block_usage_key
+
+        # Map of a transformer's name to its non-block-specific data.
+        self.transformer_data = TransformerDataMap()
+
+        # List of usage keys, indexed by block id, and map of a usage key
+        # to its block id.
+        # list [UsageKey], dict {UsageKey: int}
+        self._block_keys = block_keys
+        self._block_ids = {block_key: block_id for block_id, block_key in enumerate(block_keys)}
+
+        # CSR arrays of the relations. These are never mutated, so they
+        # are shared by copies of the structure.
+        self._children_offsets = children_offsets
+        self._children = children
+        self._parents_offsets = parents_offsets
+        self._parents = parents
+
+        # State of each block, indexed by block id.
+        # bytearray
+        self._removed = bytearray(len(block_keys))
+        self._num_removed = 0
+
+        # Map of an xBlock field name to a column of its values, indexed
+        # by block id, and map of a transformer's name to a column of its
+        # block data fields dicts, indexed by block id.
+        # dict {string: list [any picklable type]}
+        # dict {string: list [dict or None]}
+        self._xblock_fields = {}
+        self._transformer_block_fields = {}
+
+    @classmethod
+    def create_from_block_structure(cls, block_structure):
+        """
+        Returns a new CompactBlockStructure with the blocks, relations
+        and collected data of the given block structure.
+
+        Arguments:
+            block_structure (BlockStructureBlockData) - The block
+                structure to convert.
+        """
+        # pylint: disable=protected-access
+        # Assign block ids in topological order, so that traversals
+        # access the arrays mostly sequentially, followed by any blocks
+        # that are not reachable from the root.
+        block_keys = list(block_structure.topological_traversal())
+        traversed_keys = set(block_keys)
+        block_keys.extend(
+            block_key for block_key in block_structure._block_relations
+            if block_key not in traversed_keys
+        )
+        block_ids = {block_key: block_id for block_id, block_key in enumerate(block_keys)}
+
+        children_offsets, children = _create_csr_arrays(
+            block_ids, block_keys, lambda block_key: block_structure._block_relations[block_key].children,
+        )
+        parents_offsets, parents = _create_csr_arrays(
+            block_ids, block_keys, lambda block_key: block_structure._block_relations[block_key].parents,
+        )
+        compact_structure = cls(
+            block_structure.root_block_usage_key,
+            block_keys,
+            children_offsets,
+            children,
+            parents_offsets,
+            parents,
+        )
+        compact_structure.transformer_data = deepcopy(block_structure.transformer_data)
+
+        block_structure._load_all_sections()
+        num_blocks = len(block_keys)
+        for block_key, block_data in block_structure._block_data_map.iteritems():
+            block_id = block_ids.get(block_key)
+            if block_id is None:
+                continue
+            for field_name, value in block_data.fields.iteritems():
+                column = compact_structure._xblock_fields.get(field_name)
+                if column is None:
+                    column = compact_structure._xblock_fields[field_name] = [_MISSING] * num_blocks
+                column[block_id] = deepcopy(value)
+            for transformer_name, transformer_block_data in block_data.transformer_data.iteritems():
+                column = compact_structure._transformer_block_fields.get(transformer_name)
+                if column is None:
+                    column = compact_structure._transformer_block_fields[transformer_name] = [None] * num_blocks
+                column[block_id] = deepcopy(transformer_block_data.fields)
+        return compact_structure
+
+    def copy(self):
+        """
+        Returns a new instance of CompactBlockStructure with a deep-copy
+        of this instance's mutable contents. The relations arrays and
+        block keys are shared.
+        """
+        new_copy = CompactBlockStructure.__new__(CompactBlockStructure)
+        new_copy.root_block_usage_key = self.root_block_usage_key
+        new_copy.transformer_data = deepcopy(self.transformer_data)
+        new_copy._block_keys = self._block_keys
+        new_copy._block_ids = self._block_ids
+        new_copy._children_offsets = self._children_offsets
+        new_copy._children = self._children
+        new_copy._parents_offsets = self._parents_offsets
+        new_copy._parents = self._parents
+        new_copy._removed = bytearray(self._removed)
+        new_copy._num_removed = self._num_removed
+        new_copy._xblock_fields = deepcopy(self._xblock_fields)
+        new_copy._transformer_block_fields = deepcopy(self._transformer_block_fields)
+        return new_copy
+
+    def __iter__(self):
+        return self.get_block_keys()
+
+    def __len__(self):
+        return len(self._block_keys) - self._num_removed
+
+    def __contains__(self, usage_key):
+        block_id = self._block_ids.get(usage_key)
+        return block_id is not None and not self._removed[block_id]
+
+    #--- Block structure relation methods ---#
+
+    def get_block_keys(self):
+        """
+        Returns an iterator of the usage keys of all the blocks in the
+        block structure.
+        """
+        removed = self._removed
+        return (
+            block_key for block_id, block_key in enumerate(self._block_keys)
+            if not removed[block_id]
+        )
+
+    def get_parents(self, usage_key):
+        """
+        Returns the list of usage keys of the parents of the block
+        identified by the given usage_key.
+        """
+        block_id = self._get_block_id(usage_key)
+        if block_id is None:
+            return []
+        return [self._block_keys[parent_id] for parent_id in self._get_parent_ids(block_id)]
+
+    def get_children(self, usage_key):
+        """
+        Returns the list of usage keys of the children of the block
+        identified by the given usage_key.
+        """
+        block_id = self._get_block_id(usage_key)
+        if block_id is None:
+            return []
+        return [self._block_keys[child_id] for child_id in self._get_child_ids(block_id)]
+
+    #--- Block structure traversal methods ---#
+
+    def topological_traversal(
+            self,
+            filter_func=None,
+            yield_descendants_of_unyielded=False,
+            start_node=None,
+    ):
+        """
+        Performs a topological sort of the block structure and yields
+        the usage_key of each block as it is encountered.
+
+        Arguments:
+            See the description in
+            openedx.core.lib.graph_traversals.traverse_topologically.
+        """
+        start_id = self._block_ids[start_node or self.root_block_usage_key]
+        block_keys = self._block_keys
+
+        # Visit state of each block id: 0 if not yet visited, 1 if
+        # visited but not yielded and 2 if yielded.
+        visited = bytearray(len(block_keys))
+        stack = [start_id]
+
+        while stack:
+            block_id = stack.pop()
+            if visited[block_id]:
+                continue
+
+            if block_id != start_id:
+                parent_states = [visited[parent_id] for parent_id in self._get_parent_ids(block_id)]
+                if not all(parent_states):
+                    continue
+                elif not yield_descendants_of_unyielded and 2 not in parent_states:
+                    continue
+
+            # Add the children before filtering, since the filter may
+            # remove the block from the structure. Only a removed start
+            # block can be encountered here, and it has no children.
+            if not self._removed[block_id]:
+                stack.extend(reversed(self._get_child_ids(block_id)))
+
+            if filter_func is None or filter_func(block_keys[block_id]):
+                visited[block_id] = 2
+                yield block_keys[block_id]
+            else:
+                visited[block_id] = 1
+
+    def post_order_traversal(
+            self,
+            filter_func=None,
+            start_node=None,
+    ):
+        """
+        Performs a post-order sort of the block structure and yields
+        the usage_key of each block as it is encountered.
+
+        Arguments:
+            See the description in
+            openedx.core.lib.graph_traversals.traverse_post_order.
+        """
+        start_id = self._block_ids[start_node or self.root_block_usage_key]
+        block_keys = self._block_keys
+        if filter_func is not None and not filter_func(block_keys[start_id]):
+            return
+
+        visited = bytearray(len(block_keys))
+        stack = [(start_id, iter(self._get_child_ids(start_id) if not self._removed[start_id] else ()))]
+
+        while stack:
+            block_id, child_ids = stack[-1]
+            for child_id in child_ids:
+                if not visited[child_id] and (filter_func is None or filter_func(block_keys[child_id])):
+                    stack.append((child_id, iter(self._get_child_ids(child_id))))
+                    break
+            else:
+                stack.pop()
+                if not visited[block_id]:
+                    visited[block_id] = 1
+                    yield block_keys[block_id]
+
+    #--- Block data methods ---#
+
+    def get_xblock_field(self, usage_key, field_name, default=None):
+        """
+        Returns the collected value of the xBlock field for the
+        requested block for the requested field_name; returns default if
+        not found.
+        """
+        block_id = self._get_block_id(usage_key)
+        column = self._xblock_fields.get(field_name)
+        if block_id is None or column is None:
+            return default
+        value = column[block_id]
+        return default if value is _MISSING else value
+
+    def override_xblock_field(self, usage_key, field_name, override_data):
+        """
+        Sets the value of the xBlock field for the requested block for
+        the requested field_name.
+        """
+        block_id = self._block_ids[usage_key]
+        column = self._xblock_fields.get(field_name)
+        if column is None:
+            column = self._xblock_fields[field_name] = [_MISSING] * len(self._block_keys)
+        column[block_id] = override_data
+
+    def get_transformer_data(self, transformer, key, default=None):
+        """
+        Returns the value associated with the given key from the given
+        transformer's data dictionary; returns default if not found.
+        """
+        try:
+            return getattr(self.transformer_data[transformer], key, default)
+        except KeyError:
+            return default
+
+    def set_transformer_data(self, transformer, key, value):
+        """
+        Updates the given transformer's data dictionary with the given
+        key and value.
+        """
+        setattr(self.transformer_data.get_or_create(transformer), key, value)
+
+    def get_transformer_block_data(self, usage_key, transformer):
+        """
+        Returns the TransformerData for the given transformer for the
+        block identified by the given usage_key. The returned object
+        shares its fields with this structure, so updates to it are
+        reflected in the structure.
+
+        Raises KeyError if not found.
+        """
+        fields = self._get_transformer_block_fields(usage_key, transformer)
+        if fields is None:
+            raise KeyError(usage_key)
+        transformer_block_data = TransformerData()
+        transformer_block_data.fields = fields
+        return transformer_block_data
+
+    def get_transformer_block_field(self, usage_key, transformer, key, default=None):
+        """
+        Returns the value associated with the given key for the given
+        transformer for the block identified by the given usage_key;
+        returns default if not found.
+        """
+        fields = self._get_transformer_block_fields(usage_key, transformer)
+        if fields is None:
+            return default
+        return fields.get(key, default)
+
+    def set_transformer_block_field(self, usage_key, transformer, key, value):
+        """
+        Updates the given transformer's data dictionary with the given
+        key and value for the block identified by the given usage_key.
+        """
+        block_id = self._block_ids[usage_key]
+        transformer_name = self.transformer_data._translate_key(transformer)  # pylint: disable=protected-access
+        column = self._transformer_block_fields.get(transformer_name)
+        if column is None:
+            column = self._transformer_block_fields[transformer_name] = [None] * len(self._block_keys)
+        if column[block_id] is None:
+            column[block_id] = {}
+        column[block_id][key] = value
+
+    def remove_transformer_block_field(self, usage_key, transformer, key):
+        """
+        Deletes the given key from the given transformer's data for the
+        block identified by the given usage_key.
+        """
+        fields = self._get_transformer_block_fields(usage_key, transformer)
+        if fields is not None:
+            fields.pop(key, None)
+
+    #--- Block removal methods ---#
+
+    def remove_block(self, usage_key, keep_descendants):
+        """
+        Removes the block identified by the usage_key and all of its
+        related data from the block structure.
+
+        Note: As with BlockStructureBlockData, all descendants of the
+        block remain in the structure unless the _prune_unreachable
+        method is called.
+
+        Arguments:
+            usage_key (UsageKey) - Usage key of the block that is to be
+                removed.
+
+            keep_descendants (bool) - If True, the removed block's
+                children become children of the removed block's parents.
+        """
+        block_id = self._get_block_id(usage_key)
+        if block_id is None:
+            raise KeyError(usage_key)
+        self._removed[block_id] = _REMOVED_KEEPING_DESCENDANTS if keep_descendants else _REMOVED
+        self._num_removed += 1
+
+    def create_universal_filter(self):
+        """
+        Returns a filter function that always returns True for all blocks.
+        """
+        return lambda block_key: True
+
+    def create_removal_filter(self, removal_condition, keep_descendants=False):
+        """
+        Returns a filter function that automatically removes blocks that
+        satisfy the removal_condition.
+        """
+        return partial(
+            self.retain_or_remove,
+            removal_condition=removal_condition,
+            keep_descendants=keep_descendants,
+        )
+
+    def retain_or_remove(self, block_key, removal_condition, keep_descendants=False):
+        """
+        Removes the given block if it satisfies the removal_condition.
+        Returns True if the block was retained, and False if the block
+        was removed.
+        """
+        if removal_condition(block_key):
+            self.remove_block(block_key, keep_descendants)
+            return False
+        return True
+
+    def remove_block_traversal(self, removal_condition, keep_descendants=False):
+        """
+        Traverses the block structure using topological sort and removes
+        all blocks satisfying the given removal_condition.
+        """
+        self.filter_topological_traversal(
+            filter_func=self.create_removal_filter(removal_condition, keep_descendants)
+        )
+
+    def filter_topological_traversal(self, filter_func, **kwargs):
+        """
+        Traverses the block structure using topological sort and applies
+        the given filter.
+        """
+        for _ in self.topological_traversal(filter_func=filter_func, **kwargs):
+            pass
+
+    #--- Internal methods ---#
+
+    def _get_transformer_data_version(self, transformer):
+        """
+        Returns the version number stored for the given transformer.
+        """
+        return self.get_transformer_data(transformer, TRANSFORMER_VERSION_KEY, 0)
+
+    def _prune_unreachable(self):
+        """
+        Removes any blocks that are not reachable from the root block.
+        """
+        reachable = bytearray(len(self._block_keys))
+        for block_key in self.post_order_traversal():
+            reachable[self._block_ids[block_key]] = 1
+        for block_id, is_reachable in enumerate(reachable):
+            if not is_reachable and not self._removed[block_id]:
+                self._removed[block_id] = _REMOVED
+                self._num_removed += 1
+
+    def _get_block_id(self, usage_key):
+        """
+        Returns the block id of the given usage key, or None if the
+        block is not in the structure.
+        """
+        block_id = self._block_ids.get(usage_key)
+        if block_id is None or self._removed[block_id]:
+            return None
+        return block_id
+
+    def _get_child_ids(self, block_id):
+        """
+        Returns the block ids of the children of the given block id,
+        replacing any child removed while keeping its descendants with
+        its own children.
+        """
+        child_ids = self._children[self._children_offsets[block_id]:self._children_offsets[block_id + 1]]
+        if not self._num_removed:
+            return child_ids
+        return self._get_related_ids(child_ids, self._get_child_ids)
+
+    def _get_parent_ids(self, block_id):
+        """
+        Returns the block ids of the parents of the given block id,
+        replacing any parent removed while keeping its descendants with
+        its own parents.
+        """
+        parent_ids = self._parents[self._parents_offsets[block_id]:self._parents_offsets[block_id + 1]]
+        if not self._num_removed:
+            return parent_ids
+        return self._get_related_ids(parent_ids, self._get_parent_ids)
+
+    def _get_related_ids(self, related_ids, get_related_ids):
+        """
+        Returns the given related block ids without the removed blocks,
+        expanding those removed while keeping their descendants with
+        get_related_ids.
+        """
+        removed = self._removed
+        result = array(_ARRAY_TYPECODE)
+        for related_id in related_ids:
+            state = removed[related_id]
+            if state == _PRESENT:
+                result.append(related_id)
+            elif state == _REMOVED_KEEPING_DESCENDANTS:
+                result.extend(get_related_ids(related_id))
+        return result
+
+    def _get_transformer_block_fields(self, usage_key, transformer):
+        """
+        Returns the dict of the given transformer's data for the block
+        identified by the given usage_key, or None if not found.
+        """
+        block_id = self._get_block_id(usage_key)
+        column = self._transformer_block_fields.get(
+            self.transformer_data._translate_key(transformer)  # pylint: disable=protected-access
+        )
+        if block_id is None or column is None:
+            return None
+        return column[block_id]
+
+
+def _create_csr_arrays(block_ids, block_keys, get_related_keys):
+    """
+    Returns the offsets and values CSR arrays of the relation returned
+    by get_related_keys for each of the given block keys.
+    """
+    offsets = array(_ARRAY_TYPECODE, [0])
+    values = array(_ARRAY_TYPECODE)
+    for block_key in block_keys:
+        values.extend(block_ids[related_key] for related_key in get_related_keys(block_key))
+        offsets.append(len(values))
+    return offsets, values
@@ -0,0 +1,123 @@
+"""
+Command to compare the memory usage and traversal latency of the default
+and compact representations of course blocks.
+"""
+import sys
+import timeit
+from array import array
+
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.keys import UsageKey
+
+import openedx.core.djangoapps.content.block_structure.api as api
+from openedx.core.djangoapps.content.block_structure.compact import CompactBlockStructure
+from openedx.core.lib.command_utils import parse_course_keys
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_representation 'edX/DemoX/Demo_Course' --settings=devstack
+        $ ./manage.py lms benchmark_block_structure_representation 'edX/DemoX/Demo_Course' \
+            --remove_block_types html video --settings=devstack
+    """
+    args = u'<course_id course_id ...>'
+    help = (
+        u'Compares the memory usage and the traversal, copy and removal latencies of the '
+        u'collected course blocks in the default and compact block structure representations.'
+    )
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help=u'Benchmark the course blocks of the list of courses provided.',
+        )
+        parser.add_argument(
+            '--remove_block_types',
+            nargs='*',
+            default=['html'],
+            help=u'Block types removed by the timed remove_block_traversal.',
+        )
+        parser.add_argument(
+            '--repeat',
+            help=u'Number of times to time each operation for each representation.',
+            default=10,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        for course_key in parse_course_keys(options['courses']):
+            block_structure = api.get_course_in_cache(course_key)
+            self._benchmark(course_key, block_structure, options)
+
+    def _benchmark(self, course_key, block_structure, options):
+        """
+        Benchmarks both representations of the given block structure.
+        """
+        block_structure._load_all_sections()  # pylint: disable=protected-access
+        compact_structure = CompactBlockStructure.create_from_block_structure(block_structure)
+        remove_block_types = set(options['remove_block_types'])
+        repeat = options['repeat']
+
+        operations = [
+            ('topological_traversal', lambda structure: list(structure.topological_traversal())),
+            ('post_order_traversal', lambda structure: list(structure.post_order_traversal())),
+            ('copy', lambda structure: structure.copy()),
+            ('remove_block_traversal', lambda structure: structure.copy().remove_block_traversal(
+                lambda block_key: block_key.block_type in remove_block_types,
+                keep_descendants=True,
+            )),
+        ]
+
+        self.stdout.write(
+            u'{course_key}: {num_blocks} blocks\n'
+            u'  memory: {default_size} bytes default, {compact_size} bytes compact\n'.format(
+                course_key=course_key,
+                num_blocks=len(block_structure),
+                default_size=_get_deep_size(block_structure),
+                compact_size=_get_deep_size(compact_structure),
+            )
+        )
+        for name, operation in operations:
+            default_time = timeit.timeit(lambda: operation(block_structure), number=repeat) / repeat
+            compact_time = timeit.timeit(lambda: operation(compact_structure), number=repeat) / repeat
+            self.stdout.write(
+                u'  {name}: {default_time:.2f} ms default, {compact_time:.2f} ms compact\n'.format(
+                    name=name,
+                    default_time=default_time * 1000,
+                    compact_time=compact_time * 1000,
+                )
+            )
+
+
+def _get_deep_size(obj):
+    """
+    Returns the approximate number of bytes used by the given object and
+    all the objects it references. Usage keys are excluded, since both
+    representations share the same usage key objects.
+    """
+    seen = set()
+    total_size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, (UsageKey, type)):
+            continue
+        seen.add(id(current))
+        total_size += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.iterkeys())
+            stack.extend(current.itervalues())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif not isinstance(current, (basestring, bytearray, array)):
+            stack.extend(getattr(current, '__dict__', {}).itervalues())
+            for slot in getattr(type(current), '__slots__', ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total_size
@@ -0,0 +1,107 @@
+"""
+Command to compare the serialization formats of course blocks.
+"""
+import timeit
+
+from django.core.management.base import BaseCommand
+
+import openedx.core.djangoapps.content.block_structure.api as api
+from openedx.core.djangoapps.content.block_structure import serialization
+from openedx.core.djangoapps.content.block_structure.store import BlockStructureStore
+from openedx.core.lib.cache_utils import zpickle
+from openedx.core.lib.command_utils import parse_course_keys
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_serialization 'edX/DemoX/Demo_Course' --settings=devstack
+        $ ./manage.py lms benchmark_block_structure_serialization 'edX/DemoX/Demo_Course' \
+            --transformers blocks_api visibility --settings=devstack
+    """
+    args = u'<course_id course_id ...>'
+    help = (
+        u'Compares the size and deserialization time of the collected course blocks '
+        u'in the pickle and columnar serialization formats.'
+    )
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help=u'Benchmark the course blocks of the list of courses provided.',
+        )
+        parser.add_argument(
+            '--transformers',
+            nargs='*',
+            default=[],
+            help=u'Names of the transformers whose block data is loaded after a columnar deserialization.',
+        )
+        parser.add_argument(
+            '--xblock_fields',
+            nargs='*',
+            default=[],
+            help=u'Names of the xBlock fields loaded after a columnar deserialization.',
+        )
+        parser.add_argument(
+            '--repeat',
+            help=u'Number of deserializations to time for each format.',
+            default=10,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        for course_key in parse_course_keys(options['courses']):
+            block_structure = api.get_course_in_cache(course_key)
+            self._benchmark(course_key, block_structure, options)
+
+    def _benchmark(self, course_key, block_structure, options):
+        """
+        Benchmarks both serialization formats for the given block structure.
+        """
+        # pylint: disable=protected-access
+        root_block_usage_key = block_structure.root_block_usage_key
+        block_structure._load_all_sections()
+        pickled_data = zpickle((
+            block_structure._block_relations,
+            block_structure.transformer_data,
+            block_structure._block_data_map,
+        ))
+        columnar_data = serialization.serialize(block_structure)
+
+        def deserialize_pickled():
+            """
+            Deserializes the pickled data the way BlockStructureStore does.
+            """
+            return BlockStructureStore(cache=None)._deserialize(pickled_data, root_block_usage_key)
+
+        def deserialize_columnar():
+            """
+            Deserializes the columnar data and loads the requested sections.
+            """
+            deserialized = serialization.deserialize(columnar_data, root_block_usage_key)
+            for field_name in options['xblock_fields']:
+                deserialized._load_xblock_field(field_name)
+            for transformer_name in options['transformers']:
+                deserialized._load_transformer_block_data(transformer_name)
+            return deserialized
+
+        repeat = options['repeat']
+        pickled_time = timeit.timeit(deserialize_pickled, number=repeat) / repeat
+        columnar_time = timeit.timeit(deserialize_columnar, number=repeat) / repeat
+
+        self.stdout.write(
+            u'{course_key}: {num_blocks} blocks\n'
+            u'  pickle:   {pickled_size} bytes, {pickled_time:.2f} ms per deserialization\n'
+            u'  columnar: {columnar_size} bytes, {columnar_time:.2f} ms per deserialization\n'.format(
+                course_key=course_key,
+                num_blocks=len(block_structure),
+                pickled_size=len(pickled_data),
+                pickled_time=pickled_time * 1000,
+                columnar_size=len(columnar_data),
+                columnar_time=columnar_time * 1000,
+            )
+        )
@@ -4,6 +4,8 @@ BlockStructures.
 """
 from contextlib import contextmanager
 
+from edx_django_utils.monitoring import set_custom_metric
+
 from . import config
 from .exceptions import UsageKeyNotInBlockStructure, TransformerDataIncompatible, BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -76,6 +78,64 @@ class BlockStructureManager(object):
         transformers.transform(block_structure)
         return block_structure
 
+    def get_transformed_for_usage_infos(
+            self,
+            transformers,
+            usage_infos,
+            starting_block_usage_key=None,
+            collected_block_structure=None,
+    ):
+        """
+        Returns the transformed Block Structures for each of the given
+        usage_infos, transforming the collected block structure only once
+        for all usage_infos for which the transformers return the same
+        usage_info_key.
+
+        Note: Usage_infos with the same key share the same transformed
+        block structure object, so the returned structures must not be
+        modified by the caller.
+
+        Arguments:
+            transformers (BlockStructureTransformers) - Collection of
+                transformers to apply. Its usage_info is updated with
+                each of the given usage_infos.
+
+            usage_infos (list) - The usage_infos to transform the
+                block structure for.
+
+            starting_block_usage_key (UsageKey) - See get_transformed.
+
+            collected_block_structure (BlockStructureBlockData) - See
+                get_transformed.
+
+        Returns:
+            [BlockStructureBlockData] - The transformed block structures,
+                in the order of the given usage_infos.
+        """
+        collected_block_structure = collected_block_structure or self.get_collected()
+
+        transformed_by_key = {}
+        num_transforms = 0
+        block_structures = []
+        for usage_info in usage_infos:
+            transformers.usage_info = usage_info
+            usage_info_key = transformers.usage_info_key(collected_block_structure)
+            block_structure = transformed_by_key.get(usage_info_key) if usage_info_key is not None else None
+            if block_structure is None:
+                block_structure = self.get_transformed(
+                    transformers,
+                    starting_block_usage_key,
+                    collected_block_structure,
+                )
+                num_transforms += 1
+                if usage_info_key is not None:
+                    transformed_by_key[usage_info_key] = block_structure
+            block_structures.append(block_structure)
+
+        set_custom_metric('block_structure_batch_transform_usage_infos', len(block_structures))
+        set_custom_metric('block_structure_batch_transforms', num_transforms)
+        return block_structures
+
     def get_collected(self):
         """
         Returns the collected Block Structure for the root_block_usage_key,
@@ -135,6 +195,13 @@ class BlockStructureManager(object):
         """
         self.store.delete(self.root_block_usage_key)
 
+    def clear_local_cache(self):
+        """
+        Removes data for the block structure associated with the given
+        root block key from the process-local cache only.
+        """
+        self.store.delete_from_local_cache(self.root_block_usage_key)
+
     @contextmanager
     def _bulk_operations(self):
         """
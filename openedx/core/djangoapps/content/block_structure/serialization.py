@@ -0,0 +1,280 @@
+"""
+Module for the columnar serialization format of BlockStructure objects.
+
+Unlike the default format, which compresses and pickles the whole
+block structure at once, the columnar format stores:
+
+    * the block keys once, so that blocks are referred to by their
+      integer index everywhere else,
+    * the parents and children relations as integer arrays in a
+      compressed sparse row (CSR) layout, without pickling,
+    * each collected xBlock field and each transformer's block data
+      in its own separately compressed section.
+
+Deserialization only decodes the keys, the relations and the
+transformers' non-block-specific data. The remaining sections are
+decoded lazily by the block structure, the first time the
+corresponding xBlock field or transformer's block data is accessed.
+"""
+# pylint: disable=protected-access
+import json
+import struct
+import zlib
+from array import array
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+
+from .block_structure import BlockData, TransformerData, _BlockRelations
+
+
+# Prefix identifying data in the columnar format. The default zlib
+# compressed pickle format never starts with these bytes.
+COLUMNAR_FORMAT_MAGIC = b'BSC'
+
+# The version of the columnar format. Incrementally update this value
+# whenever the layout of the serialized data changes.
+COLUMNAR_FORMAT_VERSION = 1
+
+# Layout of the header length that follows the magic and the version.
+_HEADER_LENGTH_FORMAT = '>I'
+
+# Names of the fixed sections.
+_KEYS_SECTION = 'keys'
+_CHILDREN_SECTION = 'children'
+_PARENTS_SECTION = 'parents'
+_BLOCK_DATA_SECTION = 'block_data'
+_TRANSFORMER_DATA_SECTION = 'transformer_data'
+
+# Prefixes of the names of the per-field and per-transformer sections.
+_XBLOCK_FIELD_SECTION_PREFIX = 'xblock_field:'
+_TRANSFORMER_BLOCK_DATA_SECTION_PREFIX = 'transformer:'
+
+# Type code of the integer arrays.
+_ARRAY_TYPECODE = 'l'
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized data is in the columnar format.
+    """
+    return serialized_data[:len(COLUMNAR_FORMAT_MAGIC)] == COLUMNAR_FORMAT_MAGIC
+
+
+def serialize(block_structure):
+    """
+    Serializes the given block structure in the columnar format.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The block structure
+            that is to be serialized.
+
+    Returns:
+        bytes - The serialized data.
+    """
+    block_structure._load_all_sections()
+
+    block_keys = list(block_structure._block_relations)
+    block_keys.extend(
+        block_key for block_key in block_structure._block_data_map
+        if block_key not in block_structure._block_relations
+    )
+    block_indices = {block_key: index for index, block_key in enumerate(block_keys)}
+
+    sections = [
+        (_KEYS_SECTION, zpickle(block_keys)),
+        (_CHILDREN_SECTION, _encode_relations(block_structure, block_indices, 'children')),
+        (_PARENTS_SECTION, _encode_relations(block_structure, block_indices, 'parents')),
+        (_BLOCK_DATA_SECTION, _encode_array(
+            [block_indices[block_key] for block_key in block_structure._block_data_map]
+        )),
+        (_TRANSFORMER_DATA_SECTION, zpickle(block_structure.transformer_data)),
+    ]
+
+    xblock_field_columns = {}
+    transformer_block_data_columns = {}
+    for block_key, block_data in block_structure._block_data_map.iteritems():
+        index = block_indices[block_key]
+        for field_name, value in block_data.fields.iteritems():
+            xblock_field_columns.setdefault(field_name, {})[index] = value
+        for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+            transformer_block_data_columns.setdefault(transformer_name, {})[index] = transformer_data.fields
+
+    sections.extend(
+        (_XBLOCK_FIELD_SECTION_PREFIX + field_name, zpickle(column))
+        for field_name, column in xblock_field_columns.iteritems()
+    )
+    sections.extend(
+        (_TRANSFORMER_BLOCK_DATA_SECTION_PREFIX + transformer_name, zpickle(column))
+        for transformer_name, column in transformer_block_data_columns.iteritems()
+    )
+
+    header = json.dumps({
+        'num_relations': len(block_structure._block_relations),
+        'sections': [[name, len(data)] for name, data in sections],
+    })
+    return b''.join(
+        [
+            COLUMNAR_FORMAT_MAGIC,
+            struct.pack('>B', COLUMNAR_FORMAT_VERSION),
+            struct.pack(_HEADER_LENGTH_FORMAT, len(header)),
+            header,
+        ] + [data for _, data in sections]
+    )
+
+
+def deserialize(serialized_data, root_block_usage_key):
+    """
+    Deserializes the given columnar data and returns the parsed block
+    structure. The xBlock fields and transformers' block data sections
+    are registered on the block structure to be decoded lazily.
+
+    Arguments:
+        serialized_data (bytes) - Data previously returned by serialize.
+
+        root_block_usage_key (UsageKey) - The usage_key for the root
+            of the block structure.
+
+    Returns:
+        BlockStructureBlockData - The deserialized block structure.
+
+    Raises:
+        ValueError if the data is not in a supported columnar format.
+    """
+    from .factory import BlockStructureFactory
+
+    sections, num_relations = _split_sections(serialized_data)
+
+    block_keys = zunpickle(sections[_KEYS_SECTION])
+    block_relations = _decode_relations(
+        block_keys,
+        num_relations,
+        children=_decode_array(sections[_CHILDREN_SECTION]),
+        parents=_decode_array(sections[_PARENTS_SECTION]),
+    )
+    block_data_map = {
+        block_keys[index]: BlockData(block_keys[index])
+        for index in _decode_array(sections[_BLOCK_DATA_SECTION])
+    }
+    block_structure = BlockStructureFactory.create_new(
+        root_block_usage_key,
+        block_relations,
+        zunpickle(sections[_TRANSFORMER_DATA_SECTION]),
+        block_data_map,
+    )
+
+    for name, data in sections.iteritems():
+        if name.startswith(_XBLOCK_FIELD_SECTION_PREFIX):
+            block_structure._add_unloaded_xblock_field(
+                name[len(_XBLOCK_FIELD_SECTION_PREFIX):],
+                _ColumnLoader(data, block_keys),
+            )
+        elif name.startswith(_TRANSFORMER_BLOCK_DATA_SECTION_PREFIX):
+            block_structure._add_unloaded_transformer_block_data(
+                name[len(_TRANSFORMER_BLOCK_DATA_SECTION_PREFIX):],
+                _ColumnLoader(data, block_keys, value_factory=_create_transformer_data),
+            )
+    return block_structure
+
+
+class _ColumnLoader(object):
+    """
+    Callable decoding a single xBlock field or transformer's block data
+    section into a map of usage key to value. The compressed section is
+    kept as is until called, and may be shared by copies of a block
+    structure.
+    """
+    def __init__(self, data, block_keys, value_factory=None):
+        self.data = data
+        self.block_keys = block_keys
+        self.value_factory = value_factory
+
+    def __call__(self):
+        column = zunpickle(self.data)
+        if self.value_factory:
+            return {self.block_keys[index]: self.value_factory(value) for index, value in column.iteritems()}
+        return {self.block_keys[index]: value for index, value in column.iteritems()}
+
+
+def _create_transformer_data(fields):
+    """
+    Returns a new TransformerData holding the given fields.
+    """
+    transformer_data = TransformerData()
+    transformer_data.fields = fields
+    return transformer_data
+
+
+def _split_sections(serialized_data):
+    """
+    Returns a map of section name to section data and the number of
+    blocks with relations, parsed from the given serialized data.
+    """
+    if not is_columnar(serialized_data):
+        raise ValueError('Data is not in the columnar block structure format.')
+
+    offset = len(COLUMNAR_FORMAT_MAGIC)
+    version, = struct.unpack_from('>B', serialized_data, offset)
+    if version != COLUMNAR_FORMAT_VERSION:
+        raise ValueError('Unsupported columnar block structure format version {}.'.format(version))
+    offset += 1
+
+    header_length, = struct.unpack_from(_HEADER_LENGTH_FORMAT, serialized_data, offset)
+    offset += struct.calcsize(_HEADER_LENGTH_FORMAT)
+    header = json.loads(serialized_data[offset:offset + header_length])
+    offset += header_length
+
+    sections = {}
+    for name, length in header['sections']:
+        sections[name] = serialized_data[offset:offset + length]
+        offset += length
+    return sections, header['num_relations']
+
+
+def _encode_array(values):
+    """
+    Returns the compressed bytes of an integer array of the given values.
+    """
+    return zlib.compress(array(_ARRAY_TYPECODE, values).tostring())
+
+
+def _decode_array(data):
+    """
+    Returns the integer array encoded by _encode_array.
+    """
+    values = array(_ARRAY_TYPECODE)
+    values.fromstring(zlib.decompress(data))
+    return values
+
+
+def _encode_relations(block_structure, block_indices, relation_name):
+    """
+    Encodes the given relation ('children' or 'parents') of all blocks
+    of the given block structure as a single integer array. The array
+    starts with the offsets of each block's relations, followed by the
+    indices of the related blocks.
+    """
+    offsets = [0]
+    related_indices = []
+    for block_relations in block_structure._block_relations.itervalues():
+        related_indices.extend(block_indices[block_key] for block_key in getattr(block_relations, relation_name))
+        offsets.append(len(related_indices))
+    return _encode_array(offsets + related_indices)
+
+
+def _decode_relations(block_keys, num_relations, children, parents):
+    """
+    Returns the block relations map decoded from the given arrays.
+    """
+    block_relations = {}
+    for index in xrange(num_relations):
+        relations = _BlockRelations()
+        relations.children = [
+            block_keys[child] for child in children[num_relations + 1 + children[index]:
+                                                    num_relations + 1 + children[index + 1]]
+        ]
+        relations.parents = [
+            block_keys[parent] for parent in parents[num_relations + 1 + parents[index]:
+                                                     num_relations + 1 + parents[index + 1]]
+        ]
+        block_relations[block_keys[index]] = relations
+    return block_relations
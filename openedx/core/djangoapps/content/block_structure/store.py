@@ -4,9 +4,12 @@ Module for the Storage of BlockStructure objects.
 # pylint: disable=protected-access
 from logging import getLogger
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_metric
 
-from . import config
+from openedx.core.lib.cache_utils import SizeBoundedLRUCache, zpickle, zunpickle
+
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -16,6 +19,12 @@ from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
+# Process-local tier of deserialized block structures, shared by all
+# BlockStructureStore instances. Its entries are never mutated; copies
+# of them are returned instead. It is sized from BLOCK_STRUCTURES_SETTINGS
+# by _get_local_cache.
+_local_cache = SizeBoundedLRUCache(max_size=0)
+
 
 class StubModel(object):
     """
@@ -65,6 +74,7 @@ class BlockStructureStore(object):
 
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
+        self.delete_from_local_cache(block_structure.root_block_usage_key)
 
     def get(self, root_block_usage_key):
         """
@@ -89,13 +99,27 @@ class BlockStructureStore(object):
         """
         bs_model = self._get_model(root_block_usage_key)
 
+        local_cache = _get_local_cache()
+        local_cache_key = self._encode_local_cache_key(bs_model)
+        if local_cache is not None:
+            block_structure = local_cache.get(local_cache_key)
+            set_custom_metric('block_structure_local_cache_hit', block_structure is not None)
+            set_custom_metric('block_structure_local_cache_size', local_cache.size)
+            if block_structure is not None:
+                return block_structure.copy()
+
         try:
             serialized_data = self._get_from_cache(bs_model)
         except BlockStructureNotFound:
             serialized_data = self._get_from_store(bs_model)
             self._add_to_cache(serialized_data, bs_model)
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        block_structure = self._deserialize(serialized_data, root_block_usage_key)
+        if local_cache is not None:
+            # The size of the serialized data is used as the estimated size of the block structure.
+            local_cache.set(local_cache_key, block_structure, len(serialized_data))
+            return block_structure.copy()
+        return block_structure
 
     def delete(self, root_block_usage_key):
         """
@@ -109,8 +133,21 @@ class BlockStructureStore(object):
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
         bs_model.delete()
+        self.delete_from_local_cache(root_block_usage_key)
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
 
+    @staticmethod
+    def delete_from_local_cache(root_block_usage_key):
+        """
+        Deletes all versions of the block structure for the given
+        root_block_usage_key from the process-local cache.
+
+        Arguments:
+            root_block_usage_key (UsageKey) - The usage_key for the root
+                of the block structure that is to be removed.
+        """
+        _local_cache.delete_many(lambda local_cache_key: local_cache_key[0] == root_block_usage_key)
+
     def is_up_to_date(self, root_block_usage_key, modulestore):
         """
         Returns whether the data in storage for the given key is
@@ -191,6 +228,10 @@ class BlockStructureStore(object):
         """
         Serializes the data for the given block_structure.
         """
+        if _is_columnar_serialization_enabled():
+            return serialization.serialize(block_structure)
+
+        block_structure._load_all_sections()
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -202,6 +243,9 @@ class BlockStructureStore(object):
         """
         Deserializes the given data and returns the parsed block_structure.
         """
+        if serialization.is_columnar(serialized_data):
+            return serialization.deserialize(serialized_data, root_block_usage_key)
+
         block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
@@ -225,6 +269,19 @@ class BlockStructureStore(object):
                 root_usage_key=unicode(bs_model.data_usage_key),
             )
 
+    @classmethod
+    def _encode_local_cache_key(cls, bs_model):
+        """
+        Returns the process-local cache key to use for the given
+        BlockStructureModel or StubModel.
+
+        With storage backing, the key includes the version data of the
+        model, so a newly published version is never served from the
+        local cache. Otherwise, the local cache relies on invalidation
+        and on the LOCAL_CACHE_TIMEOUT setting.
+        """
+        return bs_model.data_usage_key, cls._encode_root_cache_key(bs_model)
+
     @staticmethod
     def _version_data_of_block(root_block):
         """
@@ -254,3 +311,20 @@ def _is_storage_backing_enabled():
     Returns whether storage backing for Block Structures is enabled.
     """
     return config.waffle().is_enabled(config.STORAGE_BACKING_FOR_CACHE)
+
+
+def _is_columnar_serialization_enabled():
+    """
+    Returns whether block structures are to be serialized in the columnar format.
+    """
+    return config.waffle().is_enabled(config.COLUMNAR_SERIALIZATION)
+
+
+def _get_local_cache():
+    """
+    Returns the process-local cache of deserialized block structures,
+    or None if it is disabled.
+    """
+    _local_cache.max_size = settings.BLOCK_STRUCTURES_SETTINGS.get('LOCAL_CACHE_MAX_BYTES', 0)
+    _local_cache.timeout = settings.BLOCK_STRUCTURES_SETTINGS.get('LOCAL_CACHE_TIMEOUT')
+    return _local_cache if _local_cache.max_size > 0 else None
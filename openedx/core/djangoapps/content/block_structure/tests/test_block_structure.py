@@ -310,3 +310,45 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         _set_value(new_copy, 'edit2')
         self.assertEquals(_get_value(block_structure), 'edit1')
         self.assertEquals(_get_value(new_copy), 'edit2')
+
+    def test_copy_on_write(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.DAG_CHILDREN_MAP)
+        for block_key in block_structure:
+            block_structure.override_xblock_field(block_key, 'display_name', u'Block {}'.format(block_key))
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'test_key', block_key)
+        block_structure.set_transformer_data(MockTransformer, 'test_key', 'original_value')
+        new_copy = block_structure.copy()
+
+        # verify unmodified blocks are shared between the structures
+        for block_key in block_structure:
+            self.assertIs(block_structure._block_relations[block_key], new_copy._block_relations[block_key])
+            self.assertIs(block_structure._block_data_map[block_key], new_copy._block_data_map[block_key])
+
+        new_copy.override_xblock_field(1, 'display_name', u'edit')
+        new_copy.set_transformer_block_field(2, MockTransformer, 'test_key', 'edit')
+        new_copy.remove_transformer_block_field(4, MockTransformer, 'test_key')
+        new_copy.set_transformer_data(MockTransformer, 'test_key', 'edit')
+        new_copy.remove_block(3, keep_descendants=False)
+        new_copy._prune_unreachable()
+
+        # verify only the modified blocks are copied
+        for block_key in (1, 2, 4):
+            self.assertIsNot(block_structure._block_data_map[block_key], new_copy._block_data_map[block_key])
+        self.assertIs(block_structure._block_data_map[0], new_copy._block_data_map[0])
+        for block_key in (1, 2):
+            self.assertIsNot(block_structure._block_relations[block_key], new_copy._block_relations[block_key])
+        for block_key in (0, 4):
+            self.assertIs(block_structure._block_relations[block_key], new_copy._block_relations[block_key])
+
+        self.assert_block_structure(new_copy, [[1, 2], [], [4], [], [], [], []], missing_blocks=[3, 5, 6])
+        self.assertEquals(new_copy.get_xblock_field(1, 'display_name'), u'edit')
+        self.assertEquals(new_copy.get_transformer_block_field(2, MockTransformer, 'test_key'), 'edit')
+        self.assertIsNone(new_copy.get_transformer_block_field(4, MockTransformer, 'test_key'))
+        self.assertEquals(new_copy.get_transformer_data(MockTransformer, 'test_key'), 'edit')
+
+        # verify the original block structure is unaffected
+        self.assert_block_structure(block_structure, ChildrenMapTestMixin.DAG_CHILDREN_MAP)
+        for block_key in block_structure:
+            self.assertEquals(block_structure.get_xblock_field(block_key, 'display_name'), u'Block {}'.format(block_key))
+            self.assertEquals(block_structure.get_transformer_block_field(block_key, MockTransformer, 'test_key'), block_key)
+        self.assertEquals(block_structure.get_transformer_data(MockTransformer, 'test_key'), 'original_value')
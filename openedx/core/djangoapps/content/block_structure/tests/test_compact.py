@@ -0,0 +1,171 @@
+"""
+Tests for block_structure/compact.py
+"""
+# pylint: disable=protected-access
+from copy import deepcopy
+import itertools
+from unittest import TestCase
+
+import ddt
+
+from ..compact import CompactBlockStructure
+from .helpers import ChildrenMapTestMixin, MockTransformer
+
+
+@ddt.ddt
+class TestCompactBlockStructure(TestCase, ChildrenMapTestMixin):
+    """
+    Tests for CompactBlockStructure
+    """
+    def create_compact_block_structure(self, children_map):
+        """
+        Returns a block structure and its compact representation for
+        the given children_map, with data collected for each block.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)
+        for block_id in range(len(children_map)):
+            block_structure._get_or_create_block(block_id).display_name = u'Block {}'.format(block_id)
+            block_structure.set_transformer_block_field(block_id, MockTransformer, 'test', block_id)
+        return block_structure, CompactBlockStructure.create_from_block_structure(block_structure)
+
+    def assert_equivalent(self, block_structure, compact_structure, children_map):
+        """
+        Verifies that the compact structure has the same blocks, relations
+        and data as the given block structure.
+        """
+        self.assertEqual(len(compact_structure), len(block_structure))
+        self.assertEqual(set(compact_structure), set(block_structure))
+        for block_id in range(len(children_map)):
+            self.assertEqual(block_id in compact_structure, block_id in block_structure)
+            self.assertEqual(
+                set(compact_structure.get_children(block_id)),
+                set(block_structure.get_children(block_id)),
+            )
+            self.assertEqual(
+                set(compact_structure.get_parents(block_id)),
+                set(block_structure.get_parents(block_id)),
+            )
+            if block_id not in block_structure:
+                continue
+            self.assertEqual(
+                compact_structure.get_xblock_field(block_id, 'display_name'),
+                block_structure.get_xblock_field(block_id, 'display_name'),
+            )
+            self.assertEqual(
+                compact_structure.get_transformer_block_field(block_id, MockTransformer, 'test'),
+                block_structure.get_transformer_block_field(block_id, MockTransformer, 'test'),
+            )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_create_from_block_structure(self, children_map):
+        block_structure, compact_structure = self.create_compact_block_structure(children_map)
+        self.assert_block_structure(compact_structure, children_map)
+        self.assert_equivalent(block_structure, compact_structure, children_map)
+        self.assertEqual(
+            compact_structure._get_transformer_data_version(MockTransformer),
+            MockTransformer.WRITE_VERSION,
+        )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_traversals(self, children_map):
+        block_structure, compact_structure = self.create_compact_block_structure(children_map)
+        filter_func = lambda block_key: block_key != 1
+        self.assertEqual(
+            list(compact_structure.topological_traversal()),
+            list(block_structure.topological_traversal()),
+        )
+        self.assertEqual(
+            list(compact_structure.topological_traversal(filter_func=filter_func)),
+            list(block_structure.topological_traversal(filter_func=filter_func)),
+        )
+        self.assertEqual(
+            list(compact_structure.topological_traversal(filter_func=filter_func, yield_descendants_of_unyielded=True)),
+            list(block_structure.topological_traversal(filter_func=filter_func, yield_descendants_of_unyielded=True)),
+        )
+        self.assertEqual(
+            list(compact_structure.post_order_traversal()),
+            list(block_structure.post_order_traversal()),
+        )
+        self.assertEqual(
+            list(compact_structure.post_order_traversal(filter_func=filter_func)),
+            list(block_structure.post_order_traversal(filter_func=filter_func)),
+        )
+
+    @ddt.data(
+        *itertools.product(
+            [True, False],
+            range(7),
+            [
+                ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+                ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+                ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+            ],
+        )
+    )
+    @ddt.unpack
+    def test_remove_block(self, keep_descendants, block_to_remove, children_map):
+        ### skip test if invalid
+        if (block_to_remove >= len(children_map)) or (keep_descendants and block_to_remove == 0):
+            return
+
+        block_structure, compact_structure = self.create_compact_block_structure(children_map)
+        block_structure.remove_block(block_to_remove, keep_descendants)
+        compact_structure.remove_block(block_to_remove, keep_descendants)
+        self.assert_equivalent(block_structure, compact_structure, children_map)
+
+        block_structure._prune_unreachable()
+        compact_structure._prune_unreachable()
+        self.assert_equivalent(block_structure, compact_structure, children_map)
+
+    @ddt.data(True, False)
+    def test_remove_block_traversal(self, keep_descendants):
+        block_structure, compact_structure = self.create_compact_block_structure(self.DAG_CHILDREN_MAP)
+        removal_condition = lambda block_key: block_key in (2, 3)
+        block_structure.remove_block_traversal(removal_condition, keep_descendants)
+        compact_structure.remove_block_traversal(removal_condition, keep_descendants)
+        self.assert_equivalent(block_structure, compact_structure, self.DAG_CHILDREN_MAP)
+        self.assertEqual(
+            list(compact_structure.topological_traversal()),
+            list(block_structure.topological_traversal()),
+        )
+
+    def test_block_data(self):
+        _, compact_structure = self.create_compact_block_structure(self.SIMPLE_CHILDREN_MAP)
+        compact_structure.override_xblock_field(1, 'display_name', u'Overridden')
+        compact_structure.override_xblock_field(1, 'due', u'Due')
+        compact_structure.set_transformer_block_field(2, MockTransformer, 'test', u'Updated')
+        compact_structure.remove_transformer_block_field(3, MockTransformer, 'test')
+
+        self.assertEqual(compact_structure.get_xblock_field(1, 'display_name'), u'Overridden')
+        self.assertEqual(compact_structure.get_xblock_field(1, 'due'), u'Due')
+        self.assertEqual(compact_structure.get_xblock_field(2, 'due', u'Default'), u'Default')
+        self.assertEqual(compact_structure.get_transformer_block_field(2, MockTransformer, 'test'), u'Updated')
+        self.assertIsNone(compact_structure.get_transformer_block_field(3, MockTransformer, 'test'))
+        self.assertEqual(compact_structure.get_transformer_block_data(4, MockTransformer).test, 4)
+
+        compact_structure.remove_block(4, keep_descendants=False)
+        self.assertIsNone(compact_structure.get_xblock_field(4, 'display_name'))
+        with self.assertRaises(KeyError):
+            compact_structure.get_transformer_block_data(4, MockTransformer)
+
+    def test_copy(self):
+        block_structure, compact_structure = self.create_compact_block_structure(self.LINEAR_CHILDREN_MAP)
+        new_copy = compact_structure.copy()
+        self.assert_equivalent(block_structure, new_copy, self.LINEAR_CHILDREN_MAP)
+
+        # verify edits to the copy do not affect the original
+        new_copy.remove_block(2, keep_descendants=True)
+        new_copy.set_transformer_block_field(1, MockTransformer, 'test', u'edit')
+        new_copy.override_xblock_field(1, 'display_name', u'edit')
+        self.assert_block_structure(new_copy, [[1], [3], [], []], missing_blocks=[2])
+        self.assert_block_structure(compact_structure, deepcopy(self.LINEAR_CHILDREN_MAP))
+        self.assert_equivalent(block_structure, compact_structure, self.LINEAR_CHILDREN_MAP)
@@ -88,6 +88,15 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + unicode(block_key)
 
 
+class TestUsageInfoKeyTransformer(TestTransformer1):
+    """
+    Test Transformer class whose transform depends only on the parity of
+    the usage_info.
+    """
+    def usage_info_key(self, usage_info, block_structure):
+        return usage_info % 2
+
+
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
     """
@@ -161,6 +170,29 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             )
             self.assert_block_structure(block_structure, expected_structure, missing_blocks=expected_missing_blocks)
 
+    @ddt.data(
+        (TestTransformer1, 4),
+        (TestUsageInfoKeyTransformer, 2),
+    )
+    @ddt.unpack
+    def test_get_transformed_for_usage_infos(self, transformer_class, expected_transform_count):
+        registered_transformers = [transformer_class()]
+        with mock_registered_transformers(registered_transformers):
+            transformers = BlockStructureTransformers(registered_transformers)
+            with patch.object(
+                BlockStructureManager, 'get_transformed', wraps=self.bs_manager.get_transformed
+            ) as mock_get_transformed:
+                block_structures = self.bs_manager.get_transformed_for_usage_infos(transformers, [0, 1, 2, 3])
+
+        self.assertEqual(mock_get_transformed.call_count, expected_transform_count)
+        self.assertEqual(len(block_structures), 4)
+        for block_structure in block_structures:
+            self.assert_block_structure(block_structure, self.children_map)
+            transformer_class.assert_transformed(block_structure)
+        if transformer_class is TestUsageInfoKeyTransformer:
+            self.assertIs(block_structures[0], block_structures[2])
+            self.assertIsNot(block_structures[0], block_structures[1])
+
     def test_get_transformed_with_nonexistent_starting_block(self):
         with mock_registered_transformers(self.registered_transformers):
             with self.assertRaises(UsageKeyNotInBlockStructure):
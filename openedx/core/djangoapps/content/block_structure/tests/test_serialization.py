@@ -0,0 +1,132 @@
+"""
+Tests for block_structure/serialization.py
+"""
+# pylint: disable=protected-access
+from unittest import TestCase
+
+import ddt
+
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+
+from .. import serialization
+from ..config import COLUMNAR_SERIALIZATION, waffle
+from ..store import BlockStructureStore
+from .helpers import ChildrenMapTestMixin, MockCache, MockFilteringTransformer, MockTransformer, UsageKeyFactoryMixin
+
+
+class ColumnarSerializationTestMixin(ChildrenMapTestMixin):
+    """
+    Mixin creating block structures with xBlock fields and transformer data.
+    """
+    def create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map, with
+        collected xBlock fields and transformers' data for each block.
+        """
+        block_structure = self.create_block_structure(children_map)
+        for transformer in [MockTransformer, MockFilteringTransformer]:
+            block_structure._add_transformer(transformer)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_data = block_structure._get_or_create_block(block_key)
+            block_data.display_name = u'Block {}'.format(block_id)
+            block_data.graded = block_id % 2 == 0
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', block_id)
+            block_structure.set_transformer_block_field(block_key, MockFilteringTransformer, 'test', -block_id)
+        return block_structure
+
+    def assert_collected_data(self, block_structure, children_map):
+        """
+        Verifies the data set by create_collected_block_structure.
+        """
+        self.assert_block_structure(block_structure, children_map)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            self.assertEqual(block_structure.get_xblock_field(block_key, 'display_name'), u'Block {}'.format(block_id))
+            self.assertEqual(block_structure.get_xblock_field(block_key, 'graded'), block_id % 2 == 0)
+            self.assertEqual(block_structure.get_transformer_block_field(block_key, MockTransformer, 'test'), block_id)
+            self.assertEqual(
+                block_structure.get_transformer_block_field(block_key, MockFilteringTransformer, 'test'), -block_id
+            )
+
+
+@ddt.ddt
+class TestColumnarSerialization(ColumnarSerializationTestMixin, TestCase):
+    """
+    Tests for the columnar serialization format.
+    """
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self.create_collected_block_structure(children_map)
+        serialized_data = serialization.serialize(block_structure)
+        self.assertTrue(serialization.is_columnar(serialized_data))
+
+        deserialized = serialization.deserialize(serialized_data, block_structure.root_block_usage_key)
+        self.assert_collected_data(deserialized, children_map)
+        self.assertEqual(
+            deserialized._get_transformer_data_version(MockTransformer),
+            MockTransformer.WRITE_VERSION,
+        )
+
+    def test_lazy_loading(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = serialization.deserialize(
+            serialization.serialize(block_structure),
+            block_structure.root_block_usage_key,
+        )
+        self.assertEqual(set(deserialized._unloaded_xblock_fields), {'display_name', 'graded'})
+        self.assertEqual(
+            set(deserialized._unloaded_transformer_block_data),
+            {MockTransformer.name(), MockFilteringTransformer.name()},
+        )
+
+        deserialized.get_xblock_field(self.block_key_factory(1), 'graded')
+        deserialized.get_transformer_block_field(self.block_key_factory(1), MockTransformer, 'test')
+        self.assertEqual(set(deserialized._unloaded_xblock_fields), {'display_name'})
+        self.assertEqual(set(deserialized._unloaded_transformer_block_data), {MockFilteringTransformer.name()})
+
+        list(deserialized.itervalues())
+        self.assertFalse(deserialized._unloaded_xblock_fields)
+        self.assertFalse(deserialized._unloaded_transformer_block_data)
+
+    def test_copy_and_mutate_before_loading(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = serialization.deserialize(
+            serialization.serialize(block_structure),
+            block_structure.root_block_usage_key,
+        )
+        copied = deserialized.copy()
+        copied.override_xblock_field(self.block_key_factory(1), 'display_name', u'Overridden')
+        copied.remove_block(self.block_key_factory(2), keep_descendants=False)
+
+        self.assertEqual(copied.get_xblock_field(self.block_key_factory(1), 'display_name'), u'Overridden')
+        self.assertIsNone(copied.get_xblock_field(self.block_key_factory(2), 'display_name'))
+        self.assert_collected_data(deserialized, self.SIMPLE_CHILDREN_MAP)
+
+    def test_invalid_data(self):
+        with self.assertRaises(ValueError):
+            serialization.deserialize(b'invalid', self.block_key_factory(0))
+
+
+@ddt.ddt
+class TestStoreColumnarSerialization(UsageKeyFactoryMixin, ColumnarSerializationTestMixin, CacheIsolationTestCase):
+    """
+    Tests for BlockStructureStore with the columnar serialization format.
+    """
+    def setUp(self):
+        super(TestStoreColumnarSerialization, self).setUp()
+        self.block_structure = self.create_collected_block_structure(self.DAG_CHILDREN_MAP)
+        self.store = BlockStructureStore(MockCache())
+
+    @ddt.data(True, False)
+    def test_read_either_format(self, columnar_serialization):
+        with waffle().override(COLUMNAR_SERIALIZATION, active=columnar_serialization):
+            self.store.add(self.block_structure)
+
+        with waffle().override(COLUMNAR_SERIALIZATION, active=not columnar_serialization):
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_collected_data(stored_value, self.DAG_CHILDREN_MAP)
@@ -2,13 +2,16 @@
 Tests for block_structure/cache.py
 """
 import ddt
+from django.conf import settings
+from django.test.utils import override_settings
+from mock import patch
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
 from ..config import STORAGE_BACKING_FOR_CACHE, waffle
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
-from ..store import BlockStructureStore
+from ..store import BlockStructureStore, _local_cache
 from .helpers import ChildrenMapTestMixin, UsageKeyFactoryMixin, MockCache, MockTransformer
 
 
@@ -89,3 +92,57 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.assertEquals(self.mock_cache.timeout_from_last_call, 0)
         self.store.add(self.block_structure)
         self.assertEquals(self.mock_cache.timeout_from_last_call, timeout)
+
+
+@ddt.ddt
+@override_settings(BLOCK_STRUCTURES_SETTINGS=dict(settings.BLOCK_STRUCTURES_SETTINGS, LOCAL_CACHE_MAX_BYTES=10 ** 6))
+class TestBlockStructureStoreLocalCache(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheIsolationTestCase):
+    """
+    Tests for the process-local cache of BlockStructureStore
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(TestBlockStructureStoreLocalCache, self).setUp()
+        _local_cache.clear()
+        self.addCleanup(_local_cache.clear)
+
+        self.children_map = self.SIMPLE_CHILDREN_MAP
+        self.block_structure = self.create_block_structure(self.children_map)
+        self.block_structure.set_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test', 'val')
+        self.mock_cache = MockCache()
+        self.store = BlockStructureStore(self.mock_cache)
+
+    @ddt.data(True, False)
+    def test_get_from_local_cache(self, with_storage_backing):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            self.store.add(self.block_structure)
+            first_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.mock_cache.map.clear()
+
+            with patch('openedx.core.djangoapps.content.block_structure.store.set_custom_metric') as mock_metric:
+                second_value = self.store.get(self.block_structure.root_block_usage_key)
+            mock_metric.assert_any_call('block_structure_local_cache_hit', True)
+
+            self.assert_block_structure(second_value, self.children_map)
+            self.assertIsNot(first_value, second_value)
+
+    def test_returned_copies_are_independent(self):
+        self.store.add(self.block_structure)
+        first_value = self.store.get(self.block_structure.root_block_usage_key)
+        first_value.remove_block(self.block_key_factory(1), keep_descendants=False)
+
+        second_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(second_value, self.children_map)
+
+    @ddt.data('add', 'delete', 'delete_from_local_cache')
+    def test_invalidation(self, method_name):
+        self.store.add(self.block_structure)
+        self.store.get(self.block_structure.root_block_usage_key)
+        self.assertEqual(len(_local_cache), 1)
+
+        if method_name == 'add':
+            self.store.add(self.block_structure)
+        else:
+            getattr(self.store, method_name)(self.block_structure.root_block_usage_key)
+        self.assertEqual(len(_local_cache), 0)
@@ -71,6 +71,17 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
             self.transformers.transform(block_structure=MagicMock())
             self.assertTrue(mock_transform_call.called)
 
+    def test_usage_info_key(self):
+        self.add_mock_transformer()
+        with patch.object(MockTransformer, 'usage_info_key', return_value='key'):
+            with patch.object(MockFilteringTransformer, 'usage_info_key', return_value=None):
+                self.assertIsNone(self.transformers.usage_info_key(block_structure=MagicMock()))
+            with patch.object(MockFilteringTransformer, 'usage_info_key', return_value='filter_key'):
+                self.assertEqual(
+                    self.transformers.usage_info_key(block_structure=MagicMock()),
+                    (('MockFilteringTransformer', 'filter_key'), ('MockTransformer', 'key')),
+                )
+
     def test_verify_versions(self):
         block_structure = self.create_block_structure(
             self.SIMPLE_CHILDREN_MAP,
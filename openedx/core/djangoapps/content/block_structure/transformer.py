@@ -155,6 +155,30 @@ class BlockStructureTransformer(object):
         """
         raise NotImplementedError
 
+    def usage_info_key(self, usage_info, block_structure):  # pylint: disable=unused-argument
+        """
+        Returns a hashable value identifying the parts of the given
+        usage_info that the transformer's transform depends on. The
+        transform of the given collected block_structure must have the
+        same result for any two usage_infos with equal values.
+
+        The framework uses this value to transform a collected block
+        structure only once for all usage_infos with the same value,
+        for example, for all learners with the same group memberships.
+
+        Transformers that depend on data specific to each usage_info
+        should return None, which is the default.
+
+        Arguments:
+            usage_info (any negotiated type) - A usage-specific object,
+                as passed to the transform method.
+
+            block_structure (BlockStructureBlockData) - The collected
+                block structure that is to be transformed. It must not
+                be modified by this method.
+        """
+        return None
+
 
 class FilteringTransformerMixin(BlockStructureTransformer):
     """
@@ -105,6 +105,23 @@ class BlockStructureTransformers(object):
             )
         return True
 
+    def usage_info_key(self, block_structure):
+        """
+        Returns a hashable value such that transforming the given
+        collected block structure has the same result for all usage_infos
+        with equal values, or None if the result is specific to the
+        current usage_info.
+
+        See BlockStructureTransformer.usage_info_key.
+        """
+        keys = []
+        for transformer in self._transformers['supports_filter'] + self._transformers['no_filter']:
+            key = transformer.usage_info_key(self.usage_info, block_structure)
+            if key is None:
+                return None
+            keys.append((transformer.name(), key))
+        return tuple(keys)
+
     def transform(self, block_structure):
         """
         The given block structure is transformed by each transformer in the
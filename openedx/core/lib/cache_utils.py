@@ -5,6 +5,8 @@ import collections
 import cPickle as pickle
 import functools
 import itertools
+import threading
+import time
 import zlib
 
 from django.utils.encoding import force_text
@@ -151,6 +153,103 @@ class process_cached(object):  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+class SizeBoundedLRUCache(object):
+    """
+    A thread-safe, process-local, least-recently-used cache whose total
+    size is bounded by the sizes given for its entries (typically their
+    estimated size in bytes).
+
+    WARNING: Values are shared by all the threads of the process and
+    returned as is, so only use it for values that are never mutated
+    once cached.
+    """
+
+    def __init__(self, max_size, timeout=None):
+        """
+        Arguments:
+            max_size (int): Maximum total size of the entries. The cache is
+                disabled if it is not positive.
+            timeout (int): Optional number of seconds after which an entry
+                expires.
+        """
+        self.max_size = max_size
+        self.timeout = timeout
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached for the given key, marking it as the
+        most recently used; returns default if not found or expired.
+        """
+        with self._lock:
+            try:
+                value, size, expires_at = self._entries.pop(key)
+            except KeyError:
+                return default
+
+            if expires_at is not None and expires_at < time.time():
+                self.size -= size
+                return default
+
+            self._entries[key] = (value, size, expires_at)
+            return value
+
+    def set(self, key, value, size):
+        """
+        Caches the given value with the given size for the given key,
+        evicting the least recently used entries as needed. Values larger
+        than the maximum size of the cache are not cached.
+        """
+        if size > self.max_size:
+            self.delete(key)
+            return
+
+        expires_at = time.time() + self.timeout if self.timeout else None
+        with self._lock:
+            self._pop(key)
+            while self._entries and self.size + size > self.max_size:
+                self._pop(next(iter(self._entries)))
+            self._entries[key] = (value, size, expires_at)
+            self.size += size
+
+    def delete(self, key):
+        """
+        Deletes the entry for the given key, if any.
+        """
+        with self._lock:
+            self._pop(key)
+
+    def delete_many(self, filter_func):
+        """
+        Deletes all the entries whose key satisfies the given filter_func.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if filter_func(key)]:
+                self._pop(key)
+
+    def clear(self):
+        """
+        Deletes all the entries.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _pop(self, key):
+        """
+        Removes the entry for the given key, if any. Must be called with
+        the lock acquired.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+
 def zpickle(data):
     """Given any data structure, returns a zlib compressed pickled serialization."""
     return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
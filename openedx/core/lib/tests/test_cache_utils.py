@@ -5,10 +5,10 @@ Tests for cache_utils.py
 from unittest import TestCase
 
 import ddt
-from mock import Mock
+from mock import Mock, patch
 
 from edx_django_utils.cache import RequestCache
-from openedx.core.lib.cache_utils import request_cached
+from openedx.core.lib.cache_utils import SizeBoundedLRUCache, request_cached
 
 
 @ddt.ddt
@@ -295,3 +295,58 @@ class TestRequestCachedDecorator(TestCase):
         result = wrapped(3)
         self.assertEqual(result, 2)
         self.assertEqual(to_be_wrapped.call_count, 2)
+
+
+class TestSizeBoundedLRUCache(TestCase):
+    """
+    Test the SizeBoundedLRUCache class.
+    """
+    def setUp(self):
+        super(TestSizeBoundedLRUCache, self).setUp()
+        self.cache = SizeBoundedLRUCache(max_size=10)
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.set('a', 1, size=4)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.size, 4)
+
+        self.cache.set('a', 2, size=6)
+        self.assertEqual(self.cache.get('a'), 2)
+        self.assertEqual(self.cache.size, 6)
+
+    def test_least_recently_used_evicted(self):
+        self.cache.set('a', 1, size=4)
+        self.cache.set('b', 2, size=4)
+        self.cache.get('a')
+        self.cache.set('c', 3, size=4)
+
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('c'), 3)
+        self.assertEqual(self.cache.size, 8)
+
+    def test_too_large_value_not_cached(self):
+        self.cache.set('a', 1, size=11)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.size, 0)
+
+    def test_timeout(self):
+        cache = SizeBoundedLRUCache(max_size=10, timeout=60)
+        with patch('openedx.core.lib.cache_utils.time.time', return_value=0):
+            cache.set('a', 1, size=1)
+        with patch('openedx.core.lib.cache_utils.time.time', return_value=61):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.size, 0)
+
+    def test_delete(self):
+        self.cache.set(('a', 1), 1, size=1)
+        self.cache.set(('a', 2), 2, size=1)
+        self.cache.set(('b', 1), 3, size=1)
+
+        self.cache.delete(('b', 1))
+        self.assertIsNone(self.cache.get(('b', 1)))
+
+        self.cache.delete_many(lambda key: key[0] == 'a')
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.size, 0)
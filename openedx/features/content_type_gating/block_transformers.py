@@ -35,6 +35,16 @@ class ContentTypeGateTransformer(BlockStructureTransformer):
         """
         block_structure.request_xblock_fields('group_access', 'graded', 'has_score', 'weight')
 
+    def usage_info_key(self, usage_info, block_structure):
+        """
+        The gating depends only on whether it is enabled for the user's
+        enrollment.
+        """
+        return ContentTypeGatingConfig.enabled_for_enrollment(
+            user=usage_info.user,
+            course_key=usage_info.course_key,
+        )
+
     def transform(self, usage_info, block_structure):
         if not ContentTypeGatingConfig.enabled_for_enrollment(
             user=usage_info.user,
@@ -48,9 +58,9 @@ class ContentTypeGateTransformer(BlockStructureTransformer):
             weight_not_zero = block_structure.get_xblock_field(block_key, 'weight') != 0
             problem_eligible_for_content_gating = graded and has_score and weight_not_zero
             if problem_eligible_for_content_gating:
-                current_access = block_structure.get_xblock_field(block_key, 'group_access')
-                if current_access is None:
-                    current_access = {}
+                # Copy the collected value, since it is shared with
+                # other copies of the block structure.
+                current_access = dict(block_structure.get_xblock_field(block_key, 'group_access') or {})
                 current_access.setdefault(
                     CONTENT_GATING_PARTITION_ID,
                     [settings.CONTENT_TYPE_GATE_GROUP_IDS['full_access']]
@@ -11,6 +11,14 @@ from openedx.features.qverse_features.registration.models import (BulkUserRegist
                                                                   QVerseUserProfile)
 
 
-admin.site.register(BulkUserRegistration)
+class BulkUserRegistrationAdmin(admin.ModelAdmin):
+    """
+    Admin for BulkUserRegistration model, showing the progress of the processing of admission files.
+    """
+    list_display = ('description', 'status', 'processed_rows', 'total_rows')
+    readonly_fields = ('status', 'processed_rows', 'total_rows')
+
+
+admin.site.register(BulkUserRegistration, BulkUserRegistrationAdmin)
 admin.site.register(Department)
 admin.site.register(QVerseUserProfile)
@@ -0,0 +1,108 @@
+"""
+Command to compare the per-row and set-based validation of admission file rows.
+"""
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from openedx.features.qverse_features.registration.models import Department
+from openedx.features.qverse_features.registration.signals import BatchCsvRowValidator, CsvRowValidator
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_csv_row_validation --settings=devstack
+        $ ./manage.py lms benchmark_csv_row_validation --rows 1000 10000 50000 --settings=devstack
+    """
+    help = (
+        u'Compares the time and number of queries taken to validate generated admission '
+        u'file rows one at a time and with a BatchCsvRowValidator.'
+    )
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--rows',
+            nargs='+',
+            default=[1000, 10000, 50000],
+            type=int,
+            help=u'Numbers of rows to validate.',
+        )
+        parser.add_argument(
+            '--department',
+            type=int,
+            help=u'Number of the existing department of the generated rows. Defaults to the first department.',
+        )
+
+    def handle(self, *args, **options):
+        department_number = options['department']
+        if department_number is None:
+            department = Department.objects.order_by('number').first()
+            if department is None:
+                raise CommandError(u'No department exists to generate the rows for.')
+            department_number = department.number
+
+        for row_count in options['rows']:
+            rows = [self._get_row(index, department_number) for index in range(row_count)]
+            self._benchmark(rows)
+
+    @staticmethod
+    def _get_row(index, department_number):
+        """
+        Returns a valid admission file row for a new user.
+        """
+        return {
+            'regno': u'BENCH{}'.format(index),
+            'email': u'bench{}@example.com'.format(index),
+            'firstname': u'Bench',
+            'surname': u'Mark',
+            'othername': u'',
+            'mobile': u'',
+            'departmentid': unicode(department_number),
+            'programmeid': u'1',
+            'levelid': u'1',
+        }
+
+    def _benchmark(self, rows):
+        """
+        Validates the given rows with both validators, timing them and
+        counting their queries.
+        """
+        def validate_per_row():
+            """
+            Validates the rows the way the admission files were validated before batching.
+            """
+            CsvRowValidator.prepare_csv_row_validator()
+            for row in rows:
+                CsvRowValidator.validate_csv_row(row)
+
+        def validate_batch():
+            """
+            Validates the rows the way process_csv_rows does.
+            """
+            CsvRowValidator.prepare_csv_row_validator()
+            BatchCsvRowValidator.prepare_batch(rows)
+            for row in rows:
+                BatchCsvRowValidator.validate_csv_row(row)
+
+        with CaptureQueriesContext(connection) as per_row_queries:
+            per_row_time = timeit.timeit(validate_per_row, number=1)
+        with CaptureQueriesContext(connection) as batch_queries:
+            batch_time = timeit.timeit(validate_batch, number=1)
+
+        self.stdout.write(
+            u'{num_rows} rows\n'
+            u'  per row:   {per_row_time:.2f} s, {per_row_queries} queries\n'
+            u'  set-based: {batch_time:.2f} s, {batch_queries} queries\n'.format(
+                num_rows=len(rows),
+                per_row_time=per_row_time,
+                per_row_queries=len(per_row_queries),
+                batch_time=batch_time,
+                batch_queries=len(batch_queries),
+            )
+        )
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.21 on 2026-10-18 10:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0002_auto_20200507_0603'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkuserregistration',
+            name='processed_rows',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='bulkuserregistration',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='bulkuserregistration',
+            name='status_file_offset',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='bulkuserregistration',
+            name='total_rows',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -36,6 +36,17 @@ SURNAME_MAX_LENGTH = 20
 REGISTRATION_NUMBER_MAX_LENGTH = 30
 OTHER_NAME_MAX_LENGTH = 50
 MOBILE_NUMBER_MAX_LENGTH = 20
+# Processing statuses of an uploaded admission file
+REGISTRATION_PENDING = 'pending'
+REGISTRATION_IN_PROGRESS = 'in_progress'
+REGISTRATION_COMPLETED = 'completed'
+REGISTRATION_FAILED = 'failed'
+REGISTRATION_STATUS_CHOICES = (
+    (REGISTRATION_PENDING, ugettext_noop('Pending')),
+    (REGISTRATION_IN_PROGRESS, ugettext_noop('In Progress')),
+    (REGISTRATION_COMPLETED, ugettext_noop('Completed')),
+    (REGISTRATION_FAILED, ugettext_noop('Failed')),
+)
 
 
 class BulkUserRegistration(models.Model):
@@ -49,6 +60,16 @@ class BulkUserRegistration(models.Model):
         validators=[validate_admission_file]
     )
     description = models.CharField(max_length=100, blank=False, null=True)
+    # Progress of the asynchronous processing of the admission file. These fields
+    # are only updated through querysets so that the post_save signal, which
+    # (re)starts the processing, is not fired again.
+    status = models.CharField(max_length=20, choices=REGISTRATION_STATUS_CHOICES,
+                              default=REGISTRATION_PENDING, editable=False)
+    total_rows = models.PositiveIntegerField(default=0, editable=False)
+    processed_rows = models.PositiveIntegerField(default=0, editable=False)
+    # Byte offset up to which the status file has been written for the processed rows,
+    # used to resume the processing after a worker failure.
+    status_file_offset = models.BigIntegerField(default=0, editable=False)
 
     class Meta(object):
         app_label = APP_LABEL
@@ -56,6 +77,13 @@ class BulkUserRegistration(models.Model):
     def __str__(self):
         return self.description
 
+    @property
+    def status_file_path(self):
+        """
+        Returns the path of the file on which the status of each processed row is written.
+        """
+        return '{}.status'.format(self.admission_file.path)
+
 
 class Department(models.Model):
     """
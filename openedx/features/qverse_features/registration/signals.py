@@ -3,26 +3,34 @@ Signals for qverse registration application.
 """
 import io
 import logging
+import os
 import re
 from csv import DictReader, DictWriter, Error, Sniffer
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.validators import EmailValidator
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, transaction
+from django.db.models import Case, Value, When
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils.crypto import get_random_string
+from user_util import user_util
 
+from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.djangoapps.theming.helpers import get_current_site, get_current_request
+from openedx.core.djangoapps.user_api.models import UserRetirementStatus
 from openedx.features.qverse_features.registration.models import (BulkUserRegistration, QVerseUserProfile,
                                                                   Department, REGISTRATION_NUMBER_MAX_LENGTH,
                                                                   SURNAME_MAX_LENGTH, FIRST_NAME_MAX_LENGTH,
                                                                   MOBILE_NUMBER_MAX_LENGTH, OTHER_NAME_MAX_LENGTH,
-                                                                  MAX_LEVEL_CHOICES, MAX_PROGRAMME_CHOICES)
+                                                                  MAX_LEVEL_CHOICES, MAX_PROGRAMME_CHOICES,
+                                                                  REGISTRATION_PENDING)
 from openedx.features.qverse_features.registration.helpers import get_file_encoding
-from openedx.features.qverse_features.registration.tasks import send_bulk_mail_to_newly_created_students
-from student.models import UserProfile
+from openedx.features.qverse_features.registration.tasks import create_users_from_admission_file
+from student.helpers import AccountValidationError
+from student.models import CourseEnrollmentAllowed, UserProfile, UserSignupSource
 
 
 LOGGER = logging.getLogger(__name__)
@@ -30,19 +38,22 @@ LOGGER = logging.getLogger(__name__)
 USER_CREATED = 'Created'
 USER_UPDATED = 'Updated'
 USER_CREATION_FAILED = 'Failed'
+# to maintain the order of fields in the status csv
+STATUS_FILE_FIELDNAMES = [
+    'regno', 'email', 'firstname', 'surname', 'othername', 'mobile',
+    'departmentid', 'programmeid', 'levelid', 'status', 'error'
+]
 
 
 @receiver(post_save, sender=BulkUserRegistration)
 def create_users_from_csv_file(sender, instance, created, **kwargs):
     """
-    Creates/Updates users, their profiles and sends registration emails.
+    Starts the creation/update of users, their profiles and registration emails.
 
-    Reads data from given csv file having user details. Then creates/updates
-    edx user, edx user profile and qverse user profile accordingly. It
-    writes the status of creation/update on the given file by adding an
-    extra column named 'status' in it. It handles all the exceptions raised by
-    any function called inside it. Also sends the registration email to newly
-    created users.
+    The rows of the given csv file are processed asynchronously in chunks by
+    the `create_users_from_admission_file` celery task, which keeps track of its
+    progress on the BulkUserRegistration object. Any previous progress is reset
+    here so that the whole file is processed again.
 
     Arguments:
         sender (ModelBase): responsible to initiate the signal
@@ -50,26 +61,51 @@ def create_users_from_csv_file(sender, instance, created, **kwargs):
         created (bool): Is created/updated?
         kwargs (dict): Other info
     """
-    csv_file = None
+    # Using update instead of save so that this signal is not fired again.
+    BulkUserRegistration.objects.filter(id=instance.id).update(
+        status=REGISTRATION_PENDING,
+        total_rows=0,
+        processed_rows=0,
+        status_file_offset=0,
+    )
+    site = get_current_site()
+    protocol = 'https' if get_current_request().is_secure() else 'http'
+    # The task reads the BulkUserRegistration object, so it is only started
+    # once the transaction saving it is committed.
+    transaction.on_commit(lambda: create_users_from_admission_file.delay(instance.id, site.id, protocol))
+
+
+def open_admission_file(file_path):
+    """
+    Opens the given admission file for reading.
+
+    Arguments:
+        file_path (str): Complete path of the admission file
+
+    Returns:
+        csv_file (file): The opened file, it is the responsibility of the caller to close it
+        reader (generator): Yields the rows of the file as dicts having lower case keys and
+                            stripped values. Both are None if the file could not be opened.
+    """
     dialect = None
     try:
-        encoding = get_file_encoding(instance.admission_file.path)
+        encoding = get_file_encoding(file_path)
         if not encoding:
             LOGGER.exception('Because of invlid file encoding format, user creation process is aborted.')
-            return
+            return None, None
 
-        csv_file = io.open(instance.admission_file.path, 'r', encoding=encoding)
+        csv_file = io.open(file_path, 'r', encoding=encoding)
         try:
             dialect = Sniffer().sniff(csv_file.readline())
         except Error:
             LOGGER.exception('Could not determine delimiter in the file.')
             csv_file.close()
-            return
+            return None, None
 
         csv_file.seek(0)
     except IOError as error:
         LOGGER.exception('({}) --- {}'.format(error.filename, error.strerror))
-        return
+        return None, None
     dict_reader = DictReader(csv_file, delimiter=dialect.delimiter if dialect else ',')
     # The header of uploaded csv might be in uppercase, lowercase or in camel case
     # so to make our code independent to case just turn all the keys of reader into lower case.
@@ -77,48 +113,271 @@ def create_users_from_csv_file(sender, instance, created, **kwargs):
     # which is only applied for leading whitespaces and there is no option for trailing
     # whitespaces. So, we will have to handle that case ourselves
     reader = (dict((k.strip().lower(), v.strip() if v else v) for k, v in row.items()) for row in dict_reader)
-    output_file_rows = []
-    users_with_updated_emails = set()
+    return csv_file, reader
+
+
+def process_csv_rows(rows, users_with_updated_emails):
+    """
+    Validates the given csv rows and creates/updates their users and profiles.
+
+    All the valid rows are written with a handful of bulk queries. If any of
+    these queries violates a database constraint, the rows are processed one
+    by one instead so that only the offending rows are marked as failed. The
+    status of each row is stored in its 'status' and 'error' keys.
+
+    Arguments:
+        rows (list): List of dicts containing user information
+        users_with_updated_emails (set): A set to which the registration numbers of students
+                                         whose email addresses have been updated are added
+
+    Returns:
+        rows (list): The given rows with their status
+    """
+    valid_rows = []
+    regnos_in_chunk = set()
+    emails_in_chunk = set()
+    BatchCsvRowValidator.prepare_batch(rows)
+    for row in rows:
+        row['status'] = ''
+        row['error'] = ''
+        is_valid_row, errors = BatchCsvRowValidator.validate_csv_row(row)
+        if is_valid_row:
+            # The users of the rows in this chunk are not yet in the database,
+            # so duplicates within the chunk have to be caught here.
+            if row['regno'].lower() in regnos_in_chunk:
+                errors = 'An entry with registration number {} already exists in this file.'.format(row['regno'])
+            elif row['email'].lower() in emails_in_chunk:
+                errors = '{} is already associated with another user account.'.format(row['email'])
+
+        if is_valid_row and not errors:
+            regnos_in_chunk.add(row['regno'].lower())
+            emails_in_chunk.add(row['email'].lower())
+            valid_rows.append(row)
+        else:
+            LOGGER.exception('Error while creating/updating ({}) user and its profiles because of invalid values '
+                             'of required fields with the following errors {}.'.format(row.get('regno'), errors))
+            row['status'] = USER_CREATION_FAILED
+            row['error'] = errors
+
+    # Creating the users of pending auto enrollments fires the post_save signals of User which enroll them,
+    # and creating users with retired usernames or emails is refused by the pre_save signals of User,
+    # so such rows are not written in bulk.
+    auto_enroll_emails = set(
+        email.lower() for email in CourseEnrollmentAllowed.objects.filter(
+            email__in=[row['email'] for row in valid_rows], auto_enroll=True
+        ).values_list('email', flat=True)
+    )
+    retired_regnos = _get_retired_regnos_of_new_users(valid_rows)
+    bulk_rows, single_rows = [], []
+    for row in valid_rows:
+        if row['email'].lower() in auto_enroll_emails or row['regno'].lower() in retired_regnos:
+            single_rows.append(row)
+        else:
+            bulk_rows.append(row)
 
     try:
-        CsvRowValidator.prepare_csv_row_validator()
-        for row in reader:
-            row['status'] = ''
-            row['error'] = ''
-            is_valid_row, errors = CsvRowValidator.validate_csv_row(row)
-
-            if is_valid_row:
-                try:
-                    # Creating/Updating edX User, edX User Profile and QVerse User Profile
-                    # will be an atomic operation. If one operation fails the previous
-                    # successfull operations will be reverted and no changes will be applied.
-                    with transaction.atomic():
-                        edx_user = _create_or_update_edx_user(row, users_with_updated_emails)
-                        _create_or_update_edx_user_profile(edx_user)
-                        _create_or_update_qverse_user_profile(edx_user, row)
-                except IntegrityError as error:
-                    LOGGER.exception('Error while creating/updating ({}) user and its '
-                                     'profiles with the following errors {}.'.format(row.get('regno'), error))
-                    row['status'] = USER_CREATION_FAILED
-                    row['error'] = error
-            else:
-                LOGGER.exception('Error while creating/updating ({}) user and its profiles because of invalid values '
-                                 'of required fields with the following errors {}.'.format(row.get('regno'), errors))
-                row['status'] = USER_CREATION_FAILED
-                row['error'] = errors
-
-            output_file_rows.append(row)
-    except Error as err:
-        LOGGER.exception('Error while traversing {} file content with following error {}.'
-                         .format(instance.admission_file.path, err))
-    csv_file.close()
-    _write_status_on_csv_file(instance.admission_file.path, output_file_rows)
-    new_students = [student for student in output_file_rows
-                    if student.get('status') == USER_CREATED or
-                    (student.get('status') == USER_UPDATED and student.get('regno') in users_with_updated_emails)]
-    site = get_current_site()
-    protocol = 'https' if get_current_request().is_secure() else 'http'
-    send_bulk_mail_to_newly_created_students.delay(new_students, site.id, protocol)
+        with transaction.atomic():
+            _bulk_create_or_update_users(bulk_rows, users_with_updated_emails)
+    except IntegrityError as error:
+        LOGGER.exception('Error while creating/updating users in bulk, falling back to one user '
+                         'at a time with the following error {}.'.format(error))
+        single_rows = valid_rows
+
+    for row in single_rows:
+        try:
+            # Creating/Updating edX User, edX User Profile and QVerse User Profile
+            # will be an atomic operation. If one operation fails the previous
+            # successfull operations will be reverted and no changes will be applied.
+            with transaction.atomic():
+                edx_user = _create_or_update_edx_user(row, users_with_updated_emails)
+                _create_or_update_edx_user_profile(edx_user)
+                _create_or_update_qverse_user_profile(edx_user, row)
+        except (IntegrityError, AccountValidationError) as error:
+            LOGGER.exception('Error while creating/updating ({}) user and its '
+                             'profiles with the following errors {}.'.format(row.get('regno'), error))
+            row['status'] = USER_CREATION_FAILED
+            row['error'] = error
+
+    return rows
+
+
+def _get_retired_regnos_of_new_users(rows):
+    """
+    Returns the lower cased registration numbers of the given rows whose users do not exist yet
+    and whose username or email has been retired.
+
+    These are the checks the pre_save signal of User performs on user creation, done for all the
+    rows at once.
+
+    Arguments:
+        rows (list): List of dicts containing valid user information
+
+    Returns:
+        retired_regnos (set): Lower cased registration numbers of the rows whose users can not be created
+    """
+    existing_usernames = set(
+        username.lower() for username in User.objects.filter(
+            username__in=[row['regno'] for row in rows]
+        ).values_list('username', flat=True)
+    )
+    new_user_rows = [row for row in rows if row['regno'].lower() not in existing_usernames]
+    if not new_user_rows:
+        return set()
+
+    retired_regnos = set()
+    retired_username_prefix = getattr(settings, 'RETIRED_USERNAME_PREFIX', None)
+    hashed_usernames, hashed_emails = {}, {}
+    for row in new_user_rows:
+        regno = row['regno'].lower()
+        if retired_username_prefix and row['regno'].startswith(retired_username_prefix):
+            retired_regnos.add(regno)
+        for hashed_username in user_util.get_all_retired_usernames(
+                row['regno'], settings.RETIRED_USER_SALTS, settings.RETIRED_USERNAME_FMT):
+            hashed_usernames[hashed_username.lower()] = regno
+        for hashed_email in user_util.get_all_retired_emails(
+                row['email'], settings.RETIRED_USER_SALTS, settings.RETIRED_EMAIL_FMT):
+            hashed_emails[hashed_email.lower()] = regno
+
+    retired_regnos.update(
+        hashed_usernames[username.lower()] for username in User.objects.filter(
+            username__in=list(hashed_usernames)
+        ).values_list('username', flat=True)
+    )
+    retired_regnos.update(
+        hashed_emails[email.lower()] for email in User.objects.filter(
+            email__in=list(hashed_emails)
+        ).values_list('email', flat=True)
+    )
+    retired_regnos.update(
+        username.lower() for username in UserRetirementStatus.objects.filter(
+            original_username__in=[row['regno'] for row in new_user_rows]
+        ).values_list('original_username', flat=True)
+    )
+    return retired_regnos
+
+
+def _bulk_create_or_update_users(rows, users_with_updated_emails):
+    """
+    Creates/Updates edx users, their edx profiles and qverse profiles in bulk.
+
+    Arguments:
+        rows (list): List of dicts containing valid user information
+        users_with_updated_emails (set): A set containing registration numbers of students whose emails addresses
+                                         have been updated
+    """
+    if not rows:
+        return
+
+    regnos = [row['regno'] for row in rows]
+    existing_users = {user.username.lower(): user for user in User.objects.filter(username__in=regnos)}
+    existing_emails = set(
+        email.lower() for email in User.objects.filter(
+            email__in=[row['email'] for row in rows]
+        ).values_list('email', flat=True)
+    )
+
+    new_users, updated_users = [], []
+    for row in rows:
+        edx_user = existing_users.get(row['regno'].lower())
+        if edx_user is None:
+            edx_user = User(username=row['regno'])
+            edx_user.set_password(get_random_string())
+            new_users.append(edx_user)
+        else:
+            if row['email'].lower() not in existing_emails:
+                users_with_updated_emails.add(row['regno'])
+                # Setting new password will expire all the previous reset password links
+                edx_user.set_password(get_random_string())
+            updated_users.append(edx_user)
+
+        edx_user.email = row['email']
+        edx_user.first_name = row['firstname']
+        edx_user.last_name = row['surname']
+        edx_user.is_active = True
+
+    User.objects.bulk_create(new_users)
+    _bulk_update(User, updated_users, ['email', 'first_name', 'last_name', 'is_active', 'password'])
+    # bulk_create does not set the primary keys on MySQL, so fetching the users again.
+    edx_users = {user.username.lower(): user for user in User.objects.filter(username__in=regnos)}
+
+    # bulk_create does not send the post_save signal of User which records the signup source.
+    site = configuration_helpers.get_value('SITE_NAME')
+    if site and new_users:
+        UserSignupSource.objects.bulk_create([
+            UserSignupSource(user=edx_users[new_user.username.lower()], site=site) for new_user in new_users
+        ])
+
+    edx_profiles = {profile.user_id: profile for profile in UserProfile.objects.filter(user__in=edx_users.values())}
+    new_edx_profiles, updated_edx_profiles = [], []
+    for edx_user in edx_users.values():
+        full_name = '{} {}'.format(edx_user.first_name, edx_user.last_name)
+        edx_profile = edx_profiles.get(edx_user.id)
+        if edx_profile is None:
+            new_edx_profiles.append(UserProfile(user=edx_user, name=full_name))
+        else:
+            edx_profile.name = full_name
+            updated_edx_profiles.append(edx_profile)
+
+    UserProfile.objects.bulk_create(new_edx_profiles)
+    _bulk_update(UserProfile, updated_edx_profiles, ['name'])
+
+    departments = {
+        department.number: department
+        for department in Department.objects.filter(number__in=set(int(row['departmentid']) for row in rows))
+    }
+    qverse_profiles = {
+        profile.user_id: profile for profile in QVerseUserProfile.objects.filter(user__in=edx_users.values())
+    }
+    new_qverse_profiles, updated_qverse_profiles = [], []
+    for row in rows:
+        edx_user = edx_users[row['regno'].lower()]
+        qverse_profile = qverse_profiles.get(edx_user.id)
+        if qverse_profile is None:
+            qverse_profile = QVerseUserProfile(user=edx_user)
+            new_qverse_profiles.append(qverse_profile)
+            row['status'] = USER_CREATED
+        else:
+            updated_qverse_profiles.append(qverse_profile)
+            row['status'] = USER_UPDATED
+
+        qverse_profile.current_level = row['levelid']
+        qverse_profile.other_name = row['othername']
+        qverse_profile.mobile_number = row['mobile']
+        qverse_profile.programme = row['programmeid']
+        qverse_profile.department = departments[int(row['departmentid'])]
+        # bulk queries bypass QVerseUserProfile.save, which is responsible for the upper case.
+        qverse_profile.registration_number = row['regno'].upper()
+
+    QVerseUserProfile.objects.bulk_create(new_qverse_profiles)
+    _bulk_update(
+        QVerseUserProfile,
+        updated_qverse_profiles,
+        ['current_level', 'other_name', 'mobile_number', 'programme', 'department', 'registration_number']
+    )
+    LOGGER.info('{} users have been created and {} users have been updated.'
+                .format(len(new_qverse_profiles), len(updated_qverse_profiles)))
+
+
+def _bulk_update(model, instances, field_names):
+    """
+    Updates the given fields of all the given model instances in a single query.
+
+    Arguments:
+        model (ModelBase): Model of the instances
+        instances (list): Saved model instances having updated values
+        field_names (list): Names of the fields to be updated
+    """
+    if not instances:
+        return
+
+    values = {}
+    for field_name in field_names:
+        field = model._meta.get_field(field_name)
+        values[field_name] = Case(
+            *[When(pk=instance.pk, then=Value(getattr(instance, field.attname))) for instance in instances],
+            output_field=field
+        )
+    model.objects.filter(pk__in=[instance.pk for instance in instances]).update(**values)
 
 
 def _create_or_update_edx_user(user_info, users_with_updated_emails):
@@ -203,28 +462,34 @@ def _create_or_update_qverse_user_profile(edx_user, user_info):
         user_info['status'] = USER_UPDATED
 
 
-def _write_status_on_csv_file(filename, output_file_rows):
+def write_status_rows(file_path, output_file_rows, offset):
     """
-    Writes on the given file.
+    Writes the given rows with their status on the given file.
+
+    Everything written after the given offset by an earlier interrupted attempt
+    is discarded first, so that the rows can be written again on resume.
 
     Arguments:
-        filename (str): Complete path of the output file
+        file_path (str): Complete path of the status file
         output_file_rows (list): List of CSV file rows
+        offset (int): Position of the file up to which the rows have already been written
+
+    Returns:
+        offset (int): Position of the file up to which the rows have been written
     """
     try:
-        with open(filename, 'w') as csv_file:
-            if output_file_rows:
-                # to maintain the order of fields in csv
-                fieldnames = [
-                    'regno', 'email', 'firstname', 'surname', 'othername', 'mobile',
-                    'departmentid', 'programmeid', 'levelid', 'status', 'error'
-                ]
-                writer = DictWriter(csv_file, fieldnames=fieldnames)
+        with open(file_path, 'r+' if offset and os.path.exists(file_path) else 'w') as csv_file:
+            csv_file.seek(offset)
+            csv_file.truncate()
+            writer = DictWriter(csv_file, fieldnames=STATUS_FILE_FIELDNAMES, extrasaction='ignore')
+            if not offset:
                 writer.writeheader()
-                for row in output_file_rows:
-                    writer.writerow(row)
+            for row in output_file_rows:
+                writer.writerow(row)
+            return csv_file.tell()
     except IOError as error:
-        LOGGER.error('(filename) --- {}'.format(filename, error.strerror))
+        LOGGER.error('({}) --- {}'.format(file_path, error.strerror))
+        return offset
 
 
 class CsvRowValidator(object):
@@ -253,8 +518,8 @@ class CsvRowValidator(object):
         """
         CsvRowValidator.validated_regno.clear()
 
-    @staticmethod
-    def validate_csv_row(row):
+    @classmethod
+    def validate_csv_row(cls, row):
         """
         Validates that each CSV contains all the required fields and all field
         values are according to the acceptance criteria.
@@ -270,7 +535,7 @@ class CsvRowValidator(object):
         if error:
             return False, error
 
-        row_validator = CsvRowValidator(row)
+        row_validator = cls(row)
         row_validator._validate_field_values()
         if row_validator.errors:
             # to write multiple lines
@@ -414,3 +679,65 @@ class CsvRowValidator(object):
                 self.errors.append('Level ID must be greater than 0 and smaller than {}.'.format(MAX_LEVEL_CHOICES+1))
         except ValueError:
             self.errors.append('Level ID is not an integer value.')
+
+
+class BatchCsvRowValidator(CsvRowValidator):
+    """
+    Validates single CSV row data against the existing users and departments
+    loaded for a whole batch of rows.
+
+    `prepare_batch` must be called with all the rows of the batch before
+    validating them. It loads the users and departments referenced by the
+    rows with a few `IN` queries, so that validating each row doesn't hit
+    the database.
+    """
+    existing_usernames = set()
+    email_usernames = {}
+    department_numbers = set()
+
+    @staticmethod
+    def prepare_batch(rows):
+        """
+        Loads the existing users and departments referenced by the given rows.
+
+        Arguments:
+            rows (list): List of dicts containing user information
+        """
+        regnos = set(row['regno'] for row in rows if row.get('regno'))
+        emails = set(row['email'] for row in rows if row.get('email'))
+        department_numbers = set()
+        for row in rows:
+            try:
+                department_numbers.add(int(row.get('departmentid')))
+            except (TypeError, ValueError):
+                pass
+
+        BatchCsvRowValidator.existing_usernames = set(
+            username.lower() for username in User.objects.filter(username__in=regnos).values_list('username', flat=True)
+        )
+        email_usernames = {}
+        for username, email in User.objects.filter(email__in=emails).values_list('username', 'email'):
+            email_usernames.setdefault(email.lower(), []).append(username)
+        BatchCsvRowValidator.email_usernames = email_usernames
+        BatchCsvRowValidator.department_numbers = set(
+            Department.objects.filter(number__in=department_numbers).values_list('number', flat=True)
+        )
+
+    def _validate_unique_regno_in_single_csv_file(self):
+        is_user_exist = self.regno.lower() in BatchCsvRowValidator.existing_usernames
+        if is_user_exist and self.regno in CsvRowValidator.validated_regno:
+            self.errors.append('An entry with registration number {} already exists in this file.'.format(self.regno))
+        else:
+            CsvRowValidator.validated_regno.add(self.regno)
+
+    def _validate_unique_email_constraint(self):
+        usernames = BatchCsvRowValidator.email_usernames.get(self.email.lower(), [])
+        if any(username != self.regno for username in usernames):
+            self.errors.append('{} is already associated with another user account.'.format(self.email))
+
+    def _validate_department_number(self):
+        try:
+            if int(self.department_id) not in BatchCsvRowValidator.department_numbers:
+                self.errors.append('Department number {} does not exist.'.format(self.department_id))
+        except ValueError:
+            self.errors.append('Please provide a valid integer value for department id.')
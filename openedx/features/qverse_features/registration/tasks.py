@@ -1,12 +1,17 @@
 """
 Qverse registration application celery tasks.
 """
+import os
+from csv import Error
+from itertools import islice
+
 from celery.task import task
 from celery.utils.log import get_task_logger
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.sites.models import Site
+from django.db import transaction
 from django.urls import reverse
 from django.utils.http import int_to_base36
 from edx_ace import ace
@@ -16,10 +21,112 @@ from openedx.core.djangoapps.ace_common.template_context import get_base_templat
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.lib.celery.task_utils import emulate_http_request
 from openedx.features.qverse_features.registration.message_types import RegistrationNotification
+from openedx.features.qverse_features.registration.models import (BulkUserRegistration,
+                                                                  REGISTRATION_COMPLETED,
+                                                                  REGISTRATION_FAILED,
+                                                                  REGISTRATION_IN_PROGRESS,
+                                                                  REGISTRATION_PENDING)
 
 
 LOGGER = get_task_logger(__name__)
 ACE_ROUTING_KEY = getattr(settings, 'ACE_ROUTING_KEY', None)
+BULK_USER_REGISTRATION_CHUNK_SIZE = getattr(settings, 'BULK_USER_REGISTRATION_CHUNK_SIZE', 500)
+
+
+@task(bind=True, default_retry_delay=30, max_retries=3)
+def create_users_from_admission_file(self, registration_id, site_id, protocol):
+    """
+    A celery task, responsible to create/update users from the next chunk of rows of an admission file.
+
+    The progress is saved on the BulkUserRegistration object after each chunk and the task
+    enqueues itself again until all the rows are processed. So, if a worker dies, running the
+    task again resumes from the last processed chunk. Once all the rows are processed, the
+    admission file is replaced by the status file.
+
+    Arguments:
+        registration_id (int): Id of the BulkUserRegistration object
+        site_id (int): Current site id
+        protocol (str): Protocol used to build the reset password links e.g: https
+    """
+    # to avoid circular import
+    from openedx.features.qverse_features.registration.signals import (CsvRowValidator, USER_CREATED, USER_UPDATED,
+                                                                       open_admission_file, process_csv_rows,
+                                                                       write_status_rows)
+
+    try:
+        registration = BulkUserRegistration.objects.get(id=registration_id)
+    except BulkUserRegistration.DoesNotExist as exc:
+        # The object might have not been committed yet.
+        raise self.retry(exc=exc)
+
+    file_path = registration.admission_file.path
+    if registration.status == REGISTRATION_PENDING:
+        csv_file, reader = open_admission_file(file_path)
+        if reader is None:
+            BulkUserRegistration.objects.filter(id=registration_id).update(status=REGISTRATION_FAILED)
+            return
+
+        try:
+            total_rows = sum(1 for _ in reader)
+        except Error as err:
+            LOGGER.exception('Error while traversing {} file content with following error {}.'.format(file_path, err))
+            BulkUserRegistration.objects.filter(id=registration_id).update(status=REGISTRATION_FAILED)
+            return
+        finally:
+            csv_file.close()
+
+        BulkUserRegistration.objects.filter(id=registration_id).update(
+            status=REGISTRATION_IN_PROGRESS, total_rows=total_rows
+        )
+        registration.total_rows = total_rows
+
+    csv_file, reader = open_admission_file(file_path)
+    if reader is None:
+        BulkUserRegistration.objects.filter(id=registration_id).update(status=REGISTRATION_FAILED)
+        return
+
+    CsvRowValidator.prepare_csv_row_validator()
+    try:
+        # Registration numbers of the already processed rows are needed to find their duplicates.
+        for row in islice(reader, registration.processed_rows):
+            if row.get('regno'):
+                CsvRowValidator.validated_regno.add(row['regno'])
+        rows = list(islice(reader, BULK_USER_REGISTRATION_CHUNK_SIZE))
+    except Error as err:
+        LOGGER.exception('Error while traversing {} file content with following error {}.'.format(file_path, err))
+        rows = []
+        registration.total_rows = registration.processed_rows
+    finally:
+        csv_file.close()
+
+    users_with_updated_emails = set()
+    with transaction.atomic():
+        output_file_rows = process_csv_rows(rows, users_with_updated_emails)
+        status_file_offset = write_status_rows(
+            registration.status_file_path, output_file_rows, registration.status_file_offset
+        )
+        processed_rows = registration.processed_rows + len(rows)
+        BulkUserRegistration.objects.filter(id=registration_id).update(
+            processed_rows=processed_rows,
+            status_file_offset=status_file_offset,
+        )
+
+    LOGGER.info('{} of {} rows of {} file have been processed.'
+                .format(processed_rows, registration.total_rows, file_path))
+    new_students = [student for student in output_file_rows
+                    if student.get('status') == USER_CREATED or
+                    (student.get('status') == USER_UPDATED and student.get('regno') in users_with_updated_emails)]
+    if new_students:
+        send_bulk_mail_to_newly_created_students.delay(new_students, site_id, protocol)
+
+    if rows and processed_rows < registration.total_rows:
+        create_users_from_admission_file.delay(registration_id, site_id, protocol)
+        return
+
+    if not os.path.exists(registration.status_file_path):
+        write_status_rows(registration.status_file_path, [], 0)
+    os.rename(registration.status_file_path, file_path)
+    BulkUserRegistration.objects.filter(id=registration_id).update(status=REGISTRATION_COMPLETED)
 
 
 @task(routing_key=ACE_ROUTING_KEY)
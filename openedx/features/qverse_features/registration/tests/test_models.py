@@ -21,12 +21,13 @@ class BulkUserRegistrationTests(TestCase):
         self.file_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
         DepartmentFactory(number=1)
 
+    @mock.patch('openedx.features.qverse_features.registration.signals.transaction.on_commit', lambda func: func())
     @mock.patch(
         'openedx.features.qverse_features.registration.signals.get_current_site',
         autospec=True
     )
     @mock.patch(
-        'openedx.features.qverse_features.registration.signals.send_bulk_mail_to_newly_created_students.delay',
+        'openedx.features.qverse_features.registration.tasks.send_bulk_mail_to_newly_created_students.delay',
         autospec=True
     )
     def test_bulk_user_registration_with_valid_admission_file(self, mocked_mail, mocked_site):
@@ -42,6 +43,23 @@ class BulkUserRegistrationTests(TestCase):
             self.assertTrue(mocked_mail.called)
             self.assertEqual(str(BulkUserRegistration.objects.first()), 'Testing Batch')
 
+    @mock.patch('openedx.features.qverse_features.registration.signals.get_current_site', autospec=True)
+    @mock.patch('openedx.features.qverse_features.registration.signals.create_users_from_admission_file.delay')
+    def test_admission_file_processed_after_commit(self, mocked_task, mocked_site):  # pylint: disable=unused-argument
+        on_commit_callbacks = []
+        with mock.patch(
+            'openedx.features.qverse_features.registration.signals.transaction.on_commit',
+            on_commit_callbacks.append
+        ):
+            registration = BulkUserRegistration.objects.create(
+                admission_file=ContentFile('', 'admission_file.csv'), description='Testing Batch'
+            )
+
+        self.assertFalse(mocked_task.called)
+        self.assertEqual(len(on_commit_callbacks), 1)
+        on_commit_callbacks[0]()
+        mocked_task.assert_called_once_with(registration.id, mocked_site.return_value.id, mock.ANY)
+
 
 class DepartmentTests(TestCase):
     """
@@ -0,0 +1,114 @@
+"""
+Tests for QVerse registration app signals.
+"""
+from ddt import ddt, data
+import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from openedx.features.qverse_features.registration.signals import (USER_CREATED, USER_CREATION_FAILED,
+                                                                   BatchCsvRowValidator, CsvRowValidator,
+                                                                   process_csv_rows)
+from openedx.features.qverse_features.registration.tests.factories import (DepartmentFactory,
+                                                                           QVerseUserProfileFactory)
+from student.models import UserSignupSource, get_retired_email_by_email
+from student.tests.factories import UserFactory
+
+
+def _get_row(regno, email, department_id='1'):
+    """
+    Returns a csv row having the given values.
+    """
+    return {
+        'regno': regno,
+        'email': email,
+        'firstname': 'John',
+        'surname': 'Doe',
+        'othername': '',
+        'mobile': '',
+        'departmentid': department_id,
+        'programmeid': '1',
+        'levelid': '1',
+    }
+
+
+@ddt
+class BatchCsvRowValidatorTests(TestCase):
+    """
+    Tests for BatchCsvRowValidator.
+    """
+    def setUp(self):
+        super(BatchCsvRowValidatorTests, self).setUp()
+        DepartmentFactory(number=1)
+        self.existing_user = QVerseUserProfileFactory().user
+        CsvRowValidator.prepare_csv_row_validator()
+
+    def _get_rows(self):
+        return [
+            _get_row('EMP1', 'emp1@example.com'),
+            _get_row(self.existing_user.username, self.existing_user.email),
+            _get_row('EMP2', self.existing_user.email),
+            _get_row('EMP3', 'emp3@example.com', department_id='2'),
+            _get_row('EMP4', 'emp4@example.com', department_id='one'),
+        ]
+
+    def test_batch_validation_matches_row_validation(self):
+        rows = self._get_rows()
+        expected_results = [CsvRowValidator.validate_csv_row(row) for row in rows]
+
+        CsvRowValidator.prepare_csv_row_validator()
+        BatchCsvRowValidator.prepare_batch(rows)
+        results = [BatchCsvRowValidator.validate_csv_row(row) for row in rows]
+
+        self.assertEqual(results, expected_results)
+        self.assertEqual([is_valid for is_valid, _ in results], [True, True, False, False, False])
+
+    @data(1000, 10000, 50000)
+    def test_batch_validation_queries(self, row_count):
+        """
+        Validating 1k/10k/50k rows costs the same few queries, independent of the number of rows.
+        """
+        rows = [_get_row('EMP{}'.format(i), 'emp{}@example.com'.format(i)) for i in range(row_count)]
+
+        with self.assertNumQueries(3):
+            BatchCsvRowValidator.prepare_batch(rows)
+            results = [BatchCsvRowValidator.validate_csv_row(row) for row in rows]
+
+        self.assertTrue(all(is_valid for is_valid, _ in results))
+
+
+class ProcessCsvRowsTests(TestCase):
+    """
+    Tests for process_csv_rows.
+    """
+    def setUp(self):
+        super(ProcessCsvRowsTests, self).setUp()
+        DepartmentFactory(number=1)
+        CsvRowValidator.prepare_csv_row_validator()
+
+    def test_retired_users_not_created(self):
+        UserFactory(email=get_retired_email_by_email('retired@example.com'))
+        rows = [
+            _get_row('EMP1', 'emp1@example.com'),
+            _get_row('EMP2', 'retired@example.com'),
+        ]
+
+        process_csv_rows(rows, set())
+
+        self.assertEqual([row['status'] for row in rows], [USER_CREATED, USER_CREATION_FAILED])
+        self.assertEqual(list(User.objects.filter(username__startswith='EMP').values_list('username', flat=True)),
+                         ['EMP1'])
+
+    @mock.patch('openedx.features.qverse_features.registration.signals.configuration_helpers.get_value',
+                return_value='example.com')
+    def test_signup_sources_created(self, mocked_get_value):  # pylint: disable=unused-argument
+        existing_user = QVerseUserProfileFactory().user
+        rows = [_get_row('EMP1', 'emp1@example.com'), _get_row(existing_user.username, existing_user.email)]
+
+        process_csv_rows(rows, set())
+
+        self.assertEqual(
+            list(UserSignupSource.objects.values_list('user__username', 'site')),
+            [('EMP1', 'example.com')]
+        )
@@ -2,10 +2,17 @@
 Tests for QVerse registration app tasks.
 """
 import mock
+import os
+from csv import DictReader
 
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
 from django.test import TestCase
 
+from openedx.features.qverse_features.registration.models import (BulkUserRegistration, QVerseUserProfile,
+                                                                  REGISTRATION_COMPLETED)
 from openedx.features.qverse_features.registration.tasks import send_bulk_mail_to_newly_created_students
+from openedx.features.qverse_features.registration.tests.factories import DepartmentFactory
 from student.tests.factories import UserFactory
 
 
@@ -22,3 +29,58 @@ class RegistrationTasksTests(TestCase):
         new_students = [{'regno': UserFactory().username} for i in range(1, student_count+1)]
         send_bulk_mail_to_newly_created_students(new_students, 1)
         self.assertEqual(mocked_mail.call_count, student_count)
+
+
+@mock.patch('openedx.features.qverse_features.registration.signals.get_current_site', autospec=True)
+@mock.patch(
+    'openedx.features.qverse_features.registration.tasks.send_bulk_mail_to_newly_created_students.delay',
+    autospec=True
+)
+@mock.patch('openedx.features.qverse_features.registration.tasks.BULK_USER_REGISTRATION_CHUNK_SIZE', 2)
+@mock.patch('openedx.features.qverse_features.registration.signals.transaction.on_commit', lambda func: func())
+class CreateUsersFromAdmissionFileTaskTests(TestCase):
+    """
+    Tests for create_users_from_admission_file task.
+    """
+    def setUp(self):
+        super(CreateUsersFromAdmissionFileTaskTests, self).setUp()
+        DepartmentFactory(number=1)
+        file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'admission_file.csv')
+        with open(file_path, 'r') as admission_file:
+            self.file_content = admission_file.read()
+
+    def _create_registration(self):
+        return BulkUserRegistration.objects.create(
+            admission_file=ContentFile(self.file_content, 'admission_file.csv'),
+            description='Testing Batch'
+        )
+
+    def test_admission_file_processed_in_chunks(self, mocked_mail, mocked_site):  # pylint: disable=unused-argument
+        registration = BulkUserRegistration.objects.get(id=self._create_registration().id)
+
+        self.assertEqual(registration.status, REGISTRATION_COMPLETED)
+        self.assertEqual(registration.total_rows, 5)
+        self.assertEqual(registration.processed_rows, 5)
+        self.assertEqual(User.objects.all().count(), 2)
+        self.assertEqual(QVerseUserProfile.objects.all().count(), 2)
+        # Both the new students are in the first chunk
+        self.assertEqual(mocked_mail.call_count, 1)
+        self.assertFalse(os.path.exists(registration.status_file_path))
+
+        with open(registration.admission_file.path, 'r') as status_file:
+            statuses = [row['status'] for row in DictReader(status_file)]
+        self.assertEqual(statuses, ['Created', 'Created', 'Failed', 'Failed', 'Failed'])
+
+    def test_existing_users_updated_in_bulk(self, mocked_mail, mocked_site):  # pylint: disable=unused-argument
+        UserFactory(username='EMP1', email='emp1@example.com', first_name='Old')
+
+        self._create_registration()
+
+        edx_user = User.objects.get(username='EMP1')
+        self.assertEqual(edx_user.first_name, 'John')
+        self.assertEqual(edx_user.profile.name, 'John Vincent')
+        self.assertEqual(edx_user.qverse_profile.registration_number, 'EMP1')
+        self.assertEqual(edx_user.qverse_profile.department.number, 1)
+        # Existing user with an unchanged email address does not get the registration email
+        emailed_regnos = [student['regno'] for student in mocked_mail.call_args[0][0]]
+        self.assertEqual(emailed_regnos, ['EMP2'])